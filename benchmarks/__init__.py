@@ -0,0 +1,6 @@
+"""
+Offline benchmark suite for the pitch deck analysis pipeline.
+
+Run ``python -m benchmarks.run`` to measure parsing, enrichment and the
+end-to-end CLI path against a local stand-in for OpenRouter and DuckDuckGo.
+"""
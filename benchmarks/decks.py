@@ -0,0 +1,138 @@
+"""
+Synthetic pitch deck generator for benchmarks.
+
+PDFs are written directly in the PDF format (one text page per slide, using
+a standard Type 1 font), so no PDF authoring library is needed. PPTX decks
+are built with python-pptx and include titles, bullets, a table and speaker
+notes to exercise every part of the slide parser.
+"""
+
+import random
+
+# Building blocks for plausible slide text
+_TOPICS = ["Problem", "Solution", "Product", "Market", "Traction", "Business Model",
+           "Competition", "Team", "Financials", "Roadmap", "The Ask"]
+_PHRASES = [
+    "Revenue grew 3x year over year with strong net retention",
+    "Our platform automates warehouse robotics for mid-size retailers",
+    "The serviceable market is estimated at 12B USD by 2030",
+    "Founders previously scaled two logistics startups to exit",
+    "Gross margin improved to 68 percent after the hardware redesign",
+    "Pilot customers include three of the top ten grocery chains",
+    "We are raising a 6M USD seed round to expand sales",
+    "Churn stayed below two percent per month across all cohorts",
+]
+
+
+def slide_lines(index, lines_per_slide=8, rng=None):
+    """
+    Generate the title and body lines of one synthetic slide.
+
+    Args:
+        index (int): Zero-based slide index; slide 0 is the title slide.
+        lines_per_slide (int): Number of body lines.
+        rng (random.Random): Random source for reproducible decks.
+
+    Returns:
+        tuple: (title, list of body lines).
+    """
+    rng = rng or random.Random(index)
+    if index == 0:
+        return "Acme Robotics", ["Seed Round Investor Presentation", "Confidential"]
+    title = f"{_TOPICS[index % len(_TOPICS)]} {index}"
+    return title, [rng.choice(_PHRASES) for _ in range(lines_per_slide)]
+
+
+def _pdf_escape(text):
+    """
+    Escape a string for use in a PDF literal string.
+    """
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, pages=10, lines_per_page=8, seed=0):
+    """
+    Write a synthetic text PDF.
+
+    Args:
+        path (str): Destination file path.
+        pages (int): Number of pages.
+        lines_per_page (int): Number of body lines per page.
+        seed (int): Random seed for the page text.
+
+    Returns:
+        str: The path written.
+    """
+    rng = random.Random(seed)
+    # Object 1 is the catalog, 2 the page tree, 3 the font; each page then
+    # takes two objects: the page and its content stream
+    objects = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for index in range(pages):
+        title, lines = slide_lines(index, lines_per_page, rng)
+        ops = ["BT", "/F1 24 Tf", "50 750 Td", f"({_pdf_escape(title)}) Tj", "/F1 12 Tf"]
+        for line in lines:
+            ops += ["0 -28 Td", f"({_pdf_escape(line)}) Tj"]
+        ops += ["ET"]
+        stream = "\n".join(ops).encode("latin-1")
+        page_number = len(objects) + 1
+        kids.append(f"{page_number} 0 R")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_number + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
+
+
+def write_pptx(path, slides=10, lines_per_slide=8, seed=0):
+    """
+    Write a synthetic PPTX deck.
+
+    Every fifth slide carries a small metrics table, and every slide has
+    speaker notes.
+
+    Args:
+        path (str): Destination file path.
+        slides (int): Number of slides.
+        lines_per_slide (int): Number of bullet lines per slide.
+        seed (int): Random seed for the slide text.
+
+    Returns:
+        str: The path written.
+    """
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    rng = random.Random(seed)
+    prs = Presentation()
+    for index in range(slides):
+        title, lines = slide_lines(index, lines_per_slide, rng)
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = title
+        body = slide.placeholders[1].text_frame
+        body.text = lines[0]
+        for line in lines[1:]:
+            body.add_paragraph().text = line
+        if index and index % 5 == 0:
+            table = slide.shapes.add_table(3, 2, Inches(5), Inches(5), Inches(4), Inches(1)).table
+            for row, (label, value) in enumerate([("Metric", "Value"), ("ARR", "1.2M"), ("Customers", "40")]):
+                table.cell(row, 0).text = label
+                table.cell(row, 1).text = value
+        slide.notes_slide.notes_text_frame.text = f"Talk track for {title}."
+    prs.save(path)
+    return path
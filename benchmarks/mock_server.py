@@ -0,0 +1,267 @@
+"""
+Local stand-in for the OpenRouter and DuckDuckGo endpoints.
+
+The server answers chat completion requests (plain and SSE streaming) and
+DuckDuckGo HTML searches with synthetic content. Latency, jitter, token
+generation rate and injected 429 responses are configurable, so the
+enrichment pipeline can be benchmarked without network access or API keys.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Matches the section list of a fused prompt ("- Name: instruction")
+_FUSED_SECTION_RE = re.compile(r"^- ([^:\n]+):", re.MULTILINE)
+
+
+class MockSettings:
+    """
+    Behaviour of the mock endpoints.
+
+    Attributes:
+        latency (float): Base time to first token in seconds.
+        jitter (float): Maximum random extra latency in seconds.
+        tokens_per_second (float): Completion generation rate; 0 returns the
+                                   whole completion immediately.
+        completion_tokens (int): Approximate length of each completion.
+        error_rate (float): Probability of answering with 429 Too Many Requests.
+        retry_after (float): Retry-After value sent with injected 429s.
+        search_latency (float): Latency of DuckDuckGo searches in seconds.
+        company_name (str): Name returned for name extraction prompts.
+    """
+
+    def __init__(self, latency=0.2, jitter=0.05, tokens_per_second=0, completion_tokens=150,
+                 error_rate=0.0, retry_after=0.05, search_latency=0.1,
+                 company_name="Acme Robotics", seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.search_latency = search_latency
+        self.company_name = company_name
+        self.random = random.Random(seed)
+
+
+def completion_text(prompt, settings):
+    """
+    Build a plausible completion for a prompt.
+
+    Name extraction prompts get the company name, fused prompts a JSON object
+    with every requested section, and other prompts filler markdown of about
+    ``completion_tokens`` tokens.
+
+    Args:
+        prompt (str): The user prompt.
+        settings (MockSettings): Server settings.
+
+    Returns:
+        str: The completion text.
+    """
+    if prompt.startswith("Extract the full company name"):
+        return settings.company_name
+    words = " ".join(["lorem"] * max(1, settings.completion_tokens * 3 // 4))
+    if "Respond with a single JSON object" in prompt:
+        sections = _FUSED_SECTION_RE.findall(prompt.split("\n\nContext:\n", 1)[0])
+        return json.dumps({name: f"{name}: {words}" for name in sections})
+    return f"- {words}"
+
+
+def split_prompt(messages):
+    """
+    Split chat messages into the cacheable prefix and the final instruction.
+
+    Args:
+        messages (list): Chat messages whose content is a string or a list
+                         of text parts.
+
+    Returns:
+        tuple: (prefix, prompt) where ``prompt`` is the last text part of
+               the last message and ``prefix`` everything before it.
+    """
+    parts = []
+    for message in messages:
+        content = message["content"]
+        parts.extend([content] if isinstance(content, str) else [p["text"] for p in content])
+    return "\n\n".join(parts[:-1]), parts[-1]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Request handler dispatching to the mock endpoints.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def settings(self):
+        return self.server.settings
+
+    def _count(self, name):
+        with self.server.lock:
+            self.server.counts[name] = self.server.counts.get(name, 0) + 1
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not urlsplit(self.path).path.endswith("/chat/completions"):
+            self._send(404, '{"error": "not found"}')
+            return
+        self._count("completions")
+        settings = self.settings
+        time.sleep(settings.latency + settings.random.uniform(0, settings.jitter))
+        if settings.random.random() < settings.error_rate:
+            self._count("rate_limited")
+            self._send(429, '{"error": "rate limited"}',
+                       headers={"Retry-After": str(settings.retry_after)})
+            return
+
+        payload = json.loads(body or b"{}")
+        prefix, prompt = split_prompt(payload["messages"])
+        text = completion_text(prompt, settings)
+        usage = {"prompt_tokens": (len(prefix) + len(prompt)) // 4 + 1,
+                 "completion_tokens": len(text) // 4 + 1}
+        # Providers serve a repeated prompt prefix from their prompt cache
+        if prefix:
+            key = (payload.get("model"), prefix)
+            with self.server.lock:
+                cached = key in self.server.prefixes
+                self.server.prefixes.add(key)
+            usage["prompt_tokens_details"] = {"cached_tokens": len(prefix) // 4 if cached else 0}
+        if payload.get("stream"):
+            self._stream(text, usage)
+            return
+        if settings.tokens_per_second:
+            time.sleep(usage["completion_tokens"] / settings.tokens_per_second)
+        self._send(200, json.dumps({
+            "choices": [{"message": {"role": "assistant", "content": text}}],
+            "usage": usage,
+        }))
+
+    def _stream(self, text, usage):
+        """
+        Send a completion as server-sent events, one event per ~4 tokens.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        self.wfile.write(b": OPENROUTER PROCESSING\n\n")
+        step = 16
+        for start in range(0, len(text), step):
+            if self.settings.tokens_per_second:
+                time.sleep(step / 4 / self.settings.tokens_per_second)
+            event = {"choices": [{"delta": {"content": text[start:start + step]}}]}
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        event = {"choices": [{"delta": {}, "finish_reason": "stop"}], "usage": usage}
+        self.wfile.write(f"data: {json.dumps(event)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if not url.path.startswith("/html"):
+            self._send(404, "not found", "text/plain")
+            return
+        self._count("searches")
+        time.sleep(self.settings.search_latency)
+        query = parse_qs(url.query).get("q", [""])[0]
+        links = "".join(
+            f'<div class="result"><a class="result__a" href="https://example.com/{i}">'
+            f"{query} result {i}</a></div>"
+            for i in range(5)
+        )
+        self._send(200, f"<html><body>{links}</body></html>", "text/html; charset=utf-8")
+
+
+class MockServer:
+    """
+    Threaded HTTP server hosting the mock endpoints on a free local port.
+
+    Example:
+        with MockServer(MockSettings(latency=0.3)) as server:
+            enricher = Enricher(api_key="bench", api_url=server.completions_url)
+    """
+
+    def __init__(self, settings=None, host="127.0.0.1", port=0):
+        """
+        Create the server; call ``start`` or use it as a context manager.
+
+        Args:
+            settings (MockSettings): Endpoint behaviour. Defaults to MockSettings().
+            host (str): Interface to bind. Defaults to "127.0.0.1".
+            port (int): Port to bind; 0 picks a free port.
+        """
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.settings = settings or MockSettings()
+        self.httpd.counts = {}
+        self.httpd.lock = threading.Lock()
+        self.httpd.prefixes = set()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def completions_url(self):
+        """
+        URL to pass as Enricher ``api_url``.
+        """
+        return f"{self.base_url}/api/v1/chat/completions"
+
+    @property
+    def search_url(self):
+        """
+        URL to pass as web_enrich ``search_url``.
+        """
+        return f"{self.base_url}/html/"
+
+    @property
+    def counts(self):
+        """
+        Number of completions, searches and injected 429s served so far.
+        """
+        with self.httpd.lock:
+            return dict(self.httpd.counts)
+
+    def start(self):
+        """
+        Serve requests in a background thread.
+        """
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Shut the server down.
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
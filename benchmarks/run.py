@@ -0,0 +1,326 @@
+"""
+Offline benchmark runner for the pitch deck analysis pipeline.
+
+Generates synthetic decks, starts the local OpenRouter/DuckDuckGo stand-in
+and reports:
+- parse time per page/slide for parse_pdf and parse_ppt at several deck sizes
+- Enricher.enrich latency and throughput at several concurrency levels
+- end-to-end latency of main.main for a PDF and a PPTX deck
+- peak resident set size of the process
+
+Usage:
+    python -m benchmarks.run --sizes 10 50 200 --concurrency 1 4 8 --json bench.json
+    python -m benchmarks.run --compare bench.json   # exit code 1 on regressions
+"""
+
+import os
+
+# The runner never talks to OpenRouter; make sure a real key is not sent anywhere
+os.environ["OPENROUTER_API_KEY"] = "benchmark"
+
+import argparse
+import contextlib
+import json
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.decks import write_pdf, write_pptx
+from benchmarks.mock_server import MockServer, MockSettings
+from utils import transport, web_enrich
+from utils.enrich import SECTIONS, Enricher
+from utils.metrics import Metrics
+from utils.pdf_parser import parse_pdf
+from utils.ppt_parser import parse_ppt
+
+
+def peak_rss_mb():
+    """
+    Return the peak resident set size of this process in MiB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in KiB elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentile(values, fraction):
+    """
+    Return the nearest-rank percentile of a list of numbers.
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def bench_parse(workdir, sizes, repeat=3, workers=1):
+    """
+    Time parse_pdf and parse_ppt on synthetic decks of each size.
+
+    Args:
+        workdir (str): Directory for the generated decks.
+        sizes (list): Numbers of pages/slides to benchmark.
+        repeat (int): Runs per deck; the fastest is reported.
+        workers (int): Parser worker processes.
+
+    Returns:
+        list: One result dict per format and size.
+    """
+    results = []
+    for size in sizes:
+        for fmt, writer, parser in (("pdf", write_pdf, parse_pdf), ("pptx", write_pptx, parse_ppt)):
+            path = writer(os.path.join(workdir, f"deck_{size}.{fmt}"), size)
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                parser(path, workers=workers, parallel_threshold=1 if workers > 1 else 100)
+                timings.append(time.perf_counter() - start)
+            best = min(timings)
+            results.append({
+                "format": fmt,
+                "units": size,
+                "file_kb": round(os.path.getsize(path) / 1024, 1),
+                "seconds": round(best, 4),
+                "ms_per_unit": round(best * 1000 / size, 3),
+            })
+    return results
+
+
+def bench_enrich(server, deck_data, levels, decks=3, stream=False, generation_mode="sections"):
+    """
+    Measure Enricher.enrich latency and throughput against the mock server.
+
+    Args:
+        server (MockServer): Running mock server.
+        deck_data (dict): Parsed deck to enrich.
+        levels (list): max_concurrency values to benchmark.
+        decks (int): Decks enriched per level, one after another.
+        stream (bool): Use streamed completions.
+        generation_mode (str): "sections" or "fused".
+
+    Returns:
+        list: One result dict per concurrency level.
+    """
+    results = []
+    for level in levels:
+        enricher = Enricher(api_key="benchmark", max_concurrency=level, show_progress=False,
+                            api_url=server.completions_url, stream=stream,
+                            generation_mode=generation_mode)
+        before = server.counts
+        latencies, tokens, prompt_tokens, cached_tokens = [], 0, 0, 0
+        start = time.perf_counter()
+        for _ in range(decks):
+            metrics = Metrics()
+            deck_start = time.perf_counter()
+            enricher.enrich(deck_data, metrics=metrics)
+            latencies.append(time.perf_counter() - deck_start)
+            tokens += metrics.counters.get("completion_tokens", 0)
+            prompt_tokens += metrics.counters.get("prompt_tokens", 0)
+            cached_tokens += metrics.counters.get("cached_tokens", 0)
+        wall = time.perf_counter() - start
+        after = server.counts
+        requests_made = after.get("completions", 0) - before.get("completions", 0)
+        results.append({
+            "concurrency": level,
+            "decks": decks,
+            "mean_latency": round(statistics.mean(latencies), 4),
+            "p95_latency": round(percentile(latencies, 0.95), 4),
+            "decks_per_second": round(decks / wall, 3),
+            "sections_per_second": round(decks * len(SECTIONS) / wall, 2),
+            "completion_tokens_per_second": round(tokens / wall, 1),
+            "requests": requests_made,
+            "cached_prompt_share": round(cached_tokens / prompt_tokens, 3) if prompt_tokens else 0.0,
+            "rate_limited": after.get("rate_limited", 0) - before.get("rate_limited", 0),
+        })
+    return results
+
+
+def bench_end_to_end(server, workdir, size, concurrency):
+    """
+    Time main.main on a synthetic PDF and PPTX, including parsing and writing.
+
+    Args:
+        server (MockServer): Running mock server.
+        workdir (str): Directory for decks and reports.
+        size (int): Number of pages/slides per deck.
+        concurrency (int): max_concurrency for enrichment.
+
+    Returns:
+        list: One result dict per format.
+    """
+    import main
+
+    config = {"llm_model": "benchmark-model", "max_concurrency": concurrency,
+              "api_url": server.completions_url}
+    results = []
+    for fmt, writer in (("pdf", write_pdf), ("pptx", write_pptx)):
+        path = writer(os.path.join(workdir, f"e2e_{size}.{fmt}"), size)
+        outdir = tempfile.mkdtemp(dir=workdir)
+        cwd = os.getcwd()
+        os.chdir(outdir)
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), \
+                    contextlib.redirect_stderr(devnull):
+                start = time.perf_counter()
+                main.main(path, config, refresh=True)
+                elapsed = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+        results.append({"format": fmt, "units": size, "seconds": round(elapsed, 4)})
+    return results
+
+
+def flatten(results):
+    """
+    Flatten results into "<group>.<key>.<metric>" timings for comparison.
+
+    Only metrics where lower is better (seconds and latencies) are included.
+    """
+    flat = {}
+    for row in results.get("parse", []):
+        flat[f"parse.{row['format']}.{row['units']}.ms_per_unit"] = row["ms_per_unit"]
+    for row in results.get("enrich", []):
+        for metric in ("mean_latency", "p95_latency"):
+            flat[f"enrich.c{row['concurrency']}.{metric}"] = row[metric]
+    for row in results.get("end_to_end", []):
+        flat[f"end_to_end.{row['format']}.{row['units']}.seconds"] = row["seconds"]
+    if "peak_rss_mb" in results:
+        flat["peak_rss_mb"] = results["peak_rss_mb"]
+    return flat
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compare results with a baseline run.
+
+    Args:
+        results (dict): Results of this run.
+        baseline (dict): Results of an earlier run.
+        tolerance (float): Allowed relative slowdown before a metric is
+                           reported as a regression. Defaults to 0.2 (20%).
+
+    Returns:
+        list: (metric, baseline value, current value, relative change) for
+              every metric that regressed beyond the tolerance.
+    """
+    current, previous = flatten(results), flatten(baseline)
+    regressions = []
+    for name, old in previous.items():
+        new = current.get(name)
+        if new is None or not old:
+            continue
+        change = (new - old) / old
+        if change > tolerance:
+            regressions.append((name, old, new, change))
+    return regressions
+
+
+def run(args):
+    """
+    Run the selected benchmarks.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        dict: Results with 'parse', 'enrich', 'end_to_end' and 'peak_rss_mb'.
+    """
+    settings = MockSettings(latency=args.latency, jitter=args.jitter,
+                            tokens_per_second=args.tokens_per_second,
+                            completion_tokens=args.completion_tokens,
+                            error_rate=args.error_rate, search_latency=args.search_latency,
+                            seed=args.seed)
+    results = {"settings": vars(args).copy()}
+    with tempfile.TemporaryDirectory() as workdir, MockServer(settings) as server:
+        # Short backoff so injected 429s measure retry overhead, not sleep time
+        transport.configure(max_retries=5, backoff_base=0.05, backoff_max=1.0)
+        web_enrich.configure(cache=None, search_url=server.search_url)
+
+        if "parse" in args.only:
+            results["parse"] = bench_parse(workdir, args.sizes, args.repeat, args.parse_workers)
+        if "enrich" in args.only:
+            deck = parse_pdf(write_pdf(os.path.join(workdir, "enrich.pdf"), args.sizes[0]))
+            results["enrich"] = bench_enrich(server, deck, args.concurrency, args.decks,
+                                             stream=args.stream, generation_mode=args.generation_mode)
+        if "e2e" in args.only:
+            results["end_to_end"] = bench_end_to_end(server, workdir, args.sizes[0],
+                                                     max(args.concurrency))
+        results["server_counts"] = server.counts
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def print_report(results):
+    """
+    Print the results as plain-text tables.
+    """
+    if results.get("parse"):
+        print("Parsing (best of runs)")
+        for row in results["parse"]:
+            print(f"  {row['format']:<5} {row['units']:>5} units  {row['seconds']:>8.3f}s  "
+                  f"{row['ms_per_unit']:>8.3f} ms/unit  ({row['file_kb']} KiB)")
+    if results.get("enrich"):
+        print("Enrichment (mock OpenRouter)")
+        for row in results["enrich"]:
+            print(f"  concurrency {row['concurrency']:>2}  mean {row['mean_latency']:.3f}s  "
+                  f"p95 {row['p95_latency']:.3f}s  {row['decks_per_second']:.2f} decks/s  "
+                  f"{row['sections_per_second']:.1f} sections/s  "
+                  f"{row['requests']} requests ({row['rate_limited']} rate limited)  "
+                  f"{row['cached_prompt_share']:.0%} prompt tokens cached")
+    if results.get("end_to_end"):
+        print("End to end (main.main)")
+        for row in results["end_to_end"]:
+            print(f"  {row['format']:<5} {row['units']:>5} units  {row['seconds']:.3f}s")
+    print(f"Peak RSS: {results['peak_rss_mb']} MiB")
+
+
+def parse_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the pitch deck analyser.")
+    parser.add_argument("--only", nargs="+", default=["parse", "enrich", "e2e"],
+                        choices=["parse", "enrich", "e2e"], help="Benchmarks to run")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10, 50, 200],
+                        help="Deck sizes in pages/slides; the first is used for enrichment")
+    parser.add_argument("--repeat", type=int, default=3, help="Parse runs per deck")
+    parser.add_argument("--parse-workers", type=int, default=1, help="Parser worker processes")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 8],
+                        help="Enricher max_concurrency levels")
+    parser.add_argument("--decks", type=int, default=3, help="Decks enriched per level")
+    parser.add_argument("--generation-mode", default="sections", choices=["sections", "fused"])
+    parser.add_argument("--stream", action="store_true", help="Use streamed completions")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock time to first token (s)")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Mock extra random latency (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=0,
+                        help="Mock generation rate; 0 returns completions at once")
+    parser.add_argument("--completion-tokens", type=int, default=150,
+                        help="Approximate tokens per mock completion")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of completions answered with 429")
+    parser.add_argument("--search-latency", type=float, default=0.1,
+                        help="Mock DuckDuckGo latency (s)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for mock jitter and errors")
+    parser.add_argument("--json", metavar="PATH", help="Write the results as JSON")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="Compare with an earlier --json result; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative slowdown when comparing (default 0.2)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run(args)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name, old, new, change in regressions:
+            print(f"REGRESSION {name}: {old} -> {new} (+{change:.0%})")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against", args.compare)
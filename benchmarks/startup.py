@@ -0,0 +1,126 @@
+"""
+Startup benchmark for the command-line entry point.
+
+Runs ``python -X importtime main.py --help`` several times in fresh
+interpreters and reports the median wall time, the slowest imports by
+cumulative time and any heavy dependency (parsers, HTTP, NumPy) that is
+imported before a deck is actually processed. Those are loaded lazily, so
+shelling out once per deck stays cheap.
+
+Usage:
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --max-ms 250   # exit code 1 if slower or a heavy module loads
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+# Modules that must only be imported on first use
+HEAVY_MODULES = ("pptx", "PyPDF2", "bs4", "lxml", "numpy", "requests", "httpx", "tqdm", "dotenv", "yaml")
+
+_IMPORT_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr):
+    """
+    Parse the output of ``python -X importtime``.
+
+    Args:
+        stderr (str): Captured standard error of the interpreter.
+
+    Returns:
+        dict: Module name to (self, cumulative) import time in microseconds.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        match = _IMPORT_LINE_RE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return modules
+
+
+def measure(args=("main.py", "--help"), runs=5):
+    """
+    Start the entry point in fresh interpreters and collect timings.
+
+    Args:
+        args (tuple): Script and arguments passed to the interpreter.
+        runs (int): Number of interpreter starts. Defaults to 5.
+
+    Returns:
+        dict: 'wall_ms' (median), 'wall_ms_runs', 'imports' (module to median
+              cumulative ms) and 'heavy' (heavy modules that were imported).
+    """
+    walls, cumulative = [], {}
+    for _ in range(max(1, runs)):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT,
+                              capture_output=True, text=True)
+        walls.append((time.perf_counter() - start) * 1000)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(args)} exited with {proc.returncode}: {proc.stderr[-500:]}")
+        for name, (_, total) in parse_importtime(proc.stderr).items():
+            cumulative.setdefault(name, []).append(total / 1000)
+
+    imports = {name: round(statistics.median(values), 2) for name, values in cumulative.items()}
+    heavy = sorted(name for name in imports if name.split(".")[0] in HEAVY_MODULES)
+    return {
+        "wall_ms": round(statistics.median(walls), 1),
+        "wall_ms_runs": [round(w, 1) for w in walls],
+        "imports": imports,
+        "heavy": heavy,
+    }
+
+
+def print_report(result, top=15):
+    """
+    Print a startup report.
+
+    Args:
+        result (dict): Result of ``measure``.
+        top (int): Number of slowest imports to list.
+    """
+    print(f"Startup wall time (median of {len(result['wall_ms_runs'])}): {result['wall_ms']} ms")
+    print("\nSlowest imports (cumulative ms):")
+    slowest = sorted(result["imports"].items(), key=lambda item: item[1], reverse=True)[:top]
+    for name, ms in slowest:
+        print(f"  {ms:>8.1f}  {name}")
+    if result["heavy"]:
+        print(f"\nHeavy modules imported at startup: {', '.join(result['heavy'])}")
+    else:
+        print("\nNo heavy modules imported at startup")
+
+
+def parse_args(argv=None):
+    """
+    Parse command-line arguments.
+
+    Args:
+        argv (list): Argument list to parse. Defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Measure CLI startup time with -X importtime.")
+    parser.add_argument("--runs", type=int, default=5, help="Interpreter starts (default 5)")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list (default 15)")
+    parser.add_argument("--max-ms", type=float,
+                        help="Exit with code 1 if the median wall time exceeds this")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    result = measure(runs=args.runs)
+    print_report(result, top=args.top)
+    too_slow = args.max_ms is not None and result["wall_ms"] > args.max_ms
+    if too_slow:
+        print(f"\nStartup exceeds {args.max_ms} ms")
+    sys.exit(1 if too_slow or result["heavy"] else 0)
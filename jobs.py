@@ -0,0 +1,280 @@
+"""
+BoxOne PitchDeck Insights - Job Queue Entry Point
+
+This module runs the analysis pipeline as a service: decks are submitted to
+a persistent SQLite queue and processed by a pool of long-lived worker
+processes, which load the parsers, HTTP clients and caches once instead of
+on every deck. Finished sections are checkpointed, so a deck whose worker
+crashes resumes where it stopped.
+
+Usage:
+    python jobs.py submit deck.pdf --priority 5
+    python jobs.py status 12
+    python jobs.py result 12 --wait
+    python jobs.py worker --workers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+from main import (
+    build_cache,
+    build_dedup_index,
+    compaction_options,
+    configure_transport,
+    configure_web_lookups,
+    enricher_options,
+    load_config,
+    output_formats,
+    parser_options,
+)
+from utils.enrich import FAILED_SECTION_PREFIX, Enricher
+from utils.env import load_env
+from utils.ingest import apply_memory_limit
+from utils.jobqueue import JobQueue
+from utils.metrics import Metrics
+from utils.ocr import ocr_counters
+from utils.pipeline import analyse_deck, generate_output_filename, parse_deck, source_tag
+
+
+def open_queue(config):
+    """
+    Open the job queue configured in the 'jobs' block of config.
+
+    Args:
+        config (dict): Configuration dictionary with optional job settings.
+
+    Returns:
+        JobQueue: The queue.
+    """
+    jobs_config = config.get("jobs") or {}
+    return JobQueue(
+        path=jobs_config.get("path", ".cache/jobs.sqlite"),
+        lease_seconds=jobs_config.get("lease_seconds", 120),
+        max_attempts=jobs_config.get("max_attempts", 3),
+    )
+
+
+def process_job(queue, job, config, enricher, output_dir="outputs", dedup=None):
+    """
+    Run parse, enrich and write for one claimed job.
+
+    Sections checkpointed by an earlier attempt are reused when their inputs
+    are unchanged, and every newly finished section is checkpointed.
+
+    Args:
+        queue (JobQueue): The job queue.
+        job (dict): The claimed job.
+        config (dict): Configuration dictionary.
+        enricher (Enricher): Enricher for the job's model.
+        output_dir (str): Directory for reports and their sidecars.
+        dedup (DedupIndex): Optional index of earlier decks; the analysis of
+                            a near-duplicate is reused instead of enriching.
+
+    Returns:
+        str: Path of the generated report.
+    """
+    metrics = Metrics()
+    with metrics.stage("parse"):
+        deck_data = parse_deck(job["file"], **parser_options(config))
+    metrics.add(**ocr_counters(deck_data))
+    os.makedirs(output_dir, exist_ok=True)
+    output_file = os.path.join(output_dir, generate_output_filename(job["file"], config,
+                                                                    tag=source_tag(job["file"])))
+
+    fingerprints = {}
+
+    def checkpoint(section, content):
+        # Fingerprints are known before a section is requested
+        if section in fingerprints and not content.startswith(FAILED_SECTION_PREFIX):
+            queue.checkpoint(job["id"], section, fingerprints[section], content)
+
+    analyse_deck(job["file"], deck_data, enricher, output_file, metrics,
+                 formats=output_formats(config), dedup=dedup,
+                 compact_options=compaction_options(config, job["model"]),
+                 previous=queue.checkpoint_state(job["id"]), fingerprints=fingerprints,
+                 on_section=checkpoint)
+    return output_file
+
+
+def worker_loop(config_path="config.yaml", worker_id=None, max_jobs=None):
+    """
+    Claim and process jobs until stopped (runs in a worker process).
+
+    Configuration, caches and one Enricher per model are created once and
+    reused for every job.
+
+    Args:
+        config_path (str): Path of the configuration file.
+        worker_id (str): Identifier recorded on claimed jobs. Defaults to
+                         "<host>:<pid>".
+        max_jobs (int): Exit after this many jobs. None runs forever.
+    """
+    config = load_config(config_path)
+    jobs_config = config.get("jobs") or {}
+    apply_memory_limit((config.get("ingest") or {}).get("memory_mb"))
+    configure_transport(config)
+    configure_web_lookups(config)
+    cache = build_cache(config)
+    dedup = build_dedup_index(config)
+    queue = open_queue(config)
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    caps = dict(jobs_config.get("model_concurrency") or {})
+    default_cap = caps.pop("default", None)
+    poll_interval = jobs_config.get("poll_interval", 1.0)
+    enrichers = {}
+
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        job = queue.claim(worker_id, caps, default_cap)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        # Keep the lease alive while the job runs
+        stop = threading.Event()
+        beat = threading.Thread(target=_heartbeat, args=(queue, job["id"], stop), daemon=True)
+        beat.start()
+        try:
+            if job["model"] not in enrichers:
+                enrichers[job["model"]] = Enricher(model_name=job["model"], **enricher_options(config),
+                                                   cache=cache, show_progress=False)
+            output = process_job(queue, job, config, enrichers[job["model"]],
+                                 jobs_config.get("output_dir", "outputs"), dedup)
+            queue.complete(job["id"], output)
+            print(f"[{worker_id}] job {job['id']} done: {output}")
+        except Exception as e:
+            queue.fail(job["id"], f"{type(e).__name__}: {e}")
+            print(f"[{worker_id}] job {job['id']} failed: {e}")
+        finally:
+            stop.set()
+            beat.join()
+        processed += 1
+
+
+def _heartbeat(queue, job_id, stop):
+    """
+    Refresh a job's heartbeat until ``stop`` is set.
+    """
+    interval = max(1.0, queue.lease_seconds / 3)
+    while not stop.wait(interval):
+        queue.heartbeat(job_id)
+
+
+def _spawn_worker(config_path):
+    """
+    Start one worker process running worker_loop.
+
+    Workers are not daemonic, because daemonic processes may not start the
+    process pools used to parse large decks and OCR scanned pages;
+    run_workers stops them itself.
+    """
+    process = multiprocessing.Process(target=worker_loop, args=(config_path,))
+    process.start()
+    return process
+
+
+def run_workers(workers, config_path="config.yaml"):
+    """
+    Start a pool of worker processes and restart any that exit.
+
+    Args:
+        workers (int): Number of worker processes.
+        config_path (str): Path of the configuration file.
+    """
+    # Stop the workers on SIGTERM as well as on Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    pool = [_spawn_worker(config_path) for _ in range(max(1, workers))]
+    print(f"Started {len(pool)} workers")
+    try:
+        while True:
+            time.sleep(1)
+            for i, process in enumerate(pool):
+                if not process.is_alive():
+                    # A crashed worker's job is requeued once its lease expires
+                    print(f"Worker {process.pid} exited with {process.exitcode}; restarting")
+                    pool[i] = _spawn_worker(config_path)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in pool:
+            process.terminate()
+        for process in pool:
+            process.join()
+
+
+def parse_args(argv=None):
+    """
+    Parse command-line arguments.
+
+    Args:
+        argv (list): Argument list to parse. Defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Queue pitch decks for analysis by worker processes.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser("submit", help="Queue one or more decks")
+    submit.add_argument("files", nargs="+", help="Pitch deck files")
+    submit.add_argument("--priority", type=int, default=0, help="Higher runs first (default 0)")
+    submit.add_argument("--model", help="LLM model (default: llm_model from config)")
+
+    status = commands.add_parser("status", help="Show a job, or recent jobs")
+    status.add_argument("job_id", type=int, nargs="?")
+
+    result = commands.add_parser("result", help="Print the report path of a job")
+    result.add_argument("job_id", type=int)
+    result.add_argument("--wait", action="store_true", help="Wait for the job to finish")
+    result.add_argument("--timeout", type=float, help="Maximum seconds to wait")
+
+    retry = commands.add_parser("retry", help="Requeue a failed job")
+    retry.add_argument("job_id", type=int)
+
+    worker = commands.add_parser("worker", help="Run worker processes")
+    worker.add_argument("--workers", type=int, help="Number of processes (default: jobs.workers)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    load_env()
+    config = load_config()
+    queue = open_queue(config)
+
+    if args.command == "submit":
+        model_name = args.model or config.get("llm_model", "deepseek-v3")
+        for file_path in args.files:
+            if not os.path.isfile(file_path):
+                print(f"File not found: {file_path}")
+                continue
+            print(f"Queued job {queue.submit(file_path, model_name, args.priority)}: {file_path}")
+    elif args.command == "status":
+        jobs = [queue.status(args.job_id)] if args.job_id else queue.list_jobs()
+        for job in jobs:
+            if job is None:
+                print(f"No job {args.job_id}")
+                continue
+            print(f"{job['id']:>5}  {job['status']:<8}  p{job['priority']}  {job['model']}  "
+                  f"{job['file']}  {job.get('output') or job.get('error') or ''}")
+    elif args.command == "result":
+        job = queue.result(args.job_id, wait=args.wait, timeout=args.timeout)
+        if job is None:
+            print(f"No job {args.job_id}")
+        elif job["status"] == "done":
+            print(job["output"])
+        else:
+            print(f"Job {job['id']} is {job['status']}" + (f": {job['error']}" if job["error"] else ""))
+    elif args.command == "retry":
+        queue.retry(args.job_id)
+        print(f"Requeued job {args.job_id}")
+    elif args.command == "worker":
+        queue.close()
+        run_workers(args.workers or (config.get("jobs") or {}).get("workers", 2))
@@ -5,16 +5,22 @@ This module serves as the main entry point for the pitch deck analysis applicati
 It orchestrates the parsing, enrichment, and output generation pipeline.
 """
 
-from dotenv import load_dotenv
-load_dotenv()
-import sys
+import argparse
 import os
-import yaml
-from datetime import datetime
-from utils.pdf_parser import parse_pdf
-from utils.ppt_parser import parse_ppt
+from utils.env import load_env
+from utils.pipeline import (analyse_deck, parse_deck, generate_output_filename, find_existing_output,
+                            output_extension)
 from utils.agent import Agent
-from utils.markdown_writer import write_markdown
+from utils.cache import LookupCache, ResponseCache
+from utils import web_enrich
+from utils.batch import collect_decks, run_batch
+from utils import transport
+from utils.metrics import Metrics, profiled
+from utils.compare import compare_reports
+from utils.dedup import DedupIndex
+from utils.ingest import IngestError, truncation_notice
+from utils.ocr import ocr_counters
+from utils.incremental import load_state
 
 
 def load_config(config_path="config.yaml"):
@@ -31,50 +37,289 @@ def load_config(config_path="config.yaml"):
         FileNotFoundError: If the configuration file doesn't exist.
         yaml.YAMLError: If the YAML file is malformed.
     """
+    import yaml
+
     with open(config_path, "r") as f:
         return yaml.safe_load(f)
 
 
-def generate_output_filename(input_file, config):
+def configure_transport(config):
+    """
+    Configure the shared HTTP client from the 'http' block in config.
+    
+    Args:
+        config (dict): Configuration dictionary with optional HTTP settings.
+        
+    Returns:
+        HttpClient: The configured shared client.
+    """
+    http_config = config.get("http") or {}
+    return transport.configure(
+        timeout=(http_config.get("connect_timeout", 10), http_config.get("read_timeout", 60)),
+        max_retries=http_config.get("max_retries", 3),
+        backoff_base=http_config.get("backoff_base", 0.5),
+        backoff_max=http_config.get("backoff_max", 30),
+        rate_limits=http_config.get("rate_limits"),
+        pool_size=http_config.get("pool_size", 16),
+    )
+
+
+def output_formats(config):
     """
-    Generate a unique output filename based on input file and timestamp.
+    Read the report formats from the 'output_formats' list in config.
     
     Args:
-        input_file (str): Path to the input pitch deck file.
-        config (dict): Configuration dictionary with output file settings.
+        config (dict): Configuration dictionary.
         
     Returns:
-        str: Generated output filename with timestamp.
+        list: Output format names for write_outputs. Markdown is always
+              included, as the metrics, state and enriched JSON files are
+              named after the markdown report.
+    """
+    formats = list(config.get("output_formats") or ["markdown", "json"])
+    if "markdown" not in formats:
+        formats.insert(0, "markdown")
+    return formats
+
+
+def parser_options(config):
+    """
+    Build parse_deck keyword arguments from the 'parser' block in config.
+    
+    Args:
+        config (dict): Configuration dictionary with optional parser settings.
+        
+    Returns:
+        dict: Keyword arguments for parse_deck.
+    """
+    parser_config = config.get("parser") or {}
+    return {
+        "workers": parser_config.get("workers", 1),
+        "parallel_threshold": parser_config.get("parallel_threshold", 100),
+        "ocr": ocr_options(config),
+        "limits": ingest_options(config),
+    }
+
+
+def ingest_options(config):
+    """
+    Build parse_guarded keyword arguments from the 'ingest' block in config.
+    
+    Args:
+        config (dict): Configuration dictionary with optional ingestion limits.
+        
+    Returns:
+        dict or None: Keyword arguments for parse_guarded, or None if decks
+                      are parsed without limits.
+    """
+    ingest_config = config.get("ingest") or {}
+    if not ingest_config.get("enabled", True):
+        return None
+    return {
+        "max_file_mb": ingest_config.get("max_file_mb", 512),
+        "max_pages": ingest_config.get("max_pages", 300),
+        "time_seconds": ingest_config.get("time_seconds", 120),
+        "fallback_pages": ingest_config.get("fallback_pages", 30),
+        "max_xml_mb": ingest_config.get("max_xml_mb", 256),
+        "strip_media": ingest_config.get("strip_media", True),
+    }
+
+
+def ocr_options(config):
     """
-    # Get base filename without extension
-    base_name = os.path.splitext(os.path.basename(input_file))[0]
+    Build ocr_pages keyword arguments from the 'ocr' block in config.
     
-    # Generate timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    Args:
+        config (dict): Configuration dictionary with optional OCR settings.
+        
+    Returns:
+        dict or None: Keyword arguments for ocr_pages, or None if the OCR
+                      fallback is disabled.
+    """
+    ocr_config = config.get("ocr") or {}
+    if not ocr_config.get("enabled", True):
+        return None
+    return {
+        "min_chars": ocr_config.get("min_chars", 20),
+        "workers": ocr_config.get("workers"),
+        "budget_seconds": ocr_config.get("budget_seconds", 60),
+        "dpi": ocr_config.get("dpi", 200),
+        "lang": ocr_config.get("lang", "eng"),
+        "cache_path": ocr_config.get("cache_path", ".cache/ocr.sqlite"),
+    }
+
+
+def compaction_options(config, model_name):
+    """
+    Build compact_deck keyword arguments from the 'compaction' block in config.
     
-    # Get output file extension from config or default to .md
-    output_file = config.get("output_file", "output.md")
-    file_ext = os.path.splitext(output_file)[1] or ".md"
+    Args:
+        config (dict): Configuration dictionary with optional compaction settings.
+        model_name (str): Model the deck is prompted with; selects the budget.
+        
+    Returns:
+        dict or None: Keyword arguments for compact_deck, or None if
+                      compaction is disabled.
+    """
+    compaction_config = config.get("compaction") or {}
+    if not compaction_config.get("enabled", True):
+        return None
+    budgets = compaction_config.get("model_budgets") or {}
+    return {
+        "token_budget": budgets.get(model_name, compaction_config.get("default_budget", 24000)),
+        "min_fraction": compaction_config.get("repeated_line_fraction", 0.5),
+    }
+
+
+def enricher_options(config):
+    """
+    Build Enricher keyword arguments from configuration.
     
-    # Create unique filename
-    unique_filename = f"{base_name}_{timestamp}{file_ext}"
+    Args:
+        config (dict): Configuration dictionary with enrichment settings.
+        
+    Returns:
+        dict: Keyword arguments forwarded to Agent/Enricher.
+    """
+    context_config = config.get("context") or {}
+    return {
+        "max_concurrency": config.get("max_concurrency", 1),
+        "context_mode": context_config.get("mode", "full"),
+        "retrieval_top_k": context_config.get("top_k", 6),
+        "section_budgets": context_config.get("section_budgets"),
+        "default_section_budget": context_config.get("default_budget", 1500),
+        "generation_mode": config.get("generation_mode", "sections"),
+        "fused_groups": config.get("fused_groups"),
+        "offline_sections": config.get("offline_sections"),
+        "name_heuristic": config.get("name_heuristic", True),
+        "stream": config.get("stream", False),
+        "api_url": config.get("api_url"),
+        "routing": routing_options(config),
+        "cache_control_models": (config.get("prompt_cache") or {}).get("cache_control_models"),
+        "prime_prompt_cache": (config.get("prompt_cache") or {}).get("prime", False),
+    }
+
+
+def routing_options(config):
+    """
+    Build ModelRouter keyword arguments from the 'routing' block in config.
     
-    return unique_filename
+    Args:
+        config (dict): Configuration dictionary with optional routing settings.
+        
+    Returns:
+        dict: Keyword arguments for ModelRouter (without the default model).
+    """
+    routing_config = config.get("routing") or {}
+    return {
+        "section_models": routing_config.get("section_models"),
+        "fallback_models": routing_config.get("fallback_models"),
+        "hedge": routing_config.get("hedge", False),
+        "hedge_quantile": routing_config.get("hedge_quantile", 0.95),
+        "hedge_initial_delay": routing_config.get("hedge_initial_delay", 20),
+        "hedge_min_delay": routing_config.get("hedge_min_delay", 1),
+        "hedge_min_samples": routing_config.get("hedge_min_samples", 10),
+        "breaker_failures": routing_config.get("breaker_failures", 3),
+        "breaker_reset_seconds": routing_config.get("breaker_reset_seconds", 60),
+    }
 
 
-def main(file_path, config):
+def configure_web_lookups(config, no_cache=False):
+    """
+    Configure the DuckDuckGo lookup cache from the 'web' block in config.
+    
+    Args:
+        config (dict): Configuration dictionary with optional web settings.
+        no_cache (bool): If True, lookups are not cached.
+    """
+    web_config = config.get("web") or {}
+    cache = None
+    if not no_cache and web_config.get("cache_enabled", True):
+        cache = LookupCache(web_config.get("cache_path", ".cache/web_cache.sqlite"))
+    web_enrich.configure(
+        cache=cache,
+        profile_ttl_hours=web_config.get("profile_ttl_hours", 168),
+        news_ttl_hours=web_config.get("news_ttl_hours", 6),
+        parser=web_config.get("parser", "regex"),
+        search_url=web_config.get("search_url"),
+    )
+
+
+def build_cache(config, no_cache=False):
+    """
+    Create the persistent LLM response cache from configuration.
+    
+    Args:
+        config (dict): Configuration dictionary with an optional 'cache' block.
+        no_cache (bool): If True, caching is disabled regardless of config.
+        
+    Returns:
+        ResponseCache or None: The cache instance, or None if disabled.
+    """
+    cache_config = config.get("cache") or {}
+    if no_cache or not cache_config.get("enabled", True):
+        return None
+    return ResponseCache(
+        path=cache_config.get("path", ".cache/llm_cache.sqlite"),
+        max_age_days=cache_config.get("max_age_days", 30),
+        max_entries=cache_config.get("max_entries", 10000),
+        evict_every=cache_config.get("evict_every", 100),
+    )
+
+
+def build_dedup_index(config, no_dedup=False):
+    """
+    Open the near-duplicate deck index from the 'dedup' block in config.
+    
+    Args:
+        config (dict): Configuration dictionary with optional dedup settings.
+        no_dedup (bool): If True, deduplication is disabled regardless of config.
+        
+    Returns:
+        DedupIndex or None: The index, or None if disabled.
+    """
+    dedup_config = config.get("dedup") or {}
+    if no_dedup or not dedup_config.get("enabled", True):
+        return None
+    return DedupIndex(
+        path=dedup_config.get("path", ".cache/dedup.sqlite"),
+        threshold=dedup_config.get("threshold", 0.9),
+        num_perm=dedup_config.get("num_perm", 128),
+        shingle_size=dedup_config.get("shingle_size", 5),
+        min_shingles=dedup_config.get("min_shingles", 32),
+    )
+
+
+def main(file_path, config, cache=None, refresh=False, previous_path=None, dedup=None):
     """
     Main processing pipeline for pitch deck analysis.
     
-    This function orchestrates the complete workflow:
+    This function orchestrates the complete workflow (steps 2-6 are run by
+    utils.pipeline.analyse_deck, shared with batch runs and job workers):
     1. Validates input file existence and format
-    2. Parses the pitch deck (PDF or PPT/PPTX)
-    3. Enriches the data using AI analysis
-    4. Generates markdown output with unique filename
+    2. Parses the pitch deck (PDF or PPT/PPTX); if a near-duplicate from
+       another file was analysed before, its analysis is reused instead of
+       enriching the deck. Otherwise the text is compacted to the model's
+       token budget
+    3. Enriches the data using AI analysis, appending each section to a
+       partial output file as soon as it is ready
+    4. Atomically writes the final markdown output with unique filename
+    5. Writes a JSON metrics sidecar with stage timings and token counts,
+       and the enriched sections as JSON for cross-deck comparisons
+    6. Writes a JSON state file so a revised deck only regenerates the
+       sections whose inputs changed
     
     Args:
         file_path (str): Path to the pitch deck file to analyze.
         config (dict): Configuration dictionary with model and output settings.
+        cache (ResponseCache): Optional persistent cache for LLM completions.
+        refresh (bool): Bypass cached completions and store fresh ones.
+        previous_path (str): Report or state file of an earlier analysis to
+                             reuse unchanged sections from. Defaults to the
+                             latest report for the same file name, if any.
+        dedup (DedupIndex): Optional index of earlier decks; the analysis of
+                            a near-duplicate from another file is reused
+                            instead of enriching the deck again.
         
     Returns:
         None: Output is written to file and status printed to console.
@@ -87,30 +332,184 @@ def main(file_path, config):
         print(f"File not found: {file_path}")
         return
     
+    metrics = Metrics()
+    
     # Parse pitch deck based on file format
-    if file_path.lower().endswith('.pdf'):
-        deck_data = parse_pdf(file_path)
-    elif file_path.lower().endswith(('.ppt', '.pptx')):
-        deck_data = parse_ppt(file_path)
-    else:
+    try:
+        with metrics.stage("parse"):
+            deck_data = parse_deck(file_path, **parser_options(config))
+    except ValueError:
         print("Unsupported file format.")
         return
+    except IngestError as e:
+        print(f"Deck rejected: {e}")
+        return
+    metrics.add(**ocr_counters(deck_data))
+    notice = truncation_notice(deck_data)
+    if notice:
+        print(notice)
     
-    # Initialize AI agent and enrich the pitch deck data
-    agent = Agent(model_name=model_name)
-    enriched = agent.enrich_company_info(deck_data)
+    # Load the previous analysis, if any, to reuse its unchanged sections
+    previous_path = previous_path or find_existing_output(file_path, ".", config)
+    previous = load_state(previous_path) if previous_path and not refresh else None
+    if previous:
+        print(f"Previous analysis: {previous_path}")
     
     # Generate unique output filename
     output_file = generate_output_filename(file_path, config)
     
-    # Generate markdown output
-    write_markdown(enriched, output_file)
+    # Reuse a near-duplicate's analysis, or compact and enrich the deck while
+    # writing sections as they finish, then write every output format and sidecar
+    agent = Agent(model_name=model_name, **enricher_options(config),
+                  cache=cache, refresh=refresh)
+    analyse_deck(file_path, deck_data, agent.enricher, output_file, metrics,
+                 formats=output_formats(config), dedup=dedup, reuse_duplicates=not refresh,
+                 compact_options=compaction_options(config, model_name), previous=previous,
+                 partial=True, verbose=True)
     print(f"Output generated: {output_file}")
+    if "cached_tokens" in metrics.counters:
+        print(f"Prompt cache: {metrics.counters['cached_tokens']} of "
+              f"{metrics.counters['prompt_tokens']} prompt tokens served from the provider cache")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses")
+
+
+def main_batch(target, config, cache=None, refresh=False, output_dir=None, resume=True,
+               dedup=None):
+    """
+    Batch processing pipeline for a directory or glob of pitch decks.
+    
+    Decks are parsed in a process pool and enriched in a bounded thread pool
+    that reuses one shared Enricher. Decks that already have an output in the
+    output directory are skipped, so an interrupted batch can be re-run.
+    
+    Args:
+        target (str): Directory or glob pattern selecting the decks.
+        config (dict): Configuration dictionary with model, batch and output settings.
+        cache (ResponseCache): Optional persistent cache for LLM completions.
+        refresh (bool): Bypass cached completions and store fresh ones.
+        output_dir (str): Directory for outputs and the manifest. Defaults to
+                         the 'output_dir' batch setting in config.
+        resume (bool): Skip decks that already have outputs. Defaults to True.
+        dedup (DedupIndex): Optional index of earlier decks whose analyses
+                            are reused for near-duplicates.
+        
+    Returns:
+        None: Outputs and a manifest are written and a summary is printed.
+    """
+    batch_config = config.get("batch") or {}
+    files = collect_decks(target)
+    if not files:
+        print(f"No pitch decks found for: {target}")
+        return
+    
+    output_dir = output_dir or batch_config.get("output_dir", "outputs")
+    agent = Agent(model_name=config.get("llm_model", "deepseek-v3"), **enricher_options(config),
+                  cache=cache, refresh=refresh, show_progress=False)
+    manifest = run_batch(
+        files, agent.enricher, config,
+        output_dir=output_dir,
+        parse_workers=batch_config.get("parse_workers"),
+        enrich_workers=batch_config.get("enrich_workers", 4),
+        resume=resume,
+        parse_options=parser_options(config),
+        compact_options=compaction_options(config, config.get("llm_model", "deepseek-v3")),
+        dedup=dedup,
+        reuse_duplicates=not refresh,
+        memory_mb=(config.get("ingest") or {}).get("memory_mb"),
+        formats=output_formats(config),
+        jsonl_name=batch_config.get("jsonl", "results.jsonl"),
+    )
+    totals = manifest["totals"]
+    print(f"Batch finished: {totals['ok']} ok ({totals['duplicates']} reused from near-duplicates), "
+          f"{totals['partial']} partial, {totals['skipped']} skipped, {totals['failed']} failed "
+          f"in {totals['wall_seconds']}s (manifest in {output_dir})")
+    if batch_config.get("compare", True):
+        main_compare(output_dir, config)
+    if cache is not None:
+        stats = cache.stats()
+        print(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses")
+
+
+def main_compare(output_dir, config=None):
+    """
+    Rank the decks already analysed in a directory side by side.
+    
+    Scores and key metrics are read from the enriched JSON (or state file)
+    of every report, so no LLM calls are made.
+    
+    Args:
+        output_dir (str): Directory holding the reports.
+        config (dict): Configuration whose 'output_file' sets the report
+                       extension. Defaults to ".md" reports.
+        
+    Returns:
+        None: comparison.md and comparison.json are written to ``output_dir``.
+    """
+    comparison = compare_reports(output_dir, report_ext=output_extension(config or {}))
+    print(f"Compared {len(comparison['decks'])} decks: "
+          f"{os.path.join(output_dir, 'comparison.md')}")
+
+
+def parse_args(argv=None):
+    """
+    Parse command-line arguments.
+    
+    Args:
+        argv (list): Argument list to parse. Defaults to sys.argv[1:].
+        
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Analyze a pitch deck (PDF, PPT or PPTX).",
+        epilog="Check config.yaml to set defaults (model, output file, cache).",
+    )
+    parser.add_argument("file", nargs="?", help="Path to the pitch deck file")
+    parser.add_argument("--batch", metavar="DIR_OR_GLOB",
+                        help="Analyze every deck in a directory or matching a glob pattern")
+    parser.add_argument("--output-dir", help="Output directory for batch runs")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="In batch mode, re-analyze decks that already have outputs")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Disable the persistent LLM response and web lookup caches")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="Analyze decks even if a near-duplicate was analyzed before")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ignore cached LLM responses and store fresh ones")
+    parser.add_argument("--previous", metavar="REPORT",
+                        help="Earlier report (or .state.json) of this deck; only sections "
+                             "whose inputs changed are regenerated")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="Run under cProfile and write the stats to PATH")
+    parser.add_argument("--compare", metavar="DIR",
+                        help="Rank the decks already analysed in DIR side by side "
+                             "(no LLM calls) and write DIR/comparison.md")
+    args = parser.parse_args(argv)
+    if not args.file and not args.batch and not args.compare:
+        parser.error("either a pitch deck file, --batch or --compare is required")
+    return args
+
 
 if __name__ == "__main__":
-    config = load_config()
-    if len(sys.argv) != 2:
-        print("Usage: python main.py <pitchdeck.pdf|ppt|pptx>")
-        print("Check config.yaml to set defaults (model, output file).")
+    args = parse_args()
+    if args.compare and not (args.file or args.batch):
+        # Comparing existing reports needs no API access, and the configuration only if present
+        main_compare(args.compare, load_config() if os.path.exists("config.yaml") else None)
     else:
-        main(sys.argv[1], config)
+        load_env()
+        config = load_config()
+        configure_transport(config)
+        configure_web_lookups(config, no_cache=args.no_cache)
+        cache = build_cache(config, no_cache=args.no_cache)
+        dedup = build_dedup_index(config, no_dedup=args.no_dedup)
+        with profiled(args.profile):
+            if args.batch:
+                main_batch(args.batch, config, cache=cache, refresh=args.refresh,
+                           output_dir=args.output_dir, resume=not args.no_resume, dedup=dedup)
+            else:
+                main(args.file, config, cache=cache, refresh=args.refresh,
+                     previous_path=args.previous, dedup=dedup)
+        if args.compare:
+            main_compare(args.compare, config)
@@ -0,0 +1,93 @@
+"""
+Test module for the async agent API.
+
+This module contains unit tests for AsyncEnricher and the async parse/write
+helpers, using an httpx mock transport instead of the network.
+"""
+
+import asyncio
+import json
+
+import httpx
+
+from utils.async_agent import AsyncAgent, aparse, awrite
+from utils.enrich import SECTIONS
+
+
+def _mock_client(calls):
+    """
+    Build an AsyncClient answering OpenRouter and DuckDuckGo requests locally.
+    """
+    def handler(request):
+        calls.append(request.url.host)
+        if request.url.host == "html.duckduckgo.com":
+            return httpx.Response(200, text='<a class="result__a" href="/">Acme news</a>')
+        content = json.loads(request.content)["messages"][-1]["content"]
+        # Section prompts end with the instruction, after the shared context
+        prompt = content if isinstance(content, str) else content[-1]["text"]
+        if prompt.startswith("Extract the full company name"):
+            answer = "Acme Corp"
+        else:
+            answer = prompt.split("\n")[0]
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": answer}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 2},
+        })
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_async_enrich_matches_section_order():
+    """
+    Test that aenrich returns every section in canonical order.
+    """
+    calls = []
+
+    async def run():
+        async with AsyncAgent(api_key="sk-demo", client=_mock_client(calls), max_concurrency=4) as agent:
+            return await agent.enrich_company_info({"raw_text": "Acme Corp builds flying taxis."})
+
+    response = asyncio.run(run())
+    assert list(response) == ["Company Name"] + [name for name, _ in SECTIONS]
+    assert response["Company Name"] == "Acme Corp"
+    assert response["Team"].startswith("Summarize team")
+    assert calls.count("html.duckduckgo.com") == 2
+    assert calls.count("openrouter.ai") == len(SECTIONS) + 1
+
+
+def test_aparse_and_awrite(tmp_path):
+    """
+    Test that parsing and writing can be awaited.
+    """
+    async def run():
+        deck = await aparse("tests/sample_pdf.pdf")
+        await awrite({"Summary": deck["raw_text"][:10]}, str(tmp_path / "out.md"))
+
+    asyncio.run(run())
+    assert (tmp_path / "out.md").read_text().startswith("# Summary")
+
+
+def test_failed_name_extraction_cancels_started_sections():
+    """
+    Test that deck-only sections already in flight are cancelled, not
+    left running, when the company name request fails.
+    """
+    async def handler(request):
+        content = json.loads(request.content)["messages"][-1]["content"]
+        prompt = content if isinstance(content, str) else content[-1]["text"]
+        if prompt.startswith("Extract the full company name"):
+            return httpx.Response(400, json={"error": "bad request"})
+        await asyncio.sleep(30)
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with AsyncAgent(api_key="sk-demo", client=client, name_heuristic=False) as agent:
+            try:
+                await agent.enrich_company_info({"raw_text": "We build flying taxis."})
+            except httpx.HTTPStatusError:
+                pass
+            else:
+                raise AssertionError("name extraction did not fail")
+            return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
@@ -0,0 +1,114 @@
+"""
+Test module for the batch processing pipeline.
+
+This module contains unit tests for collect_decks and run_batch, using a
+stub enricher so that no API calls are made.
+"""
+
+import json
+import shutil
+
+from utils.batch import collect_decks, run_batch
+from utils.pipeline import source_tag
+
+
+class StubEnricher:
+    """
+    Minimal enricher returning a fixed analysis for every deck.
+    """
+
+    model_name = "stub-model"
+
+    def enrich(self, deck_data, metrics=None, previous=None, fingerprints=None):
+        return {"Company Name": "Acme", "Executive Summary": deck_data["raw_text"][:20]}
+
+
+def test_collect_decks(tmp_path):
+    """
+    Test that only supported deck files are collected from a directory.
+    """
+    for name in ("a.pdf", "b.PPTX", "notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    files = collect_decks(str(tmp_path))
+    assert [f.rsplit("/", 1)[-1] for f in files] == ["a.pdf", "b.PPTX"]
+
+
+def test_run_batch_writes_manifest_and_resumes(tmp_path):
+    """
+    Test that a batch writes outputs and a manifest, then skips them on re-run.
+    """
+    decks = tmp_path / "decks"
+    decks.mkdir()
+    shutil.copy("tests/sample_pdf.pdf", decks / "deck.pdf")
+    (decks / "broken.pdf").write_bytes(b"not a pdf")
+    out = tmp_path / "out"
+    config = {"output_file": "output.md"}
+
+    files = collect_decks(str(decks))
+    manifest = run_batch(files, StubEnricher(), config, output_dir=str(out), parse_workers=2)
+    statuses = {d["file"].rsplit("/", 1)[-1]: d["status"] for d in manifest["decks"]}
+    assert statuses == {"broken.pdf": "failed", "deck.pdf": "ok"}
+    assert json.loads((out / "batch_manifest.json").read_text())["totals"]["ok"] == 1
+
+    manifest = run_batch(files, StubEnricher(), config, output_dir=str(out), parse_workers=2)
+    statuses = {d["file"].rsplit("/", 1)[-1]: d["status"] for d in manifest["decks"]}
+    assert statuses["deck.pdf"] == "skipped"
+
+
+def test_decks_with_failed_sections_are_not_resumed(tmp_path):
+    """
+    Decks whose sections failed are flagged in the manifest and analysed
+    again by the next run instead of being skipped.
+    """
+    from utils.enrich import FAILED_SECTION_PREFIX
+
+    class FailingEnricher(StubEnricher):
+        team = f"{FAILED_SECTION_PREFIX} 503_"
+
+        def enrich(self, deck_data, metrics=None, previous=None, fingerprints=None):
+            return {"Company Name": "Acme", "Executive Summary": f"{FAILED_SECTION_PREFIX} 503_",
+                    "Team": self.team}
+
+    shutil.copy("tests/sample_pdf.pdf", tmp_path / "deck.pdf")
+    files = [str(tmp_path / "deck.pdf")]
+    out = str(tmp_path / "out")
+    config = {"output_file": "output.md"}
+
+    manifest = run_batch(files, FailingEnricher(), config, output_dir=out, parse_workers=1)
+    assert manifest["decks"][0]["status"] == "failed"
+    assert manifest["decks"][0]["failed_sections"] == ["Executive Summary", "Team"]
+    assert manifest["totals"]["failed"] == 1
+    with open(tmp_path / "out" / "batch_manifest.json", encoding="utf-8") as f:
+        assert json.load(f)["totals"]["failed"] == 1
+
+    FailingEnricher.team = "Founders"
+    manifest = run_batch(files, FailingEnricher(), config, output_dir=out, parse_workers=1)
+    assert manifest["decks"][0]["status"] == "partial"
+    assert manifest["decks"][0]["failed_sections"] == ["Executive Summary"]
+
+    manifest = run_batch(files, StubEnricher(), config, output_dir=out, parse_workers=1)
+    assert manifest["decks"][0]["status"] == "ok"
+
+
+def test_same_named_decks_in_different_folders_get_own_outputs(tmp_path):
+    """
+    Decks sharing a file name in different folders are written to distinct
+    outputs and each is resumed from its own output.
+    """
+    for folder in ("a", "b"):
+        (tmp_path / "decks" / folder).mkdir(parents=True)
+        shutil.copy("tests/sample_pdf.pdf", tmp_path / "decks" / folder / "deck.pdf")
+    out = tmp_path / "out"
+    config = {"output_file": "output.md"}
+
+    files = collect_decks(str(tmp_path / "decks" / "**" / "*.pdf"))
+    manifest = run_batch(files, StubEnricher(), config, output_dir=str(out), parse_workers=1)
+    outputs = [d["output"] for d in manifest["decks"]]
+    assert [d["status"] for d in manifest["decks"]] == ["ok", "ok"]
+    assert len(set(outputs)) == 2 and len(list(out.glob("deck_*.md"))) == 2
+
+    manifest = run_batch(files, StubEnricher(), config, output_dir=str(out), parse_workers=1)
+    assert [d["status"] for d in manifest["decks"]] == ["skipped", "skipped"]
+    assert [d["output"] for d in manifest["decks"]] == outputs
+    # Decks differing only in their extension are told apart as well
+    assert source_tag(files[0]) != source_tag(files[0][:-len(".pdf")] + ".pptx")
@@ -0,0 +1,58 @@
+"""
+Test module for the offline benchmark tooling.
+
+This module runs the Enricher against the local OpenRouter/DuckDuckGo
+stand-in and checks that the synthetic decks can be parsed.
+"""
+
+from benchmarks.decks import write_pdf, write_pptx
+from benchmarks.mock_server import MockServer, MockSettings
+from benchmarks.startup import measure
+from utils import web_enrich
+from utils.enrich import SECTIONS, Enricher
+from utils.pdf_parser import parse_pdf
+from utils.ppt_parser import parse_ppt
+from utils.transport import HttpClient
+
+
+def test_synthetic_decks_parse(tmp_path):
+    """
+    Generated PDF and PPTX decks have the requested number of pages/slides.
+    """
+    pdf = parse_pdf(write_pdf(str(tmp_path / "deck.pdf"), pages=4))
+    pptx = parse_ppt(write_pptx(str(tmp_path / "deck.pptx"), slides=6))
+
+    assert len(pdf["pages"]) == 4 and "Acme Robotics" in pdf["raw_text"]
+    assert len(pptx["slides"]) == 6 and pptx["slides"][5]["tables"]
+
+
+def test_enrich_against_mock_server(monkeypatch, tmp_path):
+    """
+    A full enrichment runs over HTTP against the mock server, retrying
+    injected 429s, in both streamed and fused modes.
+    """
+    settings = MockSettings(latency=0, jitter=0, search_latency=0, error_rate=0.2, seed=1)
+    deck = parse_pdf(write_pdf(str(tmp_path / "deck.pdf"), pages=3))
+    with MockServer(settings) as server:
+        monkeypatch.setitem(web_enrich._settings, "search_url", server.search_url)
+        monkeypatch.setitem(web_enrich._settings, "cache", None)
+        client = HttpClient(max_retries=10, backoff_base=0.001, backoff_max=0.01)
+        for options in ({"stream": True}, {"generation_mode": "fused"}):
+            enricher = Enricher(api_key="sk-demo", api_url=server.completions_url,
+                                http_client=client, show_progress=False, max_concurrency=4,
+                                **options)
+            response = enricher.enrich(deck)
+
+            assert response["Company Name"] == "Acme Robotics"
+            assert all(response[name] and "failed" not in response[name] for name, _ in SECTIONS)
+        assert server.counts["rate_limited"] > 0
+
+
+def test_cli_startup_is_lazy():
+    """
+    Starting the CLI does not import parser, HTTP or NumPy dependencies.
+    """
+    result = measure(runs=1)
+
+    assert result["heavy"] == []
+    assert "utils.enrich" in result["imports"]
@@ -0,0 +1,47 @@
+"""
+Test module for the LLM response cache.
+
+This module contains unit tests for the ResponseCache class, verifying
+lookups, hit/miss accounting and eviction behaviour.
+"""
+
+from utils.cache import ResponseCache
+
+
+def test_cache_roundtrip(tmp_path):
+    """
+    Test that stored completions are returned for the same model and prompt.
+    """
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite"))
+    assert cache.get("model-a", "prompt") is None
+    cache.set("model-a", "prompt", "answer")
+
+    assert cache.get("model-a", "prompt") == "answer"
+    assert cache.get("model-b", "prompt") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2 and stats["entries"] == 1
+
+
+def test_cache_eviction(tmp_path):
+    """
+    Test that the cache is trimmed to its maximum number of entries.
+    """
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite"), max_entries=2)
+    for i in range(4):
+        cache.set("model", f"prompt {i}", f"answer {i}")
+
+    assert cache.evict() == 2
+    assert cache.stats()["entries"] == 2
+    assert cache.get("model", "prompt 3") == "answer 3"
+
+
+def test_cache_evicts_while_in_use(tmp_path):
+    """
+    Test that inserts keep an open cache within its maximum number of entries.
+    """
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite"), max_entries=2, evict_every=1)
+    for i in range(5):
+        cache.set("model", f"prompt {i}", f"answer {i}")
+
+    assert cache.stats()["entries"] == 2
+    assert cache.get("model", "prompt 4") == "answer 4"
@@ -0,0 +1,62 @@
+"""
+Test module for the deck compaction functionality.
+
+This module contains unit tests for boilerplate removal, whitespace
+normalisation and token budget fitting.
+"""
+
+from utils.compaction import TRUNCATION_MARKER, compact_deck, fit_to_budget, head_within_budget
+from utils.pdf_parser import page_text
+from utils.retrieval import estimate_tokens
+
+
+def _deck(texts):
+    """
+    Build PDF-style deck data from page texts.
+    """
+    pages = [{"page": i, "text": text, "chars": len(text)} for i, text in enumerate(texts, 1)]
+    return {"source": "pdf", "raw_text": "".join(t + "\n" for t in texts), "pages": pages}
+
+
+def test_compact_deck_removes_boilerplate():
+    """
+    Repeated footers are kept once, page numbers and whitespace runs are
+    dropped, and duplicate pages are emptied.
+    """
+    deck = _deck([
+        "Acme Robotics\nConfidential | Page 1\n1",
+        "Market   is   huge\n\n\nConfidential | Page 2\n2 / 4",
+        "Team of experts\nConfidential | Page 3\nPage 3",
+        "Team of experts\nConfidential | Page 4",
+    ])
+    compacted = compact_deck(deck)
+
+    assert [page_text(compacted, p) for p in compacted["pages"]] == [
+        "Acme Robotics\nConfidential | Page 1", "Market is huge", "Team of experts", ""]
+    assert compacted["raw_text"] == "Acme Robotics\nConfidential | Page 1\nMarket is huge\nTeam of experts\n"
+    assert [p["page"] for p in compacted["pages"]] == [1, 2, 3, 4]
+
+
+def test_fit_to_budget_keeps_every_page():
+    """
+    Long pages are cut to their share while short pages stay intact.
+    """
+    short = "Seed round of 2M"
+    long = "\n".join(f"Metric line {i} with growth figures" for i in range(200))
+    fitted = fit_to_budget([short, long, long], 300)
+
+    assert fitted[0] == short
+    assert all(text.endswith(TRUNCATION_MARKER) for text in fitted[1:])
+    assert sum(estimate_tokens(text) for text in fitted) <= 300 + len(fitted)
+
+
+def test_head_within_budget_cuts_at_line_boundary():
+    """
+    The name prompt excerpt ends on a whole line within the budget.
+    """
+    text = "Acme Robotics\n" + "\n".join(["warehouse automation for retailers"] * 100)
+    head = head_within_budget(text, 50)
+
+    assert head.startswith("Acme Robotics\n")
+    assert text.startswith(head + "\n")
+    assert estimate_tokens(head) <= 50 + 1
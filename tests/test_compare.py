@@ -0,0 +1,104 @@
+"""
+Test module for the cross-deck comparison.
+
+This module builds comparisons from enriched JSON and state files written
+to a temporary directory; no LLM calls are involved.
+"""
+
+import json
+import math
+
+from utils.compare import (
+    compare_reports,
+    enriched_path,
+    extract_metrics,
+    extract_scores,
+    find_reports,
+    load_enriched,
+    save_enriched,
+)
+from utils.incremental import save_state, state_path
+
+
+def _deck(name, scores, traction="", funding=""):
+    """
+    Build an enriched dict with the given score line and metric sections.
+    """
+    return {
+        "Company Name": name,
+        "AI Investment Signal Score": scores,
+        "Traction & Metrics": traction,
+        "Funding & Financials": funding,
+    }
+
+
+def test_extract_scores_formats():
+    """
+    Scores are read from bold, table and "out of 10" notations, preferring
+    explicit "/10" values over other numbers near the dimension name.
+    """
+    text = ("- **Product: 8/10** - strong team of 5\n"
+            "- **Team** - 7 out of 10\n"
+            "| Market | 6 | large TAM |\n")
+
+    scores = extract_scores(text)
+    assert scores[:3] == [8.0, 7.0, 6.0]
+    assert math.isnan(scores[3])
+
+
+def test_extract_metrics():
+    """
+    Raise, annualised revenue, growth and customer counts are extracted.
+    """
+    enriched = _deck("Acme", "", traction="- MRR of $45k, growing 20% MoM\n- 1,200 paying customers",
+                     funding="Raising a $2.5M seed round at a $12M valuation")
+
+    assert extract_metrics(enriched) == [2.5e6, 540000.0, 20.0, 1200.0]
+
+
+def test_compare_reports_ranks_and_summarises(tmp_path):
+    """
+    Decks are ranked by their mean score, unscored decks last, and older
+    reports with only a state file are included.
+    """
+    save_enriched(_deck("Low", "Product: 4/10 Team: 5/10 Market: 3/10 Investment Fit: 4/10"),
+                  enriched_path(str(tmp_path / "low.md")))
+    save_enriched(_deck("High", "Product: 9/10 Team: 8/10 Market: 9/10 Investment Fit: 8/10",
+                        funding="Raising $3M"),
+                  enriched_path(str(tmp_path / "high.md")))
+    save_enriched(_deck("Unscored", "No scores given"), enriched_path(str(tmp_path / "none.md")))
+    save_state(state_path(str(tmp_path / "old.md")), {
+        "company_name": "Old",
+        "sections": {"AI Investment Signal Score": {"fingerprint": "x",
+                                                    "content": "Product: 6/10 Team: 6/10"}},
+    })
+
+    assert len(find_reports(str(tmp_path))) == 4
+    assert load_enriched(str(tmp_path / "old.md"))["Company Name"] == "Old"
+
+    result = compare_reports(str(tmp_path))
+    assert [d["company"] for d in result["decks"]] == ["High", "Old", "Low", "Unscored"]
+    assert result["decks"][0]["overall"] == 8.5 and result["decks"][0]["percentile"] == 100.0
+    assert result["decks"][3]["overall"] is None
+    assert result["stats"]["Product"]["count"] == 3 and result["stats"]["Product"]["median"] == 6.0
+    assert result["stats"]["Raise (USD)"]["max"] == 3e6
+    assert result["stats"]["Customers"]["mean"] is None
+
+    markdown = (tmp_path / "comparison.md").read_text(encoding="utf-8")
+    assert "| 1 | High | 8.5 |" in markdown and "$3M" in markdown
+    assert json.loads((tmp_path / "comparison.json").read_text(encoding="utf-8")) == result
+
+
+def test_reports_with_other_extensions_are_compared(tmp_path):
+    """
+    Reports written with another 'output_file' extension are loaded from
+    their state file and listed under their own name.
+    """
+    save_state(state_path(str(tmp_path / "old.txt")), {
+        "company_name": "Old",
+        "sections": {"AI Investment Signal Score": {"fingerprint": "x", "content": "Product: 6/10"}},
+    })
+
+    assert load_enriched(str(tmp_path / "old.txt"))["Company Name"] == "Old"
+    result = compare_reports(str(tmp_path), report_ext=".txt")
+    assert result["decks"][0]["report"] == str(tmp_path / "old.txt")
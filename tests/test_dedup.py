@@ -0,0 +1,178 @@
+"""
+Test module for near-duplicate deck detection.
+
+This module checks MinHash similarity estimates, the persistent LSH index
+and the reuse of earlier analyses in batch runs, using a stub enricher.
+"""
+
+import os
+import random
+import shutil
+
+from utils.batch import run_batch
+from utils.dedup import DedupIndex, MinHasher, find_reusable, lsh_params, similarity
+
+
+def _text(seed, words=2000):
+    """
+    Build a pseudo-random deck text.
+    """
+    rng = random.Random(seed)
+    return " ".join(f"w{rng.randint(0, 5000)}" for _ in range(words))
+
+
+def test_signature_similarity_tracks_edits():
+    """
+    Trivially edited texts have a high estimated similarity and unrelated
+    texts a low one; case and punctuation do not matter.
+    """
+    hasher = MinHasher()
+    text = _text(1)
+    words = text.split()
+    edited = " ".join(words[:1000] + ["changed"] * 5 + words[1005:])
+
+    assert similarity(hasher.signature(text), hasher.signature(text.upper() + "!")) == 1.0
+    assert similarity(hasher.signature(text), hasher.signature(edited)) > 0.9
+    assert similarity(hasher.signature(text), hasher.signature(_text(2))) < 0.1
+
+
+def test_lsh_params_favour_recall():
+    """
+    The band layout finds pairs at the threshold with high probability.
+    """
+    bands, rows = lsh_params(0.9, 128)
+    assert bands * rows <= 128
+    assert 1 - (1 - 0.9 ** rows) ** bands >= 0.99
+
+
+def test_index_persists_and_excludes_same_file(tmp_path):
+    """
+    Indexed decks are found after reopening, a deck is not matched with its
+    own earlier entry, and a threshold change keeps the indexed decks.
+    """
+    path = str(tmp_path / "dedup.sqlite")
+    index = DedupIndex(path)
+    text = _text(3)
+    index.add("decks/a.pdf", "out/a.md", index.signature(text))
+    index.add("decks/b.pdf", "out/b.md", index.signature(_text(4)))
+    index.close()
+
+    index = DedupIndex(path, threshold=0.8)
+    match = index.query(index.signature(text + " extra words"), exclude_file="decks/other.pdf")
+    assert match["output"] == "out/a.md" and match["similarity"] >= 0.8
+    assert index.query(index.signature(text), exclude_file="decks/a.pdf") is None
+    assert index.query(index.signature(_text(5))) is None
+    assert len(index) == 2
+
+
+def test_text_poor_decks_are_not_matched(tmp_path):
+    """
+    Decks without enough text (e.g. image-only scans) get no signature, so
+    unrelated ones are never reported as duplicates of each other.
+    """
+    index = DedupIndex(str(tmp_path / "dedup.sqlite"))
+
+    assert index.signature("") is None and index.signature("   ") is None
+    assert index.signature("Acme Corp slide one") is None
+    assert find_reusable(index, index.signature(""), "decks/b.pdf") == (None, None)
+    assert index.signature(_text(1, words=100)) is not None
+
+
+def test_batch_reuses_near_duplicate(tmp_path):
+    """
+    A copy of an already analysed deck reuses its analysis in a later batch.
+    """
+    class CountingEnricher:
+        model_name = "stub-model"
+        calls = 0
+
+        def enrich(self, deck_data, metrics=None, previous=None, fingerprints=None):
+            CountingEnricher.calls += 1
+            return {"Company Name": "Acme", "Executive Summary": "Summary"}
+
+    decks = tmp_path / "decks"
+    decks.mkdir()
+    shutil.copy("tests/sample_pdf.pdf", decks / "deck.pdf")
+    shutil.copy("tests/sample_pdf.pdf", decks / "copy.pdf")
+    index = DedupIndex(str(tmp_path / "dedup.sqlite"))
+    config = {"output_file": "output.md"}
+    out = str(tmp_path / "out")
+
+    run_batch([str(decks / "deck.pdf")], CountingEnricher(), config, output_dir=out,
+              parse_workers=1, dedup=index)
+    manifest = run_batch([str(decks / "copy.pdf")], CountingEnricher(), config, output_dir=out,
+                         parse_workers=1, dedup=index)
+
+    assert CountingEnricher.calls == 1
+    assert manifest["decks"][0]["duplicate_of"].endswith("deck.pdf")
+    assert manifest["totals"]["duplicates"] == 1
+    with open(manifest["decks"][0]["output"], encoding="utf-8") as f:
+        assert "Summary" in f.read()
+
+
+def test_reused_analysis_gets_state_and_metrics_sidecars(tmp_path):
+    """
+    A report reused from a near-duplicate is written with the same sidecars
+    as an enriched one.
+    """
+    from utils.incremental import load_state
+    from utils.metrics import Metrics
+    from utils.pipeline import analyse_deck
+
+    class StubEnricher:
+        model_name = "stub-model"
+
+        def enrich(self, deck_data, metrics=None, previous=None, fingerprints=None):
+            return {"Company Name": "Acme", "Executive Summary": "Summary"}
+
+    index = DedupIndex(str(tmp_path / "dedup.sqlite"))
+    deck = {"raw_text": _text(1, words=300)}
+    first = str(tmp_path / "a_20240101_000000.md")
+    second = str(tmp_path / "b_20240101_000000.md")
+
+    analyse_deck("decks/a.pdf", deck, StubEnricher(), first, Metrics(), dedup=index)
+    result = analyse_deck("decks/b.pdf", deck, StubEnricher(), second, Metrics(), dedup=index)
+
+    assert result["match"]["file"].endswith("a.pdf")
+    assert load_state(second)["company_name"] == "Acme"
+    assert os.path.exists(str(tmp_path / "b_20240101_000000.metrics.json"))
+
+
+def test_decks_with_failed_sections_are_not_reused(tmp_path):
+    """
+    A report with failed sections is neither indexed nor reused, and a
+    reused report keeps the section fingerprints of the matched deck.
+    """
+    from utils.enrich import FAILED_SECTION_PREFIX
+    from utils.incremental import load_state
+    from utils.metrics import Metrics
+    from utils.pipeline import analyse_deck
+
+    class StubEnricher:
+        model_name = "stub-model"
+        summary = f"{FAILED_SECTION_PREFIX} timeout_"
+
+        def enrich(self, deck_data, metrics=None, previous=None, fingerprints=None):
+            fingerprints["Executive Summary"] = "f" * 64
+            return {"Company Name": "Acme", "Executive Summary": self.summary}
+
+    index = DedupIndex(str(tmp_path / "dedup.sqlite"))
+    deck = {"raw_text": _text(1, words=300)}
+    enricher = StubEnricher()
+
+    analyse_deck("decks/a.pdf", deck, enricher, str(tmp_path / "a.md"), Metrics(), dedup=index)
+    assert len(index) == 0
+
+    enricher.summary = "Summary"
+    result = analyse_deck("decks/b.pdf", deck, enricher, str(tmp_path / "b.md"), Metrics(), dedup=index)
+    assert result["match"] is None and len(index) == 1
+
+    reused = analyse_deck("decks/c.pdf", deck, enricher, str(tmp_path / "c.md"), Metrics(), dedup=index)
+    assert reused["match"]["file"].endswith("b.pdf")
+    assert load_state(str(tmp_path / "c.md"))["sections"]["Executive Summary"]["fingerprint"] == "f" * 64
+
+    # An index entry pointing at a report with failed sections is not reused either
+    stale = DedupIndex(str(tmp_path / "stale.sqlite"))
+    signature = stale.signature(deck["raw_text"])
+    stale.add("decks/a.pdf", str(tmp_path / "a.md"), signature)
+    assert find_reusable(stale, signature, "decks/d.pdf") == (None, None)
@@ -23,3 +23,309 @@ def test_enrich():
     # You can mock OpenRouter for CI. Here, skip actual API call.
     # response = Enricher(api_key="sk-demo", model_name="deepseek-v3").enrich(dummy_data)
     # assert "Executive Summary" in response
+
+
+def _offline_enricher(monkeypatch, max_concurrency=4, fail_on=None):
+    """
+    Build an Enricher whose OpenRouter and web calls are replaced by stubs.
+    """
+    import utils.enrich as enrich_module
+    monkeypatch.setattr(enrich_module, "fetch_company_profile", lambda name: "Acme profile")
+    monkeypatch.setattr(enrich_module, "fetch_latest_news", lambda name: "Acme news")
+
+    enricher = Enricher(api_key="sk-demo", model_name="deepseek-v3", max_concurrency=max_concurrency)
+
+    def fake_prompt(prompt, **kwargs):
+        prompt = getattr(prompt, "instruction", prompt)
+        if prompt.startswith("Extract the full company name"):
+            return "Acme Corp"
+        if fail_on and prompt.startswith(fail_on):
+            raise RuntimeError("boom")
+        return prompt.split("\n")[0]
+
+    monkeypatch.setattr(enricher, "prompt_openrouter", fake_prompt)
+    return enricher
+
+
+def test_enrich_concurrent_preserves_section_order(monkeypatch):
+    """
+    Concurrent section generation keeps the canonical section order.
+    """
+    from utils.enrich import SECTIONS
+
+    enricher = _offline_enricher(monkeypatch, max_concurrency=4)
+    response = enricher.enrich({"raw_text": "Acme Corp builds flying taxis."})
+
+    assert list(response) == ["Company Name"] + [name for name, _ in SECTIONS]
+    assert response["Company Name"] == "Acme Corp"
+    assert response["Executive Summary"] == SECTIONS[0][1]
+
+
+def test_enrich_section_failure_is_isolated(monkeypatch):
+    """
+    A failing section is reported in place without aborting the others.
+    """
+    enricher = _offline_enricher(monkeypatch, fail_on="Describe product")
+    response = enricher.enrich({"raw_text": "Acme Corp builds flying taxis."})
+
+    assert "failed" in response["Product"]
+    assert response["Team"].startswith("Summarize team")
+
+
+def test_prompt_openrouter_uses_cache(tmp_path):
+    """
+    Cached completions are returned without contacting the API.
+    """
+    from utils.cache import ResponseCache
+
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite"))
+    cache.set("deepseek-v3", "hello", "cached answer")
+    enricher = Enricher(api_key="sk-demo", model_name="deepseek-v3", cache=cache)
+
+    assert enricher.prompt_openrouter("hello") == "cached answer"
+    assert cache.stats()["hits"] == 1
+
+
+def test_retrieval_mode_sends_only_relevant_pages(monkeypatch):
+    """
+    Retrieval mode builds per-section contexts from the most relevant pages.
+    """
+    enricher = Enricher(api_key="sk-demo", context_mode="retrieval",
+                        retrieval_top_k=1, default_section_budget=10)
+    deck = {
+        "raw_text": "filler " * 200,
+        "pages": [
+            {"page": 1, "text": "Founders and team: Jane Doe, ex-Google", "chars": 38},
+            {"page": 2, "text": "Market size TAM SAM SOM for robotics", "chars": 36},
+        ],
+    }
+    contexts = enricher.build_section_contexts(
+        deck, [("Team", "Summarize team/founders."), ("Market", "Estimate market size.")], "", ""
+    )
+    assert "[Page 1]" in contexts["Team"] and "[Page 2]" not in contexts["Team"]
+    assert "[Page 2]" in contexts["Market"] and "filler" not in contexts["Market"]
+
+
+def test_fused_mode_retries_missing_sections(monkeypatch):
+    """
+    Fused mode parses the JSON response and re-requests missing sections.
+    """
+    import json
+    import utils.enrich as enrich_module
+    from utils.enrich import SECTIONS
+
+    monkeypatch.setattr(enrich_module, "fetch_company_profile", lambda name: "")
+    monkeypatch.setattr(enrich_module, "fetch_latest_news", lambda name: "")
+    enricher = Enricher(api_key="sk-demo", generation_mode="fused")
+    prompts = []
+
+    def fake_prompt(prompt, **kwargs):
+        prompts.append(prompt)
+        prompt = getattr(prompt, "instruction", prompt)
+        if prompt.startswith("Extract the full company name"):
+            return "Acme Corp"
+        if prompt.startswith("Write each of the following"):
+            answer = {name: f"fused {name}" for name, _ in SECTIONS if name != "Team"}
+            answer["Product"] = ""
+            return "```json\n" + json.dumps(answer) + "\n```"
+        return "individual"
+
+    monkeypatch.setattr(enricher, "prompt_openrouter", fake_prompt)
+    response = enricher.enrich({"raw_text": "Acme Corp builds flying taxis."})
+
+    assert list(response)[1:] == [name for name, _ in SECTIONS]
+    assert response["Executive Summary"] == "fused Executive Summary"
+    assert response["Team"] == "individual" and response["Product"] == "individual"
+    assert len(prompts) == 4
+
+
+def test_enrich_records_stage_metrics(monkeypatch):
+    """
+    Enrichment times name extraction, web enrichment and every section.
+    """
+    from utils.enrich import SECTIONS
+    from utils.metrics import Metrics
+
+    enricher = _offline_enricher(monkeypatch)
+    metrics = Metrics()
+    enricher.enrich({"raw_text": "Acme Corp builds flying taxis."}, metrics=metrics)
+
+    stages = metrics.to_dict()["stages"]
+    assert "name_extraction" in stages and "web_enrichment" in stages
+    assert all(f"section:{name}" in stages for name, _ in SECTIONS)
+
+
+def test_guess_company_name_heuristic():
+    """
+    The title slide or first line is used only when it looks like a name.
+    """
+    from utils.enrich import guess_company_name
+
+    assert guess_company_name({"slides": [{"title": "Acme Robotics"}], "raw_text": ""}) == "Acme Robotics"
+    assert guess_company_name({"raw_text": "\n  Acme Corp\nWe build taxis."}) == "Acme Corp"
+    assert guess_company_name({"raw_text": "Zephyra\nFlying taxis.\nContact: hello@zephyra.com\n"
+                                           "Zephyra, Berlin"}) == "Zephyra"
+    assert guess_company_name({"raw_text": "Investor Pitch Deck 2024\n"}) is None
+    assert guess_company_name({"raw_text": "Acme Corp builds flying taxis."}) is None
+
+
+def test_guess_company_name_rejects_headings_and_taglines():
+    """
+    Headings, taglines and uncorroborated lines fall back to the LLM, even
+    when they recur in the deck.
+    """
+    from utils.enrich import guess_company_name
+
+    for line in ["Team", "Our Mission", "Revolutionizing Healthcare", "The future of payments",
+                 "About Us", "Vision"]:
+        deck = {"raw_text": f"{line}\nSome text.\n{line}\nMore text about {line}.\n"}
+        assert guess_company_name(deck) is None, line
+        assert guess_company_name({"slides": [{"title": line}], "raw_text": deck["raw_text"]}) is None
+    assert guess_company_name({"raw_text": "Zephyra\nFlying taxis for cities.\n"}) is None
+
+
+def test_offline_sections_skip_web_context(monkeypatch):
+    """
+    Offline sections are prompted without web data; others include it.
+    """
+    import utils.enrich as enrich_module
+
+    monkeypatch.setattr(enrich_module, "fetch_company_profile", lambda name: "PROFILE")
+    monkeypatch.setattr(enrich_module, "fetch_latest_news", lambda name: "NEWS")
+    enricher = Enricher(api_key="sk-demo", max_concurrency=3)
+    prompts = {}
+
+    def fake_prompt(prompt, **kwargs):
+        prompts[getattr(prompt, "instruction", prompt).split("\n")[0]] = prompt
+        return "ok"
+
+    monkeypatch.setattr(enricher, "prompt_openrouter", fake_prompt)
+    response = enricher.enrich({"raw_text": "Acme Robotics\nWarehouse robots."})
+
+    assert response["Company Name"] == "Acme Robotics"
+    product = next(p for k, p in prompts.items() if k.startswith("Describe product"))
+    team = next(p for k, p in prompts.items() if k.startswith("Summarize team"))
+    assert "PROFILE" not in product.context
+    assert "PROFILE" in team.context and "NEWS" in team.context
+
+
+def test_iter_sse_data_skips_comments_and_stops_at_done():
+    """
+    SSE decoding ignores keep-alive comments and ends at the [DONE] sentinel.
+    """
+    from utils.enrich import iter_sse_data
+
+    lines = [b": OPENROUTER PROCESSING", b"", b'data: {"choices": [{"delta": {"content": "Hi"}}]}',
+             b"data: [DONE]", b'data: {"late": true}']
+    assert list(iter_sse_data(lines)) == [{"choices": [{"delta": {"content": "Hi"}}]}]
+
+
+def test_prompt_openrouter_streams_tokens():
+    """
+    Streamed deltas are passed to the callback and assembled into the
+    completion, with usage taken from the final event.
+    """
+    import json
+    from utils.metrics import Metrics
+
+    events = [{"choices": [{"delta": {"content": text}}]} for text in ("Acme ", "flies")]
+    events.append({"choices": [{"delta": {}}], "usage": {"prompt_tokens": 7, "completion_tokens": 2}})
+
+    class FakeResponse:
+        text = ""
+
+        def raise_for_status(self):
+            pass
+
+        def iter_lines(self):
+            return iter([f"data: {json.dumps(e)}".encode() for e in events] + [b"data: [DONE]"])
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            pass
+
+    class FakeClient:
+        def post(self, url, **kwargs):
+            self.kwargs = kwargs
+            return FakeResponse()
+
+    client = FakeClient()
+    enricher = Enricher(api_key="sk-demo", http_client=client, stream=True)
+    metrics = Metrics()
+    tokens = []
+
+    assert enricher.prompt_openrouter("hi", metrics=metrics, on_token=tokens.append) == "Acme flies"
+    assert tokens == ["Acme ", "flies"]
+    assert client.kwargs["stream"] is True and client.kwargs["json"]["stream"] is True
+    assert metrics.counters["completion_tokens"] == 2
+
+
+def test_enrich_reports_sections_as_they_finish(monkeypatch):
+    """
+    The on_section callback receives the company name and every section.
+    """
+    from utils.enrich import SECTIONS
+
+    enricher = _offline_enricher(monkeypatch)
+    seen = {}
+    response = enricher.enrich({"raw_text": "Acme Corp builds flying taxis."},
+                               on_section=seen.__setitem__)
+
+    assert seen == response
+    assert len(seen) == len(SECTIONS) + 1
+
+
+def test_section_prompts_share_a_cacheable_prefix():
+    """
+    Section requests start with the same system message and context, and
+    only cache_control models get an explicit cache breakpoint.
+    """
+    from utils.enrich import build_section_prompt
+    from utils.metrics import Metrics
+
+    enricher = Enricher(api_key="sk-demo")
+    product = build_section_prompt("Describe product.", "Acme deck")
+    team = build_section_prompt("Summarize team.", "Acme deck")
+
+    anthropic = [enricher._payload(p, "anthropic/claude-3.5-sonnet")["messages"] for p in (product, team)]
+    assert anthropic[0][0] == anthropic[1][0]
+    assert anthropic[0][1]["content"][0] == anthropic[1][1]["content"][0]
+    assert anthropic[0][1]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert anthropic[0][1]["content"][-1]["text"].startswith("Describe product.")
+
+    deepseek = enricher._payload(product, "deepseek/deepseek-chat")["messages"]
+    assert "cache_control" not in deepseek[1]["content"][0]
+
+    metrics = Metrics()
+    metrics.record_usage({"prompt_tokens": 900, "completion_tokens": 50,
+                          "prompt_tokens_details": {"cached_tokens": 800}})
+    assert metrics.counters["cached_tokens"] == 800
+
+
+def test_priming_sends_one_section_per_context_first(monkeypatch):
+    """
+    With prime_prompt_cache, sections sharing a context wait until the first
+    of them has answered.
+    """
+    import threading
+
+    enricher = _offline_enricher(monkeypatch, max_concurrency=4)
+    enricher.prime_prompt_cache = True
+    order, lock = [], threading.Lock()
+    answer = enricher.prompt_openrouter
+
+    def recording_prompt(prompt, **kwargs):
+        with lock:
+            order.append(getattr(prompt, "instruction", prompt).split("\n")[0])
+        return answer(prompt, **kwargs)
+
+    monkeypatch.setattr(enricher, "prompt_openrouter", recording_prompt)
+    sections = [("Product", "Describe product."), ("Team", "Summarize team."),
+                ("Market", "Estimate market.")]
+    results = enricher.generate_sections(sections, {name: "Acme deck" for name, _ in sections})
+
+    assert order[0] == "Describe product."
+    assert results == {"Product": "Describe product.", "Team": "Summarize team.",
+                       "Market": "Estimate market."}
@@ -0,0 +1,118 @@
+"""
+Test module for incremental re-analysis.
+
+This module contains unit tests for deck diffing, section fingerprints and
+reuse of unchanged sections by the Enricher.
+"""
+
+from utils.enrich import Enricher, SECTIONS
+from utils.incremental import build_state, diff_decks, load_state, save_state, state_path, unit_hashes
+
+
+def _deck(*texts):
+    return {"raw_text": "\n".join(texts),
+            "slides": [{"slide": i + 1, "title": t, "text": t, "notes": ""} for i, t in enumerate(texts)]}
+
+
+def test_diff_decks_matches_by_content():
+    """
+    Test that an inserted slide does not mark the following slides as changed.
+    """
+    old = unit_hashes(_deck("Acme", "Team", "Market"))
+    new = unit_hashes(_deck("Acme", "Traction", "Team", "Market v2"))
+    diff = diff_decks(old, new)
+    assert diff == {"added": ["Slide 2"], "removed": [], "changed": ["Slide 4"], "unchanged": 2}
+
+
+def test_enrich_reuses_unchanged_sections(monkeypatch, tmp_path):
+    """
+    Test that a re-run only regenerates sections whose context changed.
+    """
+    import utils.enrich as enrich_module
+
+    news = ["Old news"]
+    monkeypatch.setattr(enrich_module, "fetch_company_profile", lambda name: "Profile")
+    monkeypatch.setattr(enrich_module, "fetch_latest_news", lambda name: news[0])
+    enricher = Enricher(api_key="sk-demo", model_name="m", max_concurrency=2)
+    prompts = []
+
+    def fake_prompt(prompt, **kwargs):
+        prompts.append(prompt)
+        return "generated"
+
+    monkeypatch.setattr(enricher, "prompt_openrouter", fake_prompt)
+    deck = _deck("Acme Robotics", "Warehouse robots")
+
+    fingerprints = {}
+    first = enricher.enrich(deck, fingerprints=fingerprints)
+    path = state_path(str(tmp_path / "deck_20250101_000000.md"))
+    save_state(path, build_state("m", deck, first, fingerprints))
+    assert len(prompts) == len(SECTIONS)
+
+    # Only the web data changed: deck-only sections are reused
+    prompts.clear()
+    news[0] = "New funding round"
+    enricher.enrich(deck, previous=load_state(path))
+    assert len(prompts) == len(SECTIONS) - len(enrich_module.OFFLINE_SECTIONS)
+    assert not any(p.instruction.startswith("Describe product") for p in prompts)
+
+
+def test_editing_one_slide_regenerates_only_related_sections(monkeypatch):
+    """
+    With whole-deck contexts, a section is regenerated only when the slides
+    matching its instruction change, and every section is regenerated when
+    the prompt layout changes.
+    """
+    import utils.enrich as enrich_module
+
+    monkeypatch.setattr(enrich_module, "fetch_company_profile", lambda name: "Profile")
+    monkeypatch.setattr(enrich_module, "fetch_latest_news", lambda name: "News")
+    enricher = Enricher(api_key="sk-demo", model_name="m", max_concurrency=2)
+    prompts = []
+
+    def fake_prompt(prompt, **kwargs):
+        prompts.append(prompt.instruction)
+        return "generated"
+
+    monkeypatch.setattr(enricher, "prompt_openrouter", fake_prompt)
+
+    def deck(market):
+        return _deck("Acme Robotics", "Founders and team: Jane Doe, ex-Google engineer", market,
+                     "Product: autonomous picking robots with proprietary vision technology",
+                     "Traction metrics: 120 customers, 3x growth",
+                     "Funding: raising a seed round, clean cap table")
+
+    fingerprints = {}
+    first = enricher.enrich(deck("Market size: TAM $10B warehouse automation"),
+                            fingerprints=fingerprints)
+    state = build_state("m", {}, first, fingerprints)
+
+    prompts.clear()
+    enricher.enrich(deck("Market size: TAM $12B warehouse automation, competitors Locus"),
+                    previous=state)
+    assert any(p.startswith("Estimate market") for p in prompts)
+    assert not any(p.startswith(("Summarize team", "Describe product")) for p in prompts)
+    assert len(prompts) < len(SECTIONS) // 2
+
+    prompts.clear()
+    monkeypatch.setattr(enrich_module, "SYSTEM_PROMPT", "You are a different analyst.")
+    enricher.enrich(deck("Market size: TAM $10B warehouse automation"), previous=state)
+    assert len(prompts) == len(SECTIONS)
+
+
+def test_save_state_keeps_the_old_state_when_writing_fails(tmp_path, monkeypatch):
+    """
+    A failed write leaves the previous state file intact.
+    """
+    path = str(tmp_path / "report.state.json")
+    save_state(path, {"model": "m", "sections": {}})
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("utils.markdown_writer.os.replace", fail)
+    try:
+        save_state(path, {"model": "m2", "sections": {}})
+    except OSError:
+        pass
+    assert load_state(path)["model"] == "m"
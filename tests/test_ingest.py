@@ -0,0 +1,71 @@
+"""
+Test module for guarded deck ingestion.
+
+This module checks the size, page/slide, time and memory limits applied
+before and during parsing, and text extraction from PPTX copies without
+binary parts.
+"""
+
+import zipfile
+
+import pytest
+
+from utils.ingest import IngestError, parse_guarded, strip_pptx_media, truncation_notice
+from utils.pdf_parser import extract_pdf_pages, parse_pdf
+from utils.ppt_parser import parse_ppt
+
+
+def test_long_deck_is_truncated_to_first_pages():
+    """
+    Only the first ``max_pages`` pages are parsed, and the truncation is reported.
+    """
+    data = parse_guarded("tests/sample_pdf.pdf", max_pages=5)
+
+    assert [page["page"] for page in data["pages"]] == [1, 2, 3, 4, 5]
+    assert data["ingest"]["pages"] == 12 and data["ingest"]["truncated"] == "pages"
+    assert "first 5 of 12" in truncation_notice(data)
+    first_pages = extract_pdf_pages("tests/sample_pdf.pdf", max_pages=5)
+    assert data["raw_text"] == "".join(p["text"] + "\n" for p in first_pages if p["text"])
+
+
+def test_limits_reject_and_stop_parsing():
+    """
+    Oversized files are rejected, and extraction stops at the time limit.
+    """
+    with pytest.raises(IngestError):
+        parse_guarded("tests/sample_pdf.pdf", max_file_mb=0.001)
+
+    data = parse_guarded("tests/sample_pdf.pdf", time_seconds=1e-9)
+    assert data["ingest"]["truncated"] == "time" and data["ingest"]["kept"] < 12
+
+    complete = parse_guarded("tests/sample_pdf.pdf")
+    assert complete["ingest"]["truncated"] is None and truncation_notice(complete) is None
+
+
+def test_memory_error_falls_back_to_fewer_pages(monkeypatch):
+    """
+    A parse that runs out of memory is retried with ``fallback_pages`` pages.
+    """
+    def parse_or_fail(filepath, max_pages=None, **kwargs):
+        if max_pages is None or max_pages > 3:
+            raise MemoryError
+        return parse_pdf(filepath, max_pages=max_pages, **kwargs)
+
+    monkeypatch.setattr("utils.ingest.parse_pdf", parse_or_fail)
+    data = parse_guarded("tests/sample_pdf.pdf", fallback_pages=3)
+
+    assert data["ingest"]["kept"] == 3 and data["ingest"]["truncated"] == "memory"
+
+
+def test_pptx_without_media_keeps_text(tmp_path):
+    """
+    Text extracted from a copy without binary parts matches the original.
+    """
+    stripped = str(tmp_path / "stripped.pptx")
+    strip_pptx_media("tests/sample_ppt.pptx", stripped)
+
+    with zipfile.ZipFile(stripped) as archive:
+        assert archive.getinfo("docProps/thumbnail.jpeg").file_size == 0
+    data = parse_guarded("tests/sample_ppt.pptx")
+    assert data["raw_text"] == parse_ppt("tests/sample_ppt.pptx")["raw_text"]
+    assert data["ingest"]["pages"] == len(data["slides"])
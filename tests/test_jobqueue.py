@@ -0,0 +1,106 @@
+"""
+Test module for the job queue functionality.
+
+This module contains unit tests for JobQueue claiming, leases and section
+checkpoints, and for resuming a job from its checkpoints.
+"""
+
+import time
+
+from utils.jobqueue import JobQueue
+
+
+def test_claim_respects_priority_and_model_cap(tmp_path):
+    """
+    Higher priorities are claimed first and capped models are skipped.
+    """
+    queue = JobQueue(path=str(tmp_path / "jobs.sqlite"))
+    low = queue.submit("a.pdf", "model-a", priority=0)
+    high = queue.submit("b.pdf", "model-a", priority=5)
+    other = queue.submit("c.pdf", "model-b", priority=1)
+
+    assert queue.claim("w1", {"model-a": 1})["id"] == high
+    assert queue.claim("w2", {"model-a": 1})["id"] == other
+    assert queue.claim("w3", {"model-a": 1}) is None
+
+    queue.complete(high, "out.md")
+    assert queue.claim("w3", {"model-a": 1})["id"] == low
+    assert queue.result(high)["output"] == "out.md"
+
+
+def test_abandoned_job_is_requeued(tmp_path):
+    """
+    A running job whose lease expires is claimed again by another worker.
+    """
+    queue = JobQueue(path=str(tmp_path / "jobs.sqlite"), lease_seconds=0.05, max_attempts=2)
+    job_id = queue.submit("a.pdf", "model-a")
+    queue.claim("w1")
+    time.sleep(0.1)
+
+    job = queue.claim("w2")
+    assert job["id"] == job_id and job["attempts"] == 2
+    time.sleep(0.1)
+    assert queue.claim("w3") is None
+    assert queue.status(job_id)["status"] == "failed"
+
+
+def test_process_job_resumes_from_checkpoints(monkeypatch, tmp_path):
+    """
+    Sections checkpointed by an earlier attempt are not requested again;
+    sections that failed are.
+    """
+    import jobs
+    import utils.enrich as enrich_module
+    from utils.enrich import SECTIONS, Enricher
+
+    monkeypatch.setattr(enrich_module, "fetch_company_profile", lambda name: "")
+    monkeypatch.setattr(enrich_module, "fetch_latest_news", lambda name: "")
+    monkeypatch.setattr(jobs, "parse_deck", lambda path, **kwargs: {
+        "raw_text": "Acme Corp\nFlying taxis\n",
+        "pages": [{"page": 1, "text": "Acme Corp\nFlying taxis", "chars": 22}]})
+    config = {"output_file": "output.md", "compaction": {"enabled": False}}
+    queue = JobQueue(path=str(tmp_path / "jobs.sqlite"))
+    queue.submit("deck.pdf", "m")
+    job = queue.claim("w1")
+
+    prompts = []
+
+    def flaky_prompt(prompt, **kwargs):
+        prompts.append(prompt)
+        if prompt.instruction.startswith(("Summarize team", "Estimate market")):
+            raise RuntimeError("worker lost connection")
+        return "ok"
+
+    enricher = Enricher(api_key="sk-demo", model_name="m", show_progress=False)
+    monkeypatch.setattr(enricher, "prompt_openrouter", flaky_prompt)
+    jobs.process_job(queue, job, config, enricher, str(tmp_path))
+    assert queue.status(job["id"])["sections_done"] == len(SECTIONS) - 2
+
+    prompts.clear()
+    monkeypatch.setattr(enricher, "prompt_openrouter",
+                        lambda prompt, **kwargs: prompts.append(prompt) or "ok")
+    output = jobs.process_job(queue, job, config, enricher, str(tmp_path))
+    assert sorted(p.instruction.split("\n")[0] for p in prompts) == sorted([SECTIONS[1][1], SECTIONS[3][1]])
+    assert output.startswith(str(tmp_path))
+
+
+def _run_process_pool(config_path):
+    """
+    Stand-in worker loop that needs child processes, like parsing or OCR.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        assert list(pool.map(abs, [-1, -2])) == [1, 2]
+
+
+def test_workers_can_start_process_pools(monkeypatch):
+    """
+    Job workers may start the process pools used for large or scanned decks.
+    """
+    import jobs
+
+    monkeypatch.setattr(jobs, "worker_loop", _run_process_pool)
+    process = jobs._spawn_worker("config.yaml")
+    process.join(30)
+    assert process.exitcode == 0
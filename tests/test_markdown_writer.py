@@ -5,6 +5,8 @@ This module contains unit tests for the write_markdown function,
 verifying that it correctly formats and writes data to markdown files.
 """
 
+import os
+
 from utils.markdown_writer import write_markdown
 
 
@@ -23,3 +25,62 @@ def test_markdown_writer():
     write_markdown(data, "tests/test_output.md")
     with open("tests/test_output.md") as f:
         assert "Test Section" in f.read()
+
+
+def test_stream_writer_keeps_partial_until_finalized(tmp_path):
+    """
+    Sections are appended to a partial file as they arrive, and finalize
+    replaces it with the complete report in canonical order.
+    """
+    from utils.markdown_writer import MarkdownStreamWriter
+
+    outfile = str(tmp_path / "report.md")
+    writer = MarkdownStreamWriter(outfile)
+    writer.write_token("Team", "Two ")
+    writer.write_token("Market", "ignored while Team streams")
+    writer.write_token("Team", "founders")
+    writer.write_section("Market", "Large market.")
+    writer.write_section("Team", "Two founders")
+    writer.close()
+
+    with open(writer.partial_path, encoding="utf-8") as f:
+        assert f.read() == "# Team\n\nTwo founders\n\n# Market\n\nLarge market.\n\n"
+
+    writer.finalize({"Market": "Large market.", "Team": "Two founders"})
+    with open(outfile, encoding="utf-8") as f:
+        assert f.read().startswith("# Market\n\nLarge market.")
+    assert not os.path.exists(writer.partial_path)
+
+
+def test_reports_honour_umask_and_existing_mode(tmp_path):
+    """
+    Atomically written reports get the umask-based mode of a new file, or
+    keep the mode of the report they replace.
+    """
+    import stat
+
+    from utils.markdown_writer import _UMASK
+
+    outfile = str(tmp_path / "report.md")
+    write_markdown({"Team": "Two founders"}, outfile)
+    assert stat.S_IMODE(os.stat(outfile).st_mode) == 0o666 & ~_UMASK
+
+    os.chmod(outfile, 0o640)
+    write_markdown({"Team": "Three founders"}, outfile)
+    assert stat.S_IMODE(os.stat(outfile).st_mode) == 0o640
+
+
+def test_stream_writer_keeps_failure_note_of_streamed_section(tmp_path):
+    """
+    A section that fails while streaming gets its failure note in the
+    partial file after the tokens received so far.
+    """
+    from utils.markdown_writer import MarkdownStreamWriter
+
+    writer = MarkdownStreamWriter(str(tmp_path / "report.md"))
+    writer.write_token("Team", "Two ")
+    writer.write_section("Team", "_Section generation failed: timeout_")
+    writer.close()
+
+    with open(writer.partial_path, encoding="utf-8") as f:
+        assert f.read() == "# Team\n\nTwo \n\n_Section generation failed: timeout_\n\n"
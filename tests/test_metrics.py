@@ -0,0 +1,38 @@
+"""
+Test module for pipeline metrics.
+
+This module contains unit tests for the Metrics collector and batch
+aggregation.
+"""
+
+from utils.metrics import Metrics, aggregate, metrics_path
+
+
+def test_metrics_stages_and_usage():
+    """
+    Test that stages accumulate and usage blocks are counted.
+    """
+    metrics = Metrics()
+    with metrics.stage("parse"):
+        pass
+    metrics.record_stage("parse", 1.0)
+    metrics.record_usage({"prompt_tokens": 100, "completion_tokens": 20})
+    metrics.record_usage(None)
+    metrics.add(cache_hits=1)
+
+    data = metrics.to_dict()
+    assert data["stages"]["parse"] >= 1.0
+    assert data["counters"] == {"requests": 2, "prompt_tokens": 100,
+                                "completion_tokens": 20, "cache_hits": 1}
+
+
+def test_aggregate_and_sidecar_path():
+    """
+    Test batch aggregation and the sidecar naming scheme.
+    """
+    total = aggregate([
+        {"stages": {"parse": 1.0}, "counters": {"requests": 3}},
+        {"stages": {"parse": 2.0, "write": 0.5}, "counters": {"requests": 1}},
+    ])
+    assert total == {"decks": 2, "stages": {"parse": 3.0, "write": 0.5}, "counters": {"requests": 4}}
+    assert metrics_path("out/deck_20250101_000000.md") == "out/deck_20250101_000000.metrics.json"
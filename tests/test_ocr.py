@@ -0,0 +1,153 @@
+"""
+Test module for the OCR fallback of text-poor PDF pages.
+
+This module runs the fallback with stub OCR engines over a PDF with blank
+pages, so neither Tesseract nor a rasteriser is needed.
+"""
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from PyPDF2 import PdfReader, PdfWriter
+
+from utils.ocr import _run_engine, ocr_counters, ocr_pages, page_hashes
+from utils.pdf_parser import extract_pdf_pages, parse_pdf
+
+
+def recognise(filepath, index, dpi, lang, timeout):
+    """
+    Stub engine returning a fixed text per page.
+    """
+    return f"Recognised text of page {index + 1} at {dpi} dpi"
+
+
+def recognise_slowly(filepath, index, dpi, lang, timeout):
+    """
+    Stub engine that takes longer than the test budget for every page.
+    """
+    time.sleep(0.5)
+    return recognise(filepath, index, dpi, lang, timeout)
+
+
+def recognise_forever(filepath, index, dpi, lang, timeout):
+    """
+    Stub engine that never finishes within any test budget.
+    """
+    time.sleep(60)
+    return recognise(filepath, index, dpi, lang, timeout)
+
+
+def _scanned_deck(path):
+    """
+    Write a PDF with two text pages followed by two blank pages of different sizes.
+    """
+    reader = PdfReader("tests/sample_pdf.pdf")
+    writer = PdfWriter()
+    writer.add_page(reader.pages[0])
+    writer.add_page(reader.pages[2])
+    writer.add_blank_page(width=612, height=792)
+    writer.add_blank_page(width=792, height=612)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return str(path)
+
+
+def test_only_text_poor_pages_are_recognised_and_cached(tmp_path):
+    """
+    Blank pages get OCR text, text pages keep theirs, and a second run is
+    served from the page cache, also for a copy of the deck.
+    """
+    deck = _scanned_deck(tmp_path / "deck.pdf")
+    options = {"workers": 2, "cache_path": str(tmp_path / "ocr.sqlite"), "engine": recognise}
+
+    data = parse_pdf(deck, ocr=options)
+    assert [page.get("ocr", False) for page in data["pages"]] == [False, False, True, True]
+    assert "Recognised text of page 4" in data["raw_text"]
+    assert data["ocr"]["candidates"] == 2 and data["ocr"]["recognised"] == 2
+    assert ocr_counters(data)["ocr_pages"] == 2
+
+    copy = _scanned_deck(tmp_path / "copy.pdf")
+    assert page_hashes(copy, [2, 3]) == page_hashes(deck, [2, 3])
+    again = parse_pdf(copy, ocr=options)
+    assert again["ocr"]["cached"] == 2 and again["ocr"]["recognised"] == 0
+    assert again["raw_text"] == data["raw_text"]
+
+
+def test_budget_limits_ocr_time(tmp_path):
+    """
+    Pages not recognised within the deck budget are skipped and not cached.
+    """
+    deck = _scanned_deck(tmp_path / "deck.pdf")
+    pages = extract_pdf_pages(deck)
+
+    start = time.monotonic()
+    updated, stats = ocr_pages(deck, pages, workers=1, budget_seconds=0.2,
+                               cache_path=str(tmp_path / "ocr.sqlite"), engine=recognise_slowly)
+    assert time.monotonic() - start < 1.5
+    assert stats["recognised"] == 1 and stats["skipped"] == 1
+    assert sum(1 for page in updated if page.get("ocr")) == 1
+
+
+def test_parallel_pages_are_not_started_past_the_deadline(monkeypatch):
+    """
+    No OCR process is started once the budget is spent, so no page runs
+    without a timeout.
+    """
+    def no_pool(*args, **kwargs):
+        raise AssertionError("pool started after the deadline")
+
+    monkeypatch.setattr("utils.ocr.ProcessPoolExecutor", no_pool)
+    assert _run_engine(recognise, "deck.pdf", [2, 3], 2, time.monotonic(), 200, "eng") == ({}, 0)
+
+
+def test_deadline_stops_running_ocr_processes():
+    """
+    Pages are started only on free processes, each with the time left, and
+    processes still running at the deadline are killed.
+    """
+    timeouts = []
+
+    class Pool(ProcessPoolExecutor):
+        def submit(self, fn, *args):
+            timeouts.append(args[-1])
+            return super().submit(fn, *args)
+
+    deadline = time.monotonic() + 0.5
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr("utils.ocr.ProcessPoolExecutor", Pool)
+        assert _run_engine(recognise_forever, "deck.pdf", [0, 1, 2, 3], 2, deadline, 200, "eng") == ({}, 0)
+    assert len(timeouts) == 2 and all(0 < timeout <= 0.5 for timeout in timeouts)
+    time.sleep(0.2)
+    assert not multiprocessing.active_children()
+
+
+def test_worker_processes_default_to_one_ocr_process(tmp_path, monkeypatch):
+    """
+    Called from a batch worker process, OCR does not start a pool per deck.
+    """
+    used = []
+
+    def run_engine(engine, filepath, indices, workers, *args):
+        used.append(workers)
+        return {}, 0
+
+    monkeypatch.setattr("utils.ocr._run_engine", run_engine)
+    monkeypatch.setattr("utils.ocr.multiprocessing.parent_process", lambda: object())
+    deck = _scanned_deck(tmp_path / "deck.pdf")
+    ocr_pages(deck, extract_pdf_pages(deck), cache_path=None, engine=recognise)
+    assert used == [1]
+
+
+def test_missing_engine_is_skipped(tmp_path, monkeypatch):
+    """
+    Without an OCR engine installed the deck keeps its extracted text.
+    """
+    monkeypatch.setattr("utils.ocr.ocr_available", lambda: False)
+    deck = _scanned_deck(tmp_path / "deck.pdf")
+
+    data = parse_pdf(deck, ocr={"cache_path": str(tmp_path / "ocr.sqlite")})
+    assert data["ocr"]["skipped"] == 2
+    assert not any(page.get("ocr") for page in data["pages"])
+    assert data["raw_text"] == parse_pdf(deck)["raw_text"]
@@ -22,3 +22,36 @@ def test_pdf_parser():
     """
     data = parse_pdf("tests/sample_pdf.pdf")
     assert "raw_text" in data and isinstance(data["raw_text"], str)
+
+
+def test_iter_pdf_pages_yields_page_records():
+    """
+    Test that the page generator yields numbered per-page records.
+    """
+    from utils.pdf_parser import iter_pdf_pages
+
+    pages = list(iter_pdf_pages("tests/sample_pdf.pdf"))
+    assert pages and pages[0]["page"] == 1
+    assert all(page["chars"] == len(page["text"]) for page in pages)
+
+
+def test_parse_pdf_parallel_matches_sequential():
+    """
+    Test that page-parallel extraction returns the same text in page order.
+    """
+    sequential = parse_pdf("tests/sample_pdf.pdf")
+    parallel = parse_pdf("tests/sample_pdf.pdf", workers=2, parallel_threshold=1)
+    assert parallel["raw_text"] == sequential["raw_text"]
+    assert [p["page"] for p in parallel["pages"]] == [p["page"] for p in sequential["pages"]]
+
+
+def test_parse_pdf_keeps_page_text_once():
+    """
+    Test that page records address 'raw_text' instead of holding a copy.
+    """
+    from utils.pdf_parser import iter_pdf_pages, page_text
+
+    data = parse_pdf("tests/sample_pdf.pdf")
+    assert not any("text" in page for page in data["pages"])
+    assert [page_text(data, page) for page in data["pages"]] == [
+        page["text"] for page in iter_pdf_pages("tests/sample_pdf.pdf")]
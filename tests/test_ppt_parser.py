@@ -22,3 +22,27 @@ def test_ppt_parser():
     """
     data = parse_ppt("tests/sample_ppt.pptx")
     assert "raw_text" in data and isinstance(data["raw_text"], str)
+
+
+def test_ppt_parser_slide_records():
+    """
+    Test that slides carry titles, table cells, grouped text, charts and notes.
+    """
+    data = parse_ppt("tests/sample_ppt.pptx")
+    first, second = data["slides"]
+
+    assert first["slide"] == 1 and first["title"] == "Acme Robotics"
+    assert first["notes"] == "Founded in 2021 by Jane Doe."
+    assert second["tables"] == [[["Metric", "Value"], ["ARR", "$1.2M"]]]
+    assert "120 customers" in second["text"]
+    assert "Chart series: Revenue" in second["text"]
+    assert "Speaker notes: Founded in 2021" in data["raw_text"]
+
+
+def test_ppt_parser_parallel_matches_sequential():
+    """
+    Test that slide-parallel extraction returns the same records in order.
+    """
+    sequential = parse_ppt("tests/sample_ppt.pptx")
+    parallel = parse_ppt("tests/sample_ppt.pptx", workers=2, parallel_threshold=1)
+    assert parallel == sequential
@@ -0,0 +1,59 @@
+"""
+Test module for section-targeted context retrieval.
+
+This module contains unit tests for deck chunking, the BM25 index and
+budgeted chunk selection.
+"""
+
+from utils.retrieval import BM25Index, deck_chunks, select_chunks
+
+
+DECK = {
+    "raw_text": "",
+    "pages": [
+        {"page": 1, "text": "Acme Robotics warehouse automation", "chars": 34},
+        {"page": 2, "text": "Our founders Jane Doe and John Roe previously built logistics startups", "chars": 70},
+        {"page": 3, "text": "", "chars": 0},
+        {"page": 4, "text": "Revenue grew to 1.2M ARR with 120 customers and strong retention", "chars": 64},
+    ],
+}
+
+
+def test_deck_chunks_uses_pages_and_skips_empty():
+    """
+    Test that page records become labelled chunks and empty pages are skipped.
+    """
+    chunks = deck_chunks(DECK)
+    assert [c["label"] for c in chunks] == ["Page 1", "Page 2", "Page 4"]
+
+
+def test_deck_chunks_splits_long_text():
+    """
+    Test that unstructured text is split into word windows.
+    """
+    chunks = deck_chunks({"raw_text": " ".join(["word"] * 25)}, max_words=10)
+    assert [c["label"] for c in chunks] == ["Deck.1", "Deck.2", "Deck.3"]
+
+
+def test_select_chunks_ranks_relevant_content():
+    """
+    Test that the most relevant chunk is selected and deck order is kept.
+    """
+    chunks = deck_chunks(DECK)
+    index = BM25Index([c["text"] for c in chunks])
+
+    team = select_chunks(index, chunks, "Team founders track record", top_k=1)
+    assert [c["label"] for c in team] == ["Page 2"]
+
+    traction = select_chunks(index, chunks, "revenue customers founders", top_k=2)
+    assert [c["label"] for c in traction] == ["Page 2", "Page 4"]
+
+
+def test_select_chunks_respects_token_budget():
+    """
+    Test that selection stops adding chunks once the budget is used up.
+    """
+    chunks = deck_chunks(DECK)
+    index = BM25Index([c["text"] for c in chunks])
+    selected = select_chunks(index, chunks, "revenue founders acme", top_k=3, token_budget=20)
+    assert len(selected) == 1
@@ -0,0 +1,190 @@
+"""
+Test module for model routing, hedged requests and circuit breaking.
+
+This module checks the router with stub requests and the Enricher's use of
+it with a fake HTTP client; no external API is contacted.
+"""
+
+import threading
+
+from utils.enrich import Enricher
+from utils.metrics import Metrics
+from utils.routing import CircuitBreaker, LatencyTracker, ModelRouter, exclusive_stream
+
+
+def test_circuit_breaker_opens_and_half_opens(monkeypatch):
+    """
+    A model is skipped after repeated failures and gets one trial request
+    once the reset period has passed.
+    """
+    now = [100.0]
+    monkeypatch.setattr("utils.routing.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+
+    breaker.record_failure("slow")
+    assert breaker.allow("slow")
+    breaker.record_failure("slow")
+    assert not breaker.allow("slow")
+
+    now[0] += 31
+    assert breaker.allow("slow")
+    assert not breaker.allow("slow")
+    breaker.record_success("slow")
+    assert breaker.allow("slow") and not breaker.is_open("slow")
+
+
+def test_latency_quantile_needs_samples():
+    """
+    The latency quantile is only reported once enough samples exist.
+    """
+    tracker = LatencyTracker()
+    for seconds in range(1, 21):
+        tracker.record("m", float(seconds))
+
+    assert tracker.quantile("m", 0.95, min_samples=30) is None
+    assert tracker.quantile("m", 0.95, min_samples=10) == 19.0
+    assert tracker.quantile("other") is None
+
+
+def test_router_fails_over_and_skips_open_breakers():
+    """
+    Failed requests fall back to the next model, and a model whose breaker
+    is open is not tried at all.
+    """
+    router = ModelRouter("main", section_models={"Team": "strong"}, fallback_models=["backup"],
+                         breaker_failures=1)
+    metrics = Metrics()
+    calls = []
+
+    def request(model):
+        calls.append(model)
+        if model == "strong":
+            raise RuntimeError("provider down")
+        return f"answer from {model}"
+
+    assert router.call("Team", request, metrics=metrics) == "answer from backup"
+    assert router.call("Team", request, metrics=metrics) == "answer from backup"
+    assert calls == ["strong", "backup", "backup"]
+    assert metrics.counters["fallback_requests"] == 1
+    assert metrics.counters["breaker_skips"] == 1
+    assert router.model_for("Product") == "main"
+
+
+def test_router_hedges_slow_requests():
+    """
+    A request that misses its deadline is hedged with the fallback model and
+    the first answer is used.
+    """
+    router = ModelRouter("slow", fallback_models=["fast"], hedge=True,
+                         hedge_initial_delay=0.05, hedge_min_delay=0)
+    release = threading.Event()
+    metrics = Metrics()
+
+    def request(model):
+        if model == "slow":
+            release.wait(5)
+        return model
+
+    try:
+        assert router.call(None, request, metrics=metrics) == "fast"
+        assert metrics.counters["hedged_requests"] == 1
+    finally:
+        release.set()
+
+
+def test_exclusive_stream_forwards_one_request():
+    """
+    Only the request that streams first reaches the token callback.
+    """
+    tokens = []
+    stream_for = exclusive_stream(tokens.append)
+    first, second = stream_for("a"), stream_for("b")
+
+    second("B1")
+    first("A1")
+    second("B2")
+    assert tokens == ["B1", "B2"]
+
+
+def test_enricher_routes_sections_to_their_models():
+    """
+    Section and name requests are sent with the model routed for them.
+    """
+    class FakeResponse:
+        text = ""
+
+        def __init__(self, model):
+            self.model = model
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"choices": [{"message": {"content": self.model}}]}
+
+    class FakeClient:
+        def post(self, url, json=None, **kwargs):
+            return FakeResponse(json["model"])
+
+    enricher = Enricher(api_key="sk-demo", model_name="base", http_client=FakeClient(),
+                        name_heuristic=False,
+                        routing={"section_models": {"Company Name": "fast", "Team": "strong"}})
+
+    assert enricher.extract_company_name({"raw_text": "Acme"}) == "fast"
+    assert enricher.generate_section("Team?", "ctx", section="Team") == "strong"
+    assert enricher.generate_section("Market?", "ctx", section="Market") == "base"
+
+
+def test_half_open_trial_is_claimed_only_by_a_real_request(monkeypatch):
+    """
+    Listing candidates does not use up a half-open model's trial; the trial
+    goes to the request actually sent to it.
+    """
+    now = [100.0]
+    monkeypatch.setattr("utils.routing.time.monotonic", lambda: now[0])
+    router = ModelRouter("main", fallback_models=["backup"], breaker_failures=1,
+                         breaker_reset_seconds=30)
+    router.breaker.record_failure("backup")
+    now[0] += 31
+
+    assert router.candidates(None) == ["main", "backup"]
+    assert router.call(None, lambda model: model) == "main"
+    assert router.breaker.allow("backup") and not router.breaker.allow("backup")
+
+
+def test_fallback_answers_are_served_from_the_cache(tmp_path):
+    """
+    A completion answered by a fallback model is found in the cache on the
+    next run instead of being requested again.
+    """
+    from utils.cache import ResponseCache
+
+    class FakeResponse:
+        text = ""
+
+        def __init__(self, model):
+            self.model = model
+
+        def raise_for_status(self):
+            if self.model == "main":
+                raise RuntimeError("provider down")
+
+        def json(self):
+            return {"choices": [{"message": {"content": self.model}}]}
+
+    class FakeClient:
+        calls = 0
+
+        def post(self, url, json=None, **kwargs):
+            FakeClient.calls += 1
+            return FakeResponse(json["model"])
+
+    cache = ResponseCache(str(tmp_path / "llm.sqlite"))
+    enricher = Enricher(api_key="sk-demo", model_name="main", http_client=FakeClient(),
+                        cache=cache, routing={"fallback_models": ["backup"]})
+    metrics = Metrics()
+
+    assert enricher.prompt_openrouter("hi") == "backup"
+    calls = FakeClient.calls
+    assert enricher.prompt_openrouter("hi", metrics=metrics) == "backup"
+    assert FakeClient.calls == calls and metrics.counters["cache_hits"] == 1
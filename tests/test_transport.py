@@ -0,0 +1,96 @@
+"""
+Test module for the shared HTTP transport.
+
+This module contains unit tests for HttpClient retry behaviour, Retry-After
+handling and the TokenBucket rate limiter, without network access.
+"""
+
+import io
+import time
+
+import requests
+
+from utils.transport import HttpClient, TokenBucket, parse_retry_after
+
+
+def _response(status, headers=None):
+    """
+    Build a bare requests.Response with the given status code.
+    """
+    r = requests.Response()
+    r.status_code = status
+    r.headers.update(headers or {})
+    r._content = b"{}"
+    r.raw = io.BytesIO(b"{}")
+    return r
+
+
+def test_retries_on_429_then_succeeds(monkeypatch):
+    """
+    Test that a 429 is retried and the Retry-After delay is honoured.
+    """
+    client = HttpClient(max_retries=2, backoff_base=0)
+    responses = [_response(429, {"Retry-After": "0"}), _response(200)]
+    calls = []
+
+    def fake_request(method, url, **kwargs):
+        calls.append(kwargs["timeout"])
+        return responses.pop(0)
+
+    monkeypatch.setattr(client.session, "request", fake_request)
+    assert client.get("https://example.com/").status_code == 200
+    assert calls == [client.timeout, client.timeout]
+
+
+def test_returns_last_response_when_retries_exhausted(monkeypatch):
+    """
+    Test that a persistent 5xx is returned once retries are used up.
+    """
+    client = HttpClient(max_retries=1, backoff_base=0)
+    monkeypatch.setattr(client.session, "request", lambda *a, **k: _response(503))
+    assert client.post("https://example.com/").status_code == 503
+
+
+def test_parse_retry_after():
+    """
+    Test delta-seconds and invalid Retry-After values.
+    """
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_token_bucket_limits_rate():
+    """
+    Test that the bucket throttles requests beyond its burst capacity.
+    """
+    bucket = TokenBucket(rate=20, capacity=1)
+    start = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.09
+
+
+def test_configured_timeouts_apply_to_openrouter_and_async_clients(monkeypatch):
+    """
+    OpenRouter requests use the shared client's configured timeout, and
+    async clients read the same setting.
+    """
+    from utils import transport
+    from utils.enrich import Enricher
+
+    monkeypatch.setattr(transport, "_default_client", None)
+    client = transport.configure(timeout=(3, 7), max_retries=0)
+    calls = []
+
+    def fake_request(method, url, **kwargs):
+        calls.append(kwargs["timeout"])
+        r = _response(200)
+        r._content = b'{"choices": [{"message": {"content": "ok"}}]}'
+        return r
+
+    monkeypatch.setattr(client.session, "request", fake_request)
+    assert Enricher(api_key="sk-demo", http_client=client).prompt_openrouter("hi") == "ok"
+    assert calls == [(3, 7)]
+    timeout = transport.httpx_timeout()
+    assert timeout.connect == 3 and timeout.read == 7
@@ -0,0 +1,70 @@
+"""
+Test module for the web enrichment functionality.
+
+This module contains unit tests for DuckDuckGo result extraction, the
+lookup cache and in-flight request coalescing, without network access.
+"""
+
+import threading
+import time
+
+from utils import web_enrich
+from utils.cache import LookupCache
+
+PAGE = (
+    '<div><a rel="nofollow" class="result__a" href="/1">Acme <b>Robotics</b> &amp; Co</a></div>'
+    '<div><a class="result__snippet" href="/x">snippet</a></div>'
+    '<div><a class="result__a" href="/2">Acme raises seed</a></div>'
+    '<div><a class="result__a" href="/3">Third</a></div>'
+)
+
+
+def test_regex_extractor_matches_beautifulsoup():
+    """
+    Test that the targeted extractor returns the same titles as BeautifulSoup.
+    """
+    regex = web_enrich.extract_result_titles(PAGE, 2, parser="regex")
+    soup = web_enrich.extract_result_titles(PAGE, 2, parser="html.parser")
+    assert regex == soup == ["Acme Robotics & Co", "Acme raises seed"]
+
+
+def test_lookups_are_cached_and_coalesced(monkeypatch, tmp_path):
+    """
+    Test that concurrent identical lookups share one fetch and later hit the cache.
+    """
+    calls = []
+
+    def slow_search(query, num_results):
+        calls.append(query)
+        time.sleep(0.1)
+        return "Acme Robotics"
+
+    monkeypatch.setattr(web_enrich, "_search", slow_search)
+    web_enrich.configure(cache=LookupCache(str(tmp_path / "web.sqlite")))
+    try:
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(web_enrich.fetch_company_profile("Acme")))
+                   for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == ["Acme Robotics"] * 4
+        assert web_enrich.fetch_company_profile("Acme") == "Acme Robotics"
+        assert len(calls) == 1
+    finally:
+        web_enrich.configure()
+
+
+def test_failed_lookups_are_not_cached(monkeypatch, tmp_path):
+    """
+    Test that a failed search returns "" and is retried next time.
+    """
+    outcomes = [None, "Fresh news"]
+    monkeypatch.setattr(web_enrich, "_search", lambda q, n: outcomes.pop(0))
+    web_enrich.configure(cache=LookupCache(str(tmp_path / "web.sqlite")))
+    try:
+        assert web_enrich.fetch_latest_news("Acme") == ""
+        assert web_enrich.fetch_latest_news("Acme") == "Fresh news"
+    finally:
+        web_enrich.configure()
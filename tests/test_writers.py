@@ -0,0 +1,95 @@
+"""
+Test module for the multi-format report writers.
+
+This module checks that markdown, JSON and HTML reports are rendered from
+the same enriched data, written atomically next to each other, and that
+batch runs append one JSONL record per deck.
+"""
+
+import json
+
+import pytest
+
+from utils.batch import run_batch
+from utils.compare import load_enriched
+from utils.markdown_writer import render_markdown
+from utils.writers import markdown_to_html, render_outputs, write_outputs
+
+ENRICHED = {
+    "Company Name": "Acme <Labs>",
+    "Executive Summary": "**Strong** team with *deep* expertise.\n\n- Item one\n- Item two\n",
+    "Traction & Metrics": "| Metric | Value |\n|---|---|\n| MRR | $45k |",
+}
+
+
+def test_render_outputs_matches_single_format_renderers():
+    """
+    One pass produces the markdown report, JSON identical to json.dumps and
+    HTML with converted, escaped markup.
+    """
+    outputs = render_outputs(ENRICHED, ["markdown", "json", "html"])
+
+    assert outputs["markdown"] == render_markdown(ENRICHED)
+    assert outputs["json"] == json.dumps(ENRICHED, indent=2, ensure_ascii=False)
+    assert "<title>Acme &lt;Labs&gt;</title>" in outputs["html"]
+    assert "<strong>Strong</strong>" in outputs["html"] and "<em>deep</em>" in outputs["html"]
+    assert "<li>Item two</li>" in outputs["html"]
+    assert "<td>$45k</td>" in outputs["html"]
+
+
+def test_markdown_to_html_blocks():
+    """
+    Headings are nested below the section title and numbered lists are ordered.
+    """
+    html = markdown_to_html("## Risks\n1. Competition\n2. Regulation\nClosing line")
+    assert html == ("<h3>Risks</h3>\n<ol>\n<li>Competition</li>\n<li>Regulation</li>\n</ol>\n"
+                    "<p>Closing line</p>")
+
+
+def test_markdown_to_html_links_cannot_break_out_of_href():
+    """
+    Links with quotes in their URL are left as escaped text instead of
+    becoming anchors with injected attributes.
+    """
+    html = markdown_to_html('[news](https://x.com/"onmouseover="alert(1)) and [ok](https://x.com/a?b=1&c=2)')
+    assert html.count("<a ") == 1
+    assert '<a href="https://x.com/a?b=1&amp;c=2">ok</a>' in html
+
+
+def test_write_outputs_places_files_next_to_report(tmp_path):
+    """
+    Every format is written next to the report, and the JSON is what
+    load_enriched reads back.
+    """
+    report = str(tmp_path / "acme_20240101_120000.md")
+    paths = write_outputs(ENRICHED, report, ["markdown", "json", "html"])
+
+    assert paths["html"] == str(tmp_path / "acme_20240101_120000.html")
+    assert load_enriched(report) == ENRICHED
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "acme_20240101_120000.enriched.json", "acme_20240101_120000.html", "acme_20240101_120000.md"]
+    with pytest.raises(ValueError):
+        write_outputs(ENRICHED, report, ["pdf"])
+
+
+def test_batch_appends_jsonl_records(tmp_path):
+    """
+    A batch run appends one JSONL record per written deck.
+    """
+    class StubEnricher:
+        model_name = "stub-model"
+
+        def enrich(self, deck_data, metrics=None, previous=None, fingerprints=None):
+            return dict(ENRICHED)
+
+    out = tmp_path / "out"
+    manifest = run_batch(["tests/sample_pdf.pdf", "tests/sample_ppt.pptx"], StubEnricher(),
+                         {"output_file": "output.md"}, output_dir=str(out), parse_workers=1,
+                         formats=["markdown", "html"], jsonl_name="results.jsonl")
+
+    lines = (out / "results.jsonl").read_text(encoding="utf-8").splitlines()
+    records = [json.loads(line) for line in lines]
+    assert sorted(r["file"] for r in records) == ["tests/sample_pdf.pdf", "tests/sample_ppt.pptx"]
+    assert all(r["sections"] == ENRICHED for r in records)
+    assert all(d["output"].endswith(".md") for d in manifest["decks"])
+    assert len(list(out.glob("*.html"))) == 2
@@ -6,12 +6,6 @@ for enriching pitch deck data using AI-powered analysis.
 """
 
 from utils.enrich import Enricher
-from dotenv import load_dotenv
-load_dotenv()
-import os
-
-# Load API key from environment variables
-OPENROUTER_KEY = os.environ.get("OPENROUTER_API_KEY", "")
 
 
 class Agent:
@@ -23,19 +17,23 @@ class Agent:
     of the enrichment process behind a clean API.
     """
     
-    def __init__(self, api_key=OPENROUTER_KEY, model_name='deepseek-v3'):
+    def __init__(self, api_key=None, model_name='deepseek-v3', **options):
         """
         Initialize the Agent with API credentials and model configuration.
         
         Args:
             api_key (str): OpenRouter API key for authentication. 
-                          Defaults to OPENROUTER_KEY environment variable.
+                          Defaults to the OPENROUTER_API_KEY environment variable.
             model_name (str): Name of the LLM model to use for analysis.
                              Defaults to 'deepseek-v3'.
+            **options: Additional Enricher settings such as max_concurrency,
+                       cache, refresh, show_progress or context_mode.
+                       See Enricher for the full list.
         """
-        self.enricher = Enricher(api_key, model_name)
+        self.enricher = Enricher(api_key, model_name, **options)
 
-    def enrich_company_info(self, deck_data):
+    def enrich_company_info(self, deck_data, metrics=None, previous=None, fingerprints=None,
+                            on_section=None, on_token=None):
         """
         Enrich pitch deck data with AI-powered analysis and external information.
         
@@ -48,9 +46,20 @@ class Agent:
         Args:
             deck_data (dict): Dictionary containing parsed pitch deck data.
                              Must include 'raw_text' key with extracted text.
+            metrics (Metrics): Optional collector for stage timings and
+                               token counts.
+            previous (dict): Optional state of an earlier run; sections whose
+                             inputs are unchanged are reused.
+            fingerprints (dict): Optional dict receiving section fingerprints.
+            on_section (callable): Optional callback receiving each section
+                                   name and content as soon as it is ready.
+            on_token (callable): Optional callback receiving section names
+                                 and streamed text deltas.
                              
         Returns:
             dict: Enriched data dictionary with analysis sections including
                   Executive Summary, Team, Product, Market, Traction, etc.
         """
-        return self.enricher.enrich(deck_data)
+        return self.enricher.enrich(deck_data, metrics=metrics, previous=previous,
+                                    fingerprints=fingerprints, on_section=on_section,
+                                    on_token=on_token)
@@ -0,0 +1,318 @@
+"""
+Async agent module for embedding the analyser in asyncio services.
+
+This module provides native asyncio counterparts of Agent and Enricher.
+OpenRouter and DuckDuckGo calls go through a shared httpx.AsyncClient, and
+sections and web lookups are scheduled as tasks bounded by a semaphore that
+is shared by every deck handled by the same AsyncEnricher, so a single event
+loop can analyse many decks at once without a thread per request.
+"""
+
+import asyncio
+import functools
+
+import httpx
+from utils.enrich import (
+    FAILED_SECTION_PREFIX,
+    SECTIONS,
+    Enricher,
+    build_fused_prompt,
+    build_name_prompt,
+    build_section_prompt,
+    guess_company_name,
+    parse_json_object,
+)
+from utils.markdown_writer import write_markdown
+from utils.metrics import Metrics
+from utils.pipeline import parse_deck
+from utils.transport import arequest, httpx_timeout
+from utils.web_enrich import afetch_company_profile, afetch_latest_news
+
+
+class AsyncEnricher(Enricher):
+    """
+    Asyncio version of the enrichment engine.
+
+    Prompt construction, context selection and configuration are shared with
+    Enricher; only the I/O is asynchronous. ``max_concurrency`` bounds the
+    number of in-flight OpenRouter and web requests across all decks.
+    """
+
+    def __init__(self, api_key=None, model_name="deepseek-v3", client=None, **options):
+        """
+        Initialize the async enricher.
+
+        Args:
+            api_key (str): OpenRouter API key for authentication.
+            model_name (str): Name of the LLM model to use for analysis.
+            client (httpx.AsyncClient): Shared async HTTP client. A pooled
+                                        client is created if not given.
+            **options: Additional Enricher settings such as max_concurrency,
+                       cache, context_mode or generation_mode.
+        """
+        options.setdefault("show_progress", False)
+        super().__init__(api_key, model_name, **options)
+        self.client = client or httpx.AsyncClient(
+            timeout=httpx_timeout(),
+            limits=httpx.Limits(max_keepalive_connections=16),
+        )
+        self._owns_client = client is None
+        self._semaphore = None
+
+    @property
+    def semaphore(self):
+        """
+        Semaphore shared by all requests of this enricher, created lazily
+        inside the running event loop.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def aclose(self):
+        """
+        Close the HTTP client if it was created by this enricher.
+        """
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def aprompt_openrouter(self, prompt, metrics=None, route=None):
+        """
+        Async version of prompt_openrouter.
+
+        Requests go to the model routed for ``route``; hedging and failover
+        are only done by the threaded Enricher.
+
+        Args:
+            prompt (str or ChatPrompt): The prompt to send to the LLM.
+            metrics (Metrics): Optional collector for request, token and
+                               cache counters.
+            route (str): Section name, or "Company Name" for the name prompt.
+
+        Returns:
+            str: The generated response from the LLM.
+
+        Raises:
+            httpx.HTTPStatusError: If the API request fails.
+            httpx.HTTPError: If there's a network error.
+        """
+        model = self.router.model_for(route)
+        # The SQLite cache blocks, so it is read and written off the event loop
+        cached = await asyncio.to_thread(self._cached_completion, prompt, metrics,
+                                         self.router.models(route))
+        if cached is not None:
+            return cached
+
+        async with self.semaphore:
+            r = await arequest(self.client, "POST", self.api_url, headers=self._headers(),
+                               json=self._payload(prompt, model),
+                               retry_exceptions=(httpx.TransportError,))
+        if r.is_error:
+            print("OpenRouter error details:", r.text)
+            r.raise_for_status()
+        return await asyncio.to_thread(self._completion_content, prompt, r.json(), metrics, model)
+
+    async def _asection(self, section, instr, context, metrics):
+        """
+        Generate one section, turning failures into an error note.
+        """
+        try:
+            with metrics.stage(f"section:{section}"):
+                result = await self.aprompt_openrouter(build_section_prompt(instr, context), metrics=metrics,
+                                                       route=section)
+            return result.strip()
+        except Exception as e:
+            print(f"Section '{section}' failed: {e}")
+            return f"{FAILED_SECTION_PREFIX} {e}_"
+
+    async def _aweb(self, company_name, metrics):
+        """
+        Fetch the company profile and news concurrently.
+        """
+        async def limited(fetch):
+            async with self.semaphore:
+                return await fetch(company_name, self.client)
+
+        with metrics.stage("web_enrichment"):
+            return await asyncio.gather(limited(afetch_company_profile), limited(afetch_latest_news))
+
+    async def _afused(self, sections, full_context, contexts, metrics):
+        """
+        Async version of generate_fused.
+        """
+        instructions = dict(sections)
+        groups = self.fused_groups or [[name for name, _ in sections]]
+        grouped = {name for group in groups for name in group}
+        groups = [[n for n in group if n in instructions] for group in groups]
+        missing = [name for name, _ in sections if name not in grouped]
+
+        async def run_group(group):
+            prompt = build_fused_prompt([(name, instructions[name]) for name in group], full_context)
+            try:
+                with metrics.stage(f"fused:{group[0]}"):
+                    return parse_json_object(await self.aprompt_openrouter(prompt, metrics=metrics))
+            except Exception as e:
+                print(f"Fused request for {len(group)} sections failed: {e}")
+                return {}
+
+        groups = [group for group in groups if group]
+        results = {}
+        for group, parsed in zip(groups, await asyncio.gather(*(run_group(g) for g in groups))):
+            for name in group:
+                value = parsed.get(name)
+                if isinstance(value, str) and value.strip():
+                    results[name] = value.strip()
+                else:
+                    missing.append(name)
+
+        retried = await asyncio.gather(*(
+            self._asection(name, instructions[name], contexts[name], metrics) for name in missing
+        ))
+        results.update(zip(missing, retried))
+        return results
+
+    async def aenrich(self, deck_data, metrics=None, previous=None, fingerprints=None):
+        """
+        Async version of enrich.
+
+        Deck-only sections are started as tasks immediately; the company name
+        is then determined, both web lookups run concurrently, and the
+        remaining sections are scheduled once web data is available.
+
+        Args:
+            deck_data (dict): Parsed pitch deck data with a 'raw_text' key.
+            metrics (Metrics): Optional collector for stage timings and
+                               token counts of this deck.
+            previous (dict): Optional state of an earlier run whose unchanged
+                             sections are reused.
+            fingerprints (dict): Optional dict that receives the input
+                                 fingerprint of every section.
+
+        Returns:
+            dict: Enriched data with 'Company Name' followed by every section
+                  in canonical order, as returned by Enricher.enrich.
+        """
+        metrics = metrics if metrics is not None else Metrics()
+        fingerprints = fingerprints if fingerprints is not None else {}
+        results = {}
+        if self.generation_mode == "fused":
+            offline, online = [], list(SECTIONS)
+        else:
+            offline = [s for s in SECTIONS if s[0] in self.offline_sections]
+            online = [s for s in SECTIONS if s[0] not in self.offline_sections]
+
+        tasks = {}
+        if offline:
+            sources = {}
+            offline_contexts = self.build_section_contexts(deck_data, offline, None, None, sources)
+            pending = self.reuse_previous(offline, sources, previous, fingerprints,
+                                          results, metrics)
+            for section, instr in pending:
+                tasks[section] = asyncio.ensure_future(
+                    self._asection(section, instr, offline_contexts[section], metrics))
+
+        try:
+            with metrics.stage("name_extraction"):
+                company_name = guess_company_name(deck_data) if self.name_heuristic else None
+                if company_name:
+                    metrics.add(name_heuristic_hits=1)
+                else:
+                    response = await self.aprompt_openrouter(build_name_prompt(deck_data), metrics=metrics,
+                                                             route="Company Name")
+                    company_name = response.strip().split('\n')[0]
+
+            web_profile, news_snippet = await self._aweb(company_name, metrics)
+            sources = {}
+            contexts = self.build_section_contexts(deck_data, online, web_profile, news_snippet, sources)
+            pending = self.reuse_previous(online, sources, previous, fingerprints, results, metrics)
+
+            if self.generation_mode == "fused":
+                full_context = self.build_full_context(deck_data, web_profile, news_snippet)
+                results.update(await self._afused(pending, full_context, contexts, metrics))
+            else:
+                for section, instr in pending:
+                    tasks[section] = asyncio.ensure_future(
+                        self._asection(section, instr, contexts[section], metrics))
+            for section, task in tasks.items():
+                results[section] = await task
+        finally:
+            # Deck-only sections must not outlive a failed name or web lookup
+            unfinished = [task for task in tasks.values() if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            if unfinished:
+                await asyncio.gather(*unfinished, return_exceptions=True)
+
+        output = {"Company Name": company_name}
+        output.update((section, results[section]) for section, _ in SECTIONS)
+        return output
+
+
+async def aparse(file_path, executor=None, **parse_options):
+    """
+    Parse a deck in an executor so the event loop is not blocked.
+
+    Args:
+        file_path (str): Path to a PDF, PPT or PPTX file.
+        executor (concurrent.futures.Executor): Executor to run the parser in.
+                  A ProcessPoolExecutor avoids holding the GIL during
+                  extraction. Defaults to the loop's default executor.
+        **parse_options: Keyword arguments forwarded to parse_deck.
+
+    Returns:
+        dict: Parsed deck data.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(parse_deck, file_path, **parse_options))
+
+
+async def awrite(enriched, outfile="output.md"):
+    """
+    Write the markdown report in a worker thread.
+
+    Args:
+        enriched (dict): Enriched pitch deck data.
+        outfile (str): Output file path.
+    """
+    await asyncio.to_thread(write_markdown, enriched, outfile)
+
+
+class AsyncAgent:
+    """
+    Asyncio counterpart of Agent for use inside event loops.
+
+    Example:
+        async with AsyncAgent(model_name="openai/gpt-4o", max_concurrency=8) as agent:
+            enriched = await agent.enrich_company_info(await aparse("deck.pdf"))
+    """
+
+    def __init__(self, api_key=None, model_name='deepseek-v3', **options):
+        """
+        Initialize the AsyncAgent.
+
+        Args:
+            api_key (str): OpenRouter API key for authentication.
+            model_name (str): Name of the LLM model to use for analysis.
+            **options: Additional AsyncEnricher settings, including a shared
+                       httpx.AsyncClient as ``client``.
+        """
+        self.enricher = AsyncEnricher(api_key, model_name, **options)
+
+    async def enrich_company_info(self, deck_data, metrics=None, previous=None, fingerprints=None):
+        """
+        Enrich pitch deck data asynchronously. See Agent.enrich_company_info.
+        """
+        return await self.enricher.aenrich(deck_data, metrics=metrics, previous=previous,
+                                           fingerprints=fingerprints)
+
+    async def aclose(self):
+        """
+        Release the underlying HTTP client.
+        """
+        await self.enricher.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
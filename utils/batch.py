@@ -0,0 +1,230 @@
+"""
+Batch module for analyzing many pitch decks in one run.
+
+This module provides a two-stage pipeline: CPU-bound parsing runs in a
+process pool while I/O-bound enrichment runs in a separately bounded thread
+pool that shares a single Enricher. A JSON manifest records the status and
+timings of every deck, and aggregates the metrics sidecars of all outputs.
+"""
+
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from utils.compaction import compact_deck
+from utils.compare import load_enriched
+from utils.enrich import failed_sections
+from utils.ingest import apply_memory_limit
+from utils.metrics import Metrics, aggregate
+from utils.ocr import ocr_counters
+from utils.incremental import load_state
+from utils.writers import JsonlAppender, atomic_write
+from utils.pipeline import (
+    SUPPORTED_EXTENSIONS,
+    analyse_deck,
+    find_existing_output,
+    generate_output_filename,
+    parse_deck,
+    source_tag,
+)
+
+
+def collect_decks(target):
+    """
+    Resolve a directory or glob pattern into a list of deck files.
+
+    Args:
+        target (str): A directory (searched non-recursively) or a glob pattern.
+
+    Returns:
+        list: Sorted list of paths with a supported file extension.
+    """
+    if os.path.isdir(target):
+        candidates = [os.path.join(target, name) for name in os.listdir(target)]
+    else:
+        candidates = glob.glob(target, recursive=True)
+    return sorted(
+        path for path in candidates
+        if os.path.isfile(path) and path.lower().endswith(SUPPORTED_EXTENSIONS)
+    )
+
+
+def _timed_parse(file_path, parse_options=None, compact_options=None, hasher=None):
+    """
+    Parse and compact a deck, measuring both stages (runs in a worker process).
+
+    Args:
+        file_path (str): Path to the deck file.
+        parse_options (dict): Keyword arguments forwarded to parse_deck.
+        compact_options (dict): Keyword arguments forwarded to compact_deck.
+                                None skips compaction.
+        hasher (MinHasher): Computes the deck's MinHash signature from the
+                            parsed text. None skips it.
+
+    Returns:
+        tuple: (deck_data, stage name to elapsed seconds, signature or None).
+    """
+    start = time.perf_counter()
+    deck_data = parse_deck(file_path, **(parse_options or {}))
+    stages = {"parse": time.perf_counter() - start}
+    signature = None
+    if hasher is not None:
+        start = time.perf_counter()
+        signature = hasher.signature(deck_data["raw_text"])
+        stages["dedup"] = time.perf_counter() - start
+    if compact_options is not None:
+        start = time.perf_counter()
+        deck_data = compact_deck(deck_data, **compact_options)
+        stages["compact"] = time.perf_counter() - start
+    return deck_data, stages, signature
+
+
+def run_batch(files, enricher, config, output_dir=".", parse_workers=None,
+              enrich_workers=4, resume=True, manifest_name="batch_manifest.json",
+              parse_options=None, compact_options=None, dedup=None, reuse_duplicates=True,
+              memory_mb=None, formats=("markdown", "json"), jsonl_name=None):
+    """
+    Parse, enrich and write a batch of pitch decks.
+
+    Parsing is spread over ``parse_workers`` processes; each parsed deck is
+    handed to a thread pool of ``enrich_workers`` threads that reuse the
+    shared ``enricher``. Failures are recorded per deck and never abort the
+    batch.
+
+    Args:
+        files (list): Paths of the deck files to process.
+        enricher (Enricher): Shared enricher used for every deck.
+        config (dict): Configuration dictionary with output file settings.
+        output_dir (str): Directory for generated outputs and the manifest.
+                         Defaults to the current directory.
+        parse_workers (int): Number of parser processes. Defaults to the
+                             number of CPU cores.
+        enrich_workers (int): Number of decks enriched concurrently.
+                              Defaults to 4.
+        resume (bool): Skip decks that already have an output without
+                       failed sections in ``output_dir``. Defaults to True. When False, such
+                       decks are re-analysed and their unchanged sections
+                       are reused from the existing output's state.
+        manifest_name (str): File name of the JSON manifest.
+        parse_options (dict): Keyword arguments forwarded to parse_deck.
+        compact_options (dict): Keyword arguments forwarded to compact_deck,
+                                applied in the parser processes. None skips
+                                compaction.
+        dedup (DedupIndex): Optional index of earlier decks. Every enriched
+                            deck is added to it.
+        reuse_duplicates (bool): Reuse the analysis of a near-duplicate from
+                                 another file found in ``dedup`` instead of
+                                 enriching the deck. Defaults to True.
+        memory_mb (int): Memory limit of each parser process in MiB, so a
+                         huge deck is truncated instead of exhausting the
+                         machine. None leaves the processes unlimited.
+        formats (list): Report formats written for every deck (see
+                        utils.writers). Defaults to markdown and JSON.
+        jsonl_name (str): File name in ``output_dir`` to which one JSON
+                          record per written deck is appended. None
+                          disables the JSONL stream.
+
+    Returns:
+        dict: The manifest, with a 'decks' list of per-deck records, overall
+              'totals' and 'metrics' aggregated over the enriched decks.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    batch_start = time.perf_counter()
+    records = {path: {"file": path, "status": "pending"} for path in files}
+
+    pending, existing_outputs = [], {}
+    for path in files:
+        existing = find_existing_output(path, output_dir, config, tag=source_tag(path))
+        # Reports with failed sections are analysed again, reusing what succeeded
+        if existing and resume and not failed_sections(load_enriched(existing) or {}):
+            records[path].update(status="skipped", output=existing)
+        else:
+            existing_outputs[path] = existing
+            pending.append(path)
+
+    deck_metrics = []
+    jsonl = JsonlAppender(os.path.join(output_dir, jsonl_name)) if jsonl_name else None
+
+    def enrich_and_write(path, deck_data, parse_stages, signature):
+        metrics = Metrics()
+        for stage, seconds in parse_stages.items():
+            metrics.record_stage(stage, seconds)
+        metrics.add(**ocr_counters(deck_data))
+        output_file = os.path.join(output_dir,
+                                   generate_output_filename(path, config, tag=source_tag(path)))
+        previous = load_state(existing_outputs[path]) if existing_outputs[path] else None
+        # The deck was compacted and signed in its parser process
+        result = analyse_deck(path, deck_data, enricher, output_file, metrics, formats=formats,
+                              dedup=dedup if signature is not None else None,
+                              signature=signature, reuse_duplicates=reuse_duplicates,
+                              previous=previous)
+        match = result["match"]
+        if match is not None:
+            records[path].update(duplicate_of=match["file"], similarity=match["similarity"])
+        if jsonl is not None:
+            jsonl.append({"file": path, "output": output_file,
+                          "duplicate_of": match["file"] if match else None,
+                          "sections": result["enriched"]})
+        deck_metrics.append(metrics.to_dict())
+        return output_file, result["enriched"], result["enrich_seconds"]
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=parse_workers, initializer=apply_memory_limit,
+                                 initargs=(memory_mb,)) as parse_pool, \
+                ThreadPoolExecutor(max_workers=max(1, enrich_workers)) as enrich_pool:
+            parse_futures = {
+                parse_pool.submit(_timed_parse, path, parse_options, compact_options,
+                                  dedup.hasher if dedup is not None else None): path
+                for path in pending
+            }
+            enrich_futures = {}
+
+            # Start enriching each deck as soon as its parse finishes
+            for future in as_completed(parse_futures):
+                path = parse_futures[future]
+                try:
+                    deck_data, parse_stages, signature = future.result()
+                except Exception as e:
+                    records[path].update(status="failed", stage="parse", error=str(e))
+                    continue
+                records[path]["parse_seconds"] = round(parse_stages["parse"], 3)
+                if (deck_data.get("ingest") or {}).get("truncated"):
+                    records[path]["truncated"] = deck_data["ingest"]
+                enrich_futures[enrich_pool.submit(enrich_and_write, path, deck_data, parse_stages,
+                                                  signature)] = path
+
+            for future in as_completed(enrich_futures):
+                path = enrich_futures[future]
+                try:
+                    output_file, enriched, enrich_seconds = future.result()
+                except Exception as e:
+                    records[path].update(status="failed", stage="enrich", error=str(e))
+                    continue
+                records[path].update(status="ok", output=output_file,
+                                     enrich_seconds=round(enrich_seconds, 3))
+                failed = failed_sections(enriched)
+                if failed:
+                    sections = [name for name in enriched if name != "Company Name"]
+                    records[path].update(status="failed" if len(failed) == len(sections) else "partial",
+                                         stage="enrich", failed_sections=failed)
+                print(f"Output generated: {output_file}")
+
+    if jsonl is not None:
+        jsonl.close()
+    decks = [records[path] for path in files]
+    manifest = {
+        "decks": decks,
+        "totals": {
+            "decks": len(decks),
+            "ok": sum(1 for d in decks if d["status"] == "ok"),
+            "partial": sum(1 for d in decks if d["status"] == "partial"),
+            "skipped": sum(1 for d in decks if d["status"] == "skipped"),
+            "duplicates": sum(1 for d in decks if "duplicate_of" in d),
+            "failed": sum(1 for d in decks if d["status"] == "failed"),
+            "wall_seconds": round(time.perf_counter() - batch_start, 3),
+        },
+        "metrics": aggregate(deck_metrics),
+    }
+    atomic_write(os.path.join(output_dir, manifest_name), json.dumps(manifest, indent=2))
+    return manifest
@@ -0,0 +1,269 @@
+"""
+Cache module for persisting LLM completions and web lookups on disk.
+
+This module provides a content-addressed response cache and a TTL-based
+lookup cache, both backed by SQLite, so that repeated runs over the same deck,
+model and instructions do not pay for the same OpenRouter round-trips or
+DuckDuckGo searches twice.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+def cache_key(model_name, prompt):
+    """
+    Compute the content-addressed key for a (model, prompt) pair.
+
+    Args:
+        model_name (str): Name of the LLM model the prompt is sent to.
+        prompt (str): The full prompt text.
+
+    Returns:
+        str: Hex-encoded SHA-256 digest identifying the request.
+    """
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent SQLite-backed cache for LLM completions.
+
+    Entries are keyed by a hash of the model name and prompt. The cache
+    enforces an age limit and a maximum number of entries, evicting the least
+    recently used entries first, and keeps hit/miss counters for reporting.
+    The database file can safely be shared between threads and processes.
+    """
+
+    def __init__(self, path=".cache/llm_cache.sqlite", max_age_days=30, max_entries=10000,
+                 evict_every=100):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path (str): Location of the SQLite database file.
+                       Defaults to ".cache/llm_cache.sqlite".
+            max_age_days (float): Entries older than this are treated as
+                                  expired. ``None`` disables age eviction.
+            max_entries (int): Maximum number of entries kept on disk.
+                               ``None`` disables size eviction.
+            evict_every (int): Evict again after this many inserts, so
+                               long-lived workers stay within the limits.
+                               ``None`` only evicts on open.
+        """
+        self.path = path
+        self.max_age = max_age_days * 86400 if max_age_days else None
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self._inserts = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, response TEXT, "
+            "created REAL, accessed REAL)"
+        )
+        self._conn.commit()
+        self.evict()
+
+    def get(self, model_name, prompt):
+        """
+        Look up a cached completion.
+
+        Args:
+            model_name (str): Name of the LLM model.
+            prompt (str): The full prompt text.
+
+        Returns:
+            str or None: The cached completion, or None on a miss or if the
+                         entry has expired.
+        """
+        key = cache_key(model_name, prompt)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.max_age and now - row[1] > self.max_age):
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, model_name, prompt, response):
+        """
+        Store a completion in the cache.
+
+        Args:
+            model_name (str): Name of the LLM model.
+            prompt (str): The full prompt text.
+            response (str): The completion returned by the model.
+        """
+        key = cache_key(model_name, prompt)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model_name, response, now, now),
+            )
+            self._conn.commit()
+            self._inserts += 1
+            due = bool(self.evict_every) and self._inserts % self.evict_every == 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """
+        Remove expired entries and trim the cache to ``max_entries``.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        removed = 0
+        with self._lock:
+            if self.max_age:
+                cur = self._conn.execute(
+                    "DELETE FROM responses WHERE created < ?", (time.time() - self.max_age,)
+                )
+                removed += cur.rowcount
+            if self.max_entries:
+                # Drop the least recently used entries beyond the size limit
+                cur = self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                removed += cur.rowcount
+            self._conn.commit()
+        return removed
+
+    def stats(self):
+        """
+        Report cache effectiveness counters.
+
+        Returns:
+            dict: Dictionary with 'hits', 'misses' and 'entries' counts.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self):
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+class LookupCache:
+    """
+    Persistent SQLite-backed cache for web lookups with per-kind TTLs.
+
+    Entries are keyed by lookup kind (e.g. "profile" or "news") and query,
+    and expire after the TTL passed to ``get``. The database file can be
+    shared between threads and between the processes of a batch run.
+    """
+
+    def __init__(self, path=".cache/web_cache.sqlite"):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path (str): Location of the SQLite database file.
+                       Defaults to ".cache/web_cache.sqlite".
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS lookups ("
+            "kind TEXT, query TEXT, value TEXT, created REAL, "
+            "PRIMARY KEY (kind, query))"
+        )
+        self._conn.commit()
+
+    def get(self, kind, query, ttl):
+        """
+        Look up a cached result.
+
+        Args:
+            kind (str): Lookup kind, e.g. "profile" or "news".
+            query (str): The search query.
+            ttl (float): Maximum age of a usable entry in seconds.
+
+        Returns:
+            str or None: The cached result, or None on a miss or if expired.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM lookups WHERE kind = ? AND query = ?",
+                (kind, query.lower()),
+            ).fetchone()
+            if row is None or time.time() - row[1] > ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def set(self, kind, query, value):
+        """
+        Store a lookup result.
+
+        Args:
+            kind (str): Lookup kind, e.g. "profile" or "news".
+            query (str): The search query.
+            value (str): The result to cache.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO lookups (kind, query, value, created) VALUES (?, ?, ?, ?)",
+                (kind, query.lower(), value, time.time()),
+            )
+            self._conn.commit()
+
+    def evict(self, max_age):
+        """
+        Remove entries older than ``max_age`` seconds.
+
+        Args:
+            max_age (float): Age in seconds beyond which entries are removed.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM lookups WHERE created < ?", (time.time() - max_age,))
+            self._conn.commit()
+            return cur.rowcount
+
+    def close(self):
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,212 @@
+"""
+Compaction module for shrinking deck text before it is sent to the LLM.
+
+Extracted deck text repeats the same headers, footers and boilerplate on
+every page, carries page numbers and runs of whitespace, and large decks can
+exceed a model's context window. This module removes that noise page by
+page (or slide by slide) and fits what remains into a token budget, keeping
+every page represented, so prompts are smaller and never overflow.
+"""
+
+import re
+
+from utils.pdf_parser import join_pages, page_text
+from utils.ppt_parser import slide_to_text
+from utils.retrieval import estimate_tokens
+
+# Lines that are only a page number, e.g. "7", "Page 7", "7 / 20", "- 7 -"
+_PAGE_NUMBER_RE = re.compile(r"^[-–—\s]*(?:page|slide|p\.)?\s*\d{1,4}(?:\s*(?:/|of)\s*\d{1,4})?[-–—\s]*$",
+                             re.IGNORECASE)
+_SPACES_RE = re.compile(r"[ \t\u00a0\u200b]+")
+_DIGITS_RE = re.compile(r"\d+")
+
+# Marker appended to pages that were shortened to fit the budget
+TRUNCATION_MARKER = "[...]"
+
+
+def normalize_whitespace(text):
+    """
+    Collapse runs of spaces and tabs, strip lines and drop empty lines.
+
+    Args:
+        text (str): Text to normalise.
+
+    Returns:
+        str: Non-empty stripped lines joined by newlines.
+    """
+    lines = (_SPACES_RE.sub(" ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _line_key(line):
+    """
+    Key used to recognise a repeated line; numbers are ignored so that
+    footers such as "Acme | Page 3" match across pages.
+    """
+    return _DIGITS_RE.sub("#", line.lower())
+
+
+def repeated_lines(texts, min_fraction=0.5, min_units=3):
+    """
+    Find lines that repeat across many pages or slides.
+
+    Args:
+        texts (list): Normalised text of each page or slide.
+        min_fraction (float): Minimum share of pages a line must appear on.
+                              Defaults to 0.5.
+        min_units (int): Decks with fewer non-empty pages are left alone.
+                         Defaults to 3.
+
+    Returns:
+        set: Keys (see _line_key) of the repeated lines.
+    """
+    texts = [text for text in texts if text]
+    if len(texts) < min_units:
+        return set()
+    counts = {}
+    for text in texts:
+        for key in {_line_key(line) for line in text.splitlines()}:
+            counts[key] = counts.get(key, 0) + 1
+    threshold = max(2, min_fraction * len(texts))
+    return {key for key, count in counts.items() if count >= threshold}
+
+
+def _compact_texts(texts, min_fraction):
+    """
+    Compact the texts of a deck's pages or slides.
+
+    Page numbers are dropped, repeated lines are kept only where they first
+    appear, and pages identical to an earlier page are emptied.
+    """
+    texts = [normalize_whitespace(text) for text in texts]
+    repeated = repeated_lines(texts, min_fraction)
+    seen_lines, seen_texts, compacted = set(), set(), []
+    for text in texts:
+        kept = []
+        for line in text.splitlines():
+            if _PAGE_NUMBER_RE.match(line):
+                continue
+            key = _line_key(line)
+            if key in repeated:
+                if key in seen_lines:
+                    continue
+                seen_lines.add(key)
+            kept.append(line)
+        text = "\n".join(kept)
+        if text in seen_texts:
+            text = ""
+        elif text:
+            seen_texts.add(text)
+        compacted.append(text)
+    return compacted
+
+
+def fit_to_budget(texts, token_budget):
+    """
+    Shorten texts so that together they fit a token budget.
+
+    Every text gets an equal share of the budget; the share short texts do
+    not use is redistributed to the longer ones. Texts over their share are
+    cut at a line boundary (see head_within_budget) and marked with
+    TRUNCATION_MARKER.
+
+    Args:
+        texts (list): Texts of each page or slide.
+        token_budget (int): Total token budget.
+
+    Returns:
+        list: The texts, shortened where necessary.
+    """
+    costs = [estimate_tokens(text) if text else 0 for text in texts]
+    if sum(costs) <= token_budget:
+        return list(texts)
+
+    # Water-filling: find the per-page allowance that spends the budget
+    remaining, open_pages = token_budget, sorted((c, i) for i, c in enumerate(costs) if c)
+    allowance = {}
+    while open_pages:
+        share = remaining // len(open_pages)
+        cost, index = open_pages[0]
+        if cost > share:
+            for _, index in open_pages:
+                allowance[index] = share
+            break
+        allowance[index] = cost
+        remaining -= cost
+        open_pages.pop(0)
+
+    fitted = []
+    for index, text in enumerate(texts):
+        if not text or costs[index] <= allowance[index]:
+            fitted.append(text)
+            continue
+        head = head_within_budget(text, allowance[index] - estimate_tokens(TRUNCATION_MARKER))
+        fitted.append(f"{head}\n{TRUNCATION_MARKER}" if head else "")
+    return fitted
+
+
+def compact_deck(deck_data, token_budget=None, min_fraction=0.5):
+    """
+    Build a compacted copy of parsed deck data.
+
+    Page and slide records keep their numbers and titles, so retrieval
+    labels and incremental diffs still refer to the original deck, and
+    'raw_text' is rebuilt from the compacted records.
+
+    Args:
+        deck_data (dict): Parsed deck data as returned by parse_deck.
+        token_budget (int): Maximum estimated tokens for 'raw_text'. None
+                            disables budget fitting.
+        min_fraction (float): Share of pages a line must appear on to count
+                              as a repeated header or footer. Defaults to 0.5.
+
+    Returns:
+        dict: Compacted deck data with the same keys as ``deck_data``.
+    """
+    compacted = dict(deck_data)
+    if deck_data.get("slides"):
+        slides = deck_data["slides"]
+        texts = _compact_texts([slide_to_text(slide) for slide in slides], min_fraction)
+        if token_budget:
+            texts = fit_to_budget(texts, token_budget)
+        # Notes are already part of the compacted text
+        compacted["slides"] = [dict(slide, text=text, notes="", chars=len(text))
+                               for slide, text in zip(slides, texts)]
+    elif deck_data.get("pages"):
+        pages = deck_data["pages"]
+        texts = _compact_texts([page_text(deck_data, page) for page in pages], min_fraction)
+        if token_budget:
+            texts = fit_to_budget(texts, token_budget)
+        # Page records address the rebuilt text by offset
+        compacted["raw_text"], compacted["pages"] = join_pages(
+            [dict(page, text=text) for page, text in zip(pages, texts)])
+        return compacted
+    else:
+        texts = [normalize_whitespace(deck_data.get("raw_text", ""))]
+        if token_budget:
+            texts = fit_to_budget(texts, token_budget)
+    compacted["raw_text"] = "".join(text + "\n" for text in texts if text)
+    return compacted
+
+
+def head_within_budget(text, token_budget):
+    """
+    Return the leading lines of a text that fit a token budget.
+
+    Args:
+        text (str): Text to shorten.
+        token_budget (int): Maximum estimated tokens.
+
+    Returns:
+        str: Whole lines from the start of ``text``; a first line longer
+             than the budget is cut by characters.
+    """
+    kept, used = [], 0
+    for line in text.splitlines():
+        used += estimate_tokens(line)
+        if used > token_budget:
+            break
+        kept.append(line)
+    if not kept and text and token_budget > 0:
+        return text[:token_budget * 4]
+    return "\n".join(kept)
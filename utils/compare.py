@@ -0,0 +1,411 @@
+"""
+Comparison module for ranking many analysed decks side by side.
+
+Every run stores its enriched sections as JSON next to the markdown report.
+This module loads those files (or, for older reports, the sections kept in
+their state files) into a columnar table: the AI Investment Signal Score
+dimensions and a few key metrics are extracted once per deck into NumPy
+arrays, and the ranking and distribution statistics are computed with
+vectorised operations. No LLM calls are made, so comparing thousands of
+decks takes seconds.
+"""
+
+import glob
+import json
+import math
+import os
+import re
+
+from utils.incremental import load_state
+from utils.writers import atomic_write, render_outputs
+
+# Score dimensions requested by the "AI Investment Signal Score" section
+SCORE_COLUMNS = ("Product", "Team", "Market", "Investment Fit")
+
+# Key metrics extracted from the traction and funding sections
+METRIC_COLUMNS = ("Raise (USD)", "Revenue (USD/yr)", "Growth (%)", "Customers")
+
+_NUMBER = r"(\d+(?:[.,]\d+)*)"
+_MONEY_RE = re.compile(
+    r"(?:\$|USD\s?|US\$|€|EUR\s?|£|GBP\s?)\s?" + _NUMBER
+    + r"\s*(k|thousand|m|mm|mn|million|b|bn|billion)?\b",
+    re.IGNORECASE,
+)
+_PERCENT_RE = re.compile(_NUMBER + r"\s?%")
+_COUNT_RE = re.compile(_NUMBER + r"\s*(k|m)?\+?\s+(?:paying\s+|active\s+|enterprise\s+)?"
+                       r"(?:customers|users|clients|subscribers)\b", re.IGNORECASE)
+_MULTIPLIERS = {"k": 1e3, "thousand": 1e3, "m": 1e6, "mm": 1e6, "mn": 1e6, "million": 1e6,
+                "b": 1e9, "bn": 1e9, "billion": 1e9}
+
+
+def enriched_path(output_file):
+    """
+    Return the path of the enriched JSON stored next to a report.
+
+    Args:
+        output_file (str): Path of the generated report.
+
+    Returns:
+        str: Path of the JSON file next to the report.
+    """
+    return os.path.splitext(output_file)[0] + ".enriched.json"
+
+
+def save_enriched(enriched, path):
+    """
+    Atomically write the enriched sections of a deck as JSON.
+
+    Args:
+        enriched (dict): Company name and section contents.
+        path (str): Destination path, usually ``enriched_path(report)``.
+
+    Note:
+        Reports written with write_outputs already include this file when
+        the "json" output format is enabled.
+    """
+    atomic_write(path, render_outputs(enriched, ["json"])["json"])
+
+
+def load_enriched(path):
+    """
+    Load the enriched sections of a report.
+
+    Args:
+        path (str): Path of an enriched JSON file, or of a report whose
+                    enriched JSON or state file sits next to it.
+
+    Returns:
+        dict or None: Company name and section contents, or None if the
+                      report has neither file.
+    """
+    json_path = path if path.endswith(".enriched.json") else enriched_path(path)
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+    # Reports written before the enriched JSON existed keep sections in their state
+    base = path[:-len(".enriched.json")] if path.endswith(".enriched.json") else os.path.splitext(path)[0]
+    state = load_state(base + ".state.json")
+    if not state:
+        return None
+    enriched = {"Company Name": state.get("company_name", "")}
+    enriched.update((name, entry["content"]) for name, entry in state.get("sections", {}).items())
+    return enriched
+
+
+def find_reports(output_dir):
+    """
+    List the analysed decks in a directory.
+
+    Args:
+        output_dir (str): Directory holding reports and their sidecars.
+
+    Returns:
+        list: Sorted report base paths (without extension) that have an
+              enriched JSON or state file.
+    """
+    bases = {path[:-len(".enriched.json")] for path in glob.glob(os.path.join(output_dir, "*.enriched.json"))}
+    bases.update(path[:-len(".state.json")] for path in glob.glob(os.path.join(output_dir, "*.state.json")))
+    return sorted(bases)
+
+
+def parse_amount(number, suffix=None):
+    """
+    Convert a matched number and magnitude suffix into a float.
+
+    Args:
+        number (str): Digits with optional thousands separators or decimals.
+        suffix (str): Magnitude such as "k", "M" or "billion".
+
+    Returns:
+        float: The amount, or NaN if the number cannot be read.
+    """
+    if re.fullmatch(r"\d{1,3}(,\d{3})+(\.\d+)?", number):
+        number = number.replace(",", "")
+    elif re.fullmatch(r"\d{1,3}(\.\d{3}){2,}", number):
+        number = number.replace(".", "")
+    try:
+        value = float(number.replace(",", "."))
+    except ValueError:
+        return math.nan
+    return value * _MULTIPLIERS.get((suffix or "").lower(), 1)
+
+
+def extract_scores(text):
+    """
+    Extract the signal score of each dimension from the score section.
+
+    Accepts the usual ways of writing a score, e.g. "Product: 8/10",
+    "**Team** - 7 out of 10" or a markdown table row "| Market | 6 |".
+
+    Args:
+        text (str): Content of the "AI Investment Signal Score" section.
+
+    Returns:
+        list: One score per SCORE_COLUMNS entry, NaN where none was found.
+    """
+    scores = []
+    for column in SCORE_COLUMNS:
+        pattern = re.compile(re.escape(column) + r"\b[^\d\n]{0,40}?(\d{1,2}(?:\.\d+)?)\s*(/\s*10|out of 10)?",
+                             re.IGNORECASE)
+        # Prefer an explicit "/10" match over the first number on the line
+        matches = list(pattern.finditer(text or ""))
+        explicit = [m for m in matches if m.group(2)]
+        match = (explicit or matches or [None])[0]
+        value = float(match.group(1)) if match else math.nan
+        scores.append(value if 0 <= value <= 10 else math.nan)
+    return scores
+
+
+def _first_after(text, keywords, value_re):
+    """
+    Return the first value match following a keyword on the same line.
+    """
+    keyword_re = re.compile(r"\b(?:" + "|".join(keywords) + r")", re.IGNORECASE)
+    for line in (text or "").splitlines():
+        keyword = keyword_re.search(line)
+        if keyword:
+            match = value_re.search(line, keyword.start())
+            if match:
+                return match
+    return None
+
+
+def extract_metrics(enriched):
+    """
+    Extract key metrics from the traction and funding sections.
+
+    Args:
+        enriched (dict): Company name and section contents.
+
+    Returns:
+        list: One value per METRIC_COLUMNS entry, NaN where none was found.
+    """
+    traction = enriched.get("Traction & Metrics", "")
+    funding = enriched.get("Funding & Financials", "")
+    both = f"{traction}\n{funding}"
+
+    raise_match = _first_after(funding, ["rais", "round", "seeking", "ask"], _MONEY_RE)
+    raise_usd = parse_amount(*raise_match.groups()) if raise_match else math.nan
+
+    revenue_usd = math.nan
+    revenue_match = _first_after(both, ["ARR", "revenue", "MRR", "sales"], _MONEY_RE)
+    if revenue_match:
+        revenue_usd = parse_amount(*revenue_match.groups())
+        # Monthly figures are annualised
+        if re.search(r"\bMRR\b|monthly", revenue_match.string[:revenue_match.start()], re.IGNORECASE):
+            revenue_usd *= 12
+
+    growth_match = _first_after(traction, ["grow", "growth", "MoM", "YoY", "increase"], _PERCENT_RE)
+    growth = parse_amount(growth_match.group(1)) if growth_match else math.nan
+
+    count_match = _COUNT_RE.search(traction)
+    customers = parse_amount(*count_match.groups()) if count_match else math.nan
+    return [raise_usd, revenue_usd, growth, customers]
+
+
+def build_table(reports, report_ext=".md"):
+    """
+    Load reports into a columnar table.
+
+    Args:
+        reports (list): Report base paths, e.g. from find_reports.
+        report_ext (str): Extension of the reports. Defaults to ".md".
+
+    Returns:
+        dict: 'company' and 'report' (object arrays), 'scores' (one row per
+              deck, one column per SCORE_COLUMNS entry) and 'metrics' (one
+              column per METRIC_COLUMNS entry) as float arrays with NaN for
+              missing values. Reports that cannot be loaded are skipped.
+    """
+    import numpy as np
+
+    companies, paths, score_rows, metric_rows = [], [], [], []
+    for base in reports:
+        enriched = load_enriched(base + ".enriched.json")
+        if enriched is None:
+            continue
+        companies.append(enriched.get("Company Name", "") or os.path.basename(base))
+        paths.append(base + report_ext)
+        score_rows.append(extract_scores(enriched.get("AI Investment Signal Score", "")))
+        metric_rows.append(extract_metrics(enriched))
+    return {
+        "company": np.array(companies, dtype=object),
+        "report": np.array(paths, dtype=object),
+        "scores": np.array(score_rows, dtype=np.float64).reshape(len(score_rows), len(SCORE_COLUMNS)),
+        "metrics": np.array(metric_rows, dtype=np.float64).reshape(len(metric_rows), len(METRIC_COLUMNS)),
+    }
+
+
+def rank_table(table):
+    """
+    Rank decks by their overall signal score.
+
+    The overall score is the mean of the available dimension scores. Decks
+    without any score are ranked last; ties keep the table order.
+
+    Args:
+        table (dict): Table as returned by build_table.
+
+    Returns:
+        tuple: (order, overall, percentile) where ``order`` indexes the rows
+               from best to worst, ``overall`` is the score per row and
+               ``percentile`` the share of scored decks each row beats or
+               ties (NaN for unscored decks).
+    """
+    import numpy as np
+
+    scores = table["scores"]
+    present = ~np.isnan(scores)
+    counts = present.sum(axis=1)
+    totals = np.where(present, scores, 0.0).sum(axis=1)
+    overall = np.divide(totals, counts, out=np.full(len(scores), np.nan), where=counts > 0)
+
+    # Unscored decks sort after every scored one
+    order = np.argsort(np.where(np.isnan(overall), np.inf, -overall), kind="stable")
+    scored = np.sort(overall[~np.isnan(overall)])
+    percentile = np.full(len(overall), np.nan)
+    if len(scored):
+        valid = ~np.isnan(overall)
+        percentile[valid] = np.searchsorted(scored, overall[valid], side="right") / len(scored) * 100
+    return order, overall, percentile
+
+
+def distribution_stats(table):
+    """
+    Compute distribution statistics for every score and metric column.
+
+    Args:
+        table (dict): Table as returned by build_table.
+
+    Returns:
+        dict: Column name to 'count', 'mean', 'std', 'min', 'p25', 'median',
+              'p75' and 'max' (None where a column has no values).
+    """
+    import numpy as np
+
+    columns = list(SCORE_COLUMNS) + list(METRIC_COLUMNS)
+    values = np.hstack([table["scores"], table["metrics"]])
+    counts = (~np.isnan(values)).sum(axis=0)
+    stats = {name: dict(count=int(count), mean=None, std=None, min=None, p25=None,
+                        median=None, p75=None, max=None)
+             for name, count in zip(columns, counts)}
+
+    # All-NaN columns are left out so NumPy does not warn about them
+    filled = np.flatnonzero(counts)
+    if not len(filled):
+        return stats
+    subset = values[:, filled]
+    quantiles = np.nanpercentile(subset, [0, 25, 50, 75, 100], axis=0)
+    means = np.nanmean(subset, axis=0)
+    stds = np.nanstd(subset, axis=0)
+    for j, column in enumerate(filled):
+        stats[columns[column]].update(
+            mean=round(float(means[j]), 3),
+            std=round(float(stds[j]), 3),
+            min=float(quantiles[0, j]),
+            p25=round(float(quantiles[1, j]), 3),
+            median=round(float(quantiles[2, j]), 3),
+            p75=round(float(quantiles[3, j]), 3),
+            max=float(quantiles[4, j]),
+        )
+    return stats
+
+
+def format_value(value, column):
+    """
+    Format a table cell for markdown.
+
+    Args:
+        value (float): Cell value, NaN if missing.
+        column (str): Column name, used to pick the unit.
+
+    Returns:
+        str: Human-readable value, or "–" if missing.
+    """
+    if value is None or math.isnan(value):
+        return "–"
+    if "USD" in column:
+        for limit, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "k")):
+            if abs(value) >= limit:
+                return f"${value / limit:.3g}{suffix}"
+        return f"${value:.0f}"
+    if column == "Customers":
+        return f"{value:,.0f}"
+    return f"{value:.3g}"
+
+
+def render_comparison(table, order, overall, percentile, stats):
+    """
+    Render the ranked comparison table and distribution stats as markdown.
+
+    Args:
+        table (dict): Table as returned by build_table.
+        order (numpy.ndarray): Row order from rank_table.
+        overall (numpy.ndarray): Overall score per row from rank_table.
+        percentile (numpy.ndarray): Percentile per row from rank_table.
+        stats (dict): Result of distribution_stats.
+
+    Returns:
+        str: The markdown document.
+    """
+    header = ["Rank", "Company", "Overall", "Percentile", *SCORE_COLUMNS, *METRIC_COLUMNS, "Report"]
+    lines = [
+        f"# Deck Comparison ({len(order)} decks)",
+        "",
+        "| " + " | ".join(header) + " |",
+        "|" + "---|" * len(header),
+    ]
+    for rank, i in enumerate(order, 1):
+        cells = [str(rank), str(table["company"][i]).replace("|", "/"),
+                 format_value(overall[i], "Overall"), format_value(percentile[i], "Percentile")]
+        cells += [format_value(v, c) for v, c in zip(table["scores"][i], SCORE_COLUMNS)]
+        cells += [format_value(v, c) for v, c in zip(table["metrics"][i], METRIC_COLUMNS)]
+        cells.append(os.path.basename(table["report"][i]))
+        lines.append("| " + " | ".join(cells) + " |")
+
+    lines += ["", "## Distribution", "",
+              "| Column | Decks | Mean | Std | Min | P25 | Median | P75 | Max |",
+              "|---|---|---|---|---|---|---|---|---|"]
+    for column, s in stats.items():
+        cells = [format_value(s.get(k), column) for k in ("mean", "std", "min", "p25", "median", "p75", "max")]
+        lines.append(f"| {column} | {s['count']} | " + " | ".join(cells) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def compare_reports(output_dir, outfile=None, report_ext=".md"):
+    """
+    Build the cross-deck comparison for every report in a directory.
+
+    Args:
+        output_dir (str): Directory holding the reports and their sidecars.
+        outfile (str): Markdown destination. Defaults to
+                       "<output_dir>/comparison.md"; a JSON version with the
+                       same rows and stats is written next to it.
+        report_ext (str): Extension of the reports, as configured by
+                          'output_file'. Defaults to ".md".
+
+    Returns:
+        dict: 'decks' (ranked rows) and 'stats', as written to the JSON file.
+    """
+    table = build_table(find_reports(output_dir), report_ext)
+    order, overall, percentile = rank_table(table)
+    stats = distribution_stats(table)
+
+    outfile = outfile or os.path.join(output_dir, "comparison.md")
+    atomic_write(outfile, render_comparison(table, order, overall, percentile, stats))
+
+    def cell(value):
+        return None if math.isnan(value) else round(float(value), 3)
+
+    rows = []
+    for rank, i in enumerate(order, 1):
+        row = {"rank": rank, "company": table["company"][i], "report": table["report"][i],
+               "overall": cell(overall[i]), "percentile": cell(percentile[i])}
+        row.update((c, cell(v)) for c, v in zip(SCORE_COLUMNS, table["scores"][i]))
+        row.update((c, cell(v)) for c, v in zip(METRIC_COLUMNS, table["metrics"][i]))
+        rows.append(row)
+    result = {"decks": rows, "stats": stats}
+    atomic_write(os.path.splitext(outfile)[0] + ".json", json.dumps(result, indent=2, ensure_ascii=False))
+    return result
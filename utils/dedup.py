@@ -0,0 +1,345 @@
+"""
+Deduplication module for detecting near-duplicate decks before enrichment.
+
+This module computes MinHash signatures over word shingles of a deck's
+parsed text and keeps them in a persistent SQLite-backed LSH index. A new
+deck is compared only with the decks sharing at least one LSH band bucket,
+so lookups stay fast with tens of thousands of indexed decks. When an
+earlier deck is similar enough, its analysis is reused instead of paying
+for the full set of LLM calls again.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+from utils.compare import load_enriched
+from utils.enrich import failed_sections
+
+_WORD_RE = re.compile(r"\w+")
+
+# Odd 64-bit multiplier used to combine token hashes into shingle hashes
+_SHINGLE_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+class MinHasher:
+    """
+    Computes MinHash signatures of texts with NumPy.
+
+    Each permutation is a multiply-shift hash of the 64-bit shingle hashes,
+    so a signature is ``num_perm`` unsigned 32-bit minima.
+    """
+
+    def __init__(self, num_perm=128, shingle_size=5, seed=1, min_shingles=1):
+        """
+        Initialize the permutations.
+
+        Args:
+            num_perm (int): Signature length. Defaults to 128.
+            shingle_size (int): Words per shingle. Defaults to 5.
+            seed (int): Seed of the permutations; signatures are only
+                        comparable between hashers with the same seed.
+            min_shingles (int): Texts with fewer distinct shingles get no
+                                signature. Defaults to 1.
+        """
+        import numpy as np
+
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.min_shingles = max(1, min_shingles)
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing needs odd multipliers
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text):
+        """
+        Hash the word shingles of a text.
+
+        Args:
+            text (str): Text to shingle; case and punctuation are ignored.
+
+        Returns:
+            numpy.ndarray: Unique 64-bit shingle hashes.
+        """
+        import numpy as np
+
+        tokens = np.fromiter((zlib.crc32(w.encode("utf-8")) for w in _WORD_RE.findall(text.lower())),
+                             dtype=np.uint64)
+        if len(tokens) == 0:
+            return tokens
+        k = min(self.shingle_size, len(tokens))
+        count = len(tokens) - k + 1
+        hashes = np.zeros(count, dtype=np.uint64)
+        multiplier = np.uint64(_SHINGLE_MULTIPLIER)
+        with np.errstate(over="ignore"):
+            for offset in range(k):
+                hashes = hashes * multiplier + tokens[offset:offset + count]
+        return np.unique(hashes)
+
+    def signature(self, text, block=4096):
+        """
+        Compute the MinHash signature of a text.
+
+        Args:
+            text (str): Text to sign.
+            block (int): Shingles hashed per step, bounding memory use.
+
+        Returns:
+            numpy.ndarray or None: ``num_perm`` uint32 minima, or None if the
+                                   text has fewer than ``min_shingles``
+                                   shingles (e.g. an image-only deck), since
+                                   all such texts would look identical.
+        """
+        import numpy as np
+
+        shingles = self.shingles(text)
+        if len(shingles) < self.min_shingles:
+            return None
+        signature = np.full(self.num_perm, 0xFFFFFFFF, dtype=np.uint32)
+        with np.errstate(over="ignore"):
+            for start in range(0, len(shingles), block):
+                part = shingles[start:start + block, None]
+                hashed = ((part * self._a + self._b) >> np.uint64(32)).astype(np.uint32)
+                np.minimum(signature, hashed.min(axis=0), out=signature)
+        return signature
+
+
+def similarity(signature_a, signature_b):
+    """
+    Estimate the Jaccard similarity of two texts from their signatures.
+
+    Args:
+        signature_a (numpy.ndarray): MinHash signature.
+        signature_b (numpy.ndarray): MinHash signature of the same length.
+
+    Returns:
+        float: Share of equal signature positions, between 0 and 1.
+    """
+    return float((signature_a == signature_b).mean())
+
+
+def lsh_params(threshold, num_perm, recall=0.99):
+    """
+    Choose the LSH band layout for a similarity threshold.
+
+    A pair with Jaccard similarity s shares a bucket with probability
+    ``1 - (1 - s**rows)**bands``. Candidates are verified against their full
+    signature anyway, so the layout with the most rows per band (fewest
+    spurious candidates) that still finds a pair at the threshold with
+    probability ``recall`` is used.
+
+    Args:
+        threshold (float): Similarity above which decks are duplicates.
+        num_perm (int): Signature length.
+        recall (float): Minimum probability of finding a pair exactly at
+                        the threshold. Defaults to 0.99.
+
+    Returns:
+        tuple: (bands, rows) with ``bands * rows <= num_perm``.
+    """
+    for rows in range(num_perm, 0, -1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            return bands, rows
+    return num_perm, 1
+
+
+class DedupIndex:
+    """
+    Persistent LSH index of deck MinHash signatures.
+
+    The database file can safely be shared between threads and processes.
+    """
+
+    def __init__(self, path=".cache/dedup.sqlite", threshold=0.9, num_perm=128, shingle_size=5,
+                 min_shingles=32):
+        """
+        Open (or create) the index database.
+
+        Args:
+            path (str): Location of the SQLite database file.
+                        Defaults to ".cache/dedup.sqlite".
+            threshold (float): Estimated Jaccard similarity at or above which
+                               two decks are near-duplicates. Defaults to 0.9.
+            num_perm (int): MinHash signature length. Defaults to 128.
+            shingle_size (int): Words per shingle. Defaults to 5.
+            min_shingles (int): Decks with fewer distinct shingles are too
+                                short to compare and are neither matched
+                                nor indexed. Defaults to 32.
+        """
+        self.path = path
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size, min_shingles=min_shingles)
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS decks ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, file TEXT UNIQUE, output TEXT, "
+            "signature BLOB, created REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (band INTEGER, bucket INTEGER, deck_id INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (band, bucket)")
+        self._check_layout(f"{num_perm}:{shingle_size}", f"{self.bands}x{self.rows}")
+        self._conn.commit()
+
+    def _check_layout(self, signature_layout, band_layout):
+        """
+        Reconcile the index with the configured settings.
+
+        Signatures from other MinHash settings are dropped; a different band
+        layout (e.g. after a threshold change) only re-buckets the stored
+        signatures.
+        """
+        import numpy as np
+
+        stored = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        if stored.get("signature", signature_layout) != signature_layout:
+            print(f"MinHash settings changed; clearing the dedup index at {self.path}")
+            self._conn.execute("DELETE FROM decks")
+            self._conn.execute("DELETE FROM buckets")
+        elif stored.get("bands", band_layout) != band_layout:
+            self._conn.execute("DELETE FROM buckets")
+            for deck_id, blob in self._conn.execute("SELECT id, signature FROM decks").fetchall():
+                self._conn.executemany(
+                    "INSERT INTO buckets (band, bucket, deck_id) VALUES (?, ?, ?)",
+                    [(band, bucket, deck_id) for band, bucket
+                     in self._bucket_keys(np.frombuffer(blob, dtype=np.uint32))],
+                )
+        self._conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                               [("signature", signature_layout), ("bands", band_layout)])
+
+    def signature(self, text):
+        """
+        Compute the MinHash signature of a deck text.
+
+        Args:
+            text (str): The deck's 'raw_text'.
+
+        Returns:
+            numpy.ndarray or None: The signature, or None if the text is too
+                                   short to compare.
+        """
+        return self.hasher.signature(text)
+
+    def _bucket_keys(self, signature):
+        """
+        Hash each band of a signature into a signed 64-bit bucket key.
+        """
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(chunk, digest_size=8).digest()
+            keys.append((band, int.from_bytes(digest, "big", signed=True)))
+        return keys
+
+    def query(self, signature, exclude_file=None):
+        """
+        Find the most similar indexed deck at or above the threshold.
+
+        Args:
+            signature (numpy.ndarray): Signature of the new deck.
+            exclude_file (str): Source file to ignore, so a deck is not
+                                reported as a duplicate of its own earlier
+                                analysis.
+
+        Returns:
+            dict or None: 'file', 'output' and 'similarity' of the match.
+        """
+        import numpy as np
+
+        keys = self._bucket_keys(signature)
+        exclude = os.path.abspath(exclude_file) if exclude_file else None
+        with self._lock:
+            candidates = set()
+            for band, bucket in keys:
+                candidates.update(row[0] for row in self._conn.execute(
+                    "SELECT deck_id FROM buckets WHERE band = ? AND bucket = ?", (band, bucket)))
+            rows = [self._conn.execute("SELECT file, output, signature FROM decks WHERE id = ?",
+                                       (deck_id,)).fetchone() for deck_id in candidates]
+
+        best = None
+        for row in rows:
+            if row is None or row[0] == exclude:
+                continue
+            score = similarity(signature, np.frombuffer(row[2], dtype=np.uint32))
+            if score >= self.threshold and (best is None or score > best["similarity"]):
+                best = {"file": row[0], "output": row[1], "similarity": round(score, 3)}
+        return best
+
+    def add(self, file_path, output, signature):
+        """
+        Index a deck, replacing an earlier entry for the same source file.
+
+        Args:
+            file_path (str): Path of the deck file.
+            output (str): Path of the report generated for it.
+            signature (numpy.ndarray): The deck's signature.
+        """
+        file_path = os.path.abspath(file_path)
+        with self._lock:
+            old = self._conn.execute("SELECT id FROM decks WHERE file = ?", (file_path,)).fetchone()
+            if old is not None:
+                self._conn.execute("DELETE FROM buckets WHERE deck_id = ?", (old[0],))
+                self._conn.execute("DELETE FROM decks WHERE id = ?", (old[0],))
+            cur = self._conn.execute(
+                "INSERT INTO decks (file, output, signature, created) VALUES (?, ?, ?, ?)",
+                (file_path, output, signature.tobytes(), time.time()),
+            )
+            self._conn.executemany(
+                "INSERT INTO buckets (band, bucket, deck_id) VALUES (?, ?, ?)",
+                [(band, bucket, cur.lastrowid) for band, bucket in self._bucket_keys(signature)],
+            )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM decks").fetchone()[0]
+
+    def close(self):
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+def find_reusable(index, signature, file_path):
+    """
+    Look up the analysis of a near-duplicate of a deck.
+
+    Args:
+        index (DedupIndex): The dedup index.
+        signature (numpy.ndarray): Signature of the deck's raw text, or None
+                                   for a deck too short to compare.
+        file_path (str): Path of the deck file.
+
+    Returns:
+        tuple: (enriched, match) with the earlier deck's enriched sections and
+               the match returned by ``DedupIndex.query``, or (None, None) if
+               there is no near-duplicate whose report can still be loaded
+               and has no failed sections.
+    """
+    if signature is None:
+        return None, None
+    match = index.query(signature, exclude_file=file_path)
+    if match is None:
+        return None, None
+    enriched = load_enriched(match["output"])
+    # Failure notes from an earlier outage must not spread to every near-duplicate
+    if not enriched or failed_sections(enriched):
+        return None, None
+    return enriched, match
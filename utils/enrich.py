@@ -6,15 +6,58 @@ pitch deck data with external web intelligence and AI analysis to generate
 comprehensive investment insights.
 """
 
-from dotenv import load_dotenv
-load_dotenv()
-import os
-from tqdm import tqdm
+import functools
+import json
+import re
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.env import openrouter_key
 from utils.web_enrich import fetch_company_profile, fetch_latest_news
-import requests
+from utils.transport import get_client
+from utils.compaction import head_within_budget
+from utils.incremental import section_fingerprint
+from utils.metrics import Metrics
+from utils.pdf_parser import page_text
+from utils.retrieval import BM25Index, deck_chunks, estimate_tokens, format_chunks, select_chunks
+from utils.routing import ModelRouter, exclusive_stream
+# OpenRouter chat completions endpoint
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
 
-# Load API key from environment variables
-OPENROUTER_KEY = os.environ.get("OPENROUTER_API_KEY", "")
+# Analysis sections with specific instructions for each
+SECTIONS = [
+    ("Executive Summary", "Give a 3-5 line summary for a VC on this company."),
+    ("Team", "Summarize team/founders. If LinkedIn/track record is available, add it or infer plausible founder profiles."),
+    ("Product", "Describe product/technology and USP. Make it investor-focused."),
+    ("Market", "Estimate market size, main competitors, TAM/SAM/SOM if possible."),
+    ("Traction & Metrics", "Extract key metrics, growth stats, and highlight any recent news. Infer plausible stats if missing."),
+    ("Funding & Financials", "Current round, past funding, cap table signals. Guess if not stated."),
+    ("Competitive Landscape Map", "Create a Mermaid markdown chart that shows this company and at least 3 main competitors, indicating placement on a feature or market axis. Guess if insufficient data."),
+    ("Sentiment & Hype", "Analyze the language for hype and sentiment. Point out risky or exaggerated claims from an investor perspective."),
+    ("AI Investment Signal Score", "Give a score (1-10) for Product, Team, Market, and Investment Fit. Justify each briefly as if you were an AI analyst for an early-stage fund."),
+    ("Risks & Unique Strengths", "List any red flags and unique strengths. If not mentioned, infer possible ones."),
+    ("Missing Info & Diligence Questions", "What important due diligence questions are left open? What data gaps should an investor clarify? Provide 3+ questions.")
+]
+
+# System message of every section and fused request; it starts the prompt
+# prefix that is shared by all requests for a deck
+SYSTEM_PROMPT = (
+    "You are an AI analyst for an early-stage venture fund. You analyse a company from "
+    "its pitch deck and public web information and write concise, investor-focused answers."
+)
+
+# Model name prefixes of providers that need explicit cache_control breakpoints
+# (others, such as OpenAI and DeepSeek, cache shared prompt prefixes automatically)
+CACHE_CONTROL_MODELS = ("anthropic/", "google/gemini")
+
+# Content prefix marking a section whose generation failed
+FAILED_SECTION_PREFIX = "_Section generation failed:"
+
+# Token budget for the deck text sent with the company name prompt
+NAME_PROMPT_BUDGET = 750
+
+# Sections generated from the deck alone, without waiting for web enrichment
+OFFLINE_SECTIONS = ("Product", "Sentiment & Hype", "Competitive Landscape Map")
 
 
 class Enricher:
@@ -28,29 +71,119 @@ class Enricher:
     - Structured output generation for investment decision-making
     """
     
-    def __init__(self, api_key=OPENROUTER_KEY, model_name="deepseek-v3"):
+    def __init__(self, api_key=None, model_name="deepseek-v3", max_concurrency=1,
+                 cache=None, refresh=False, show_progress=True, http_client=None,
+                 context_mode="full", retrieval_top_k=6, section_budgets=None,
+                 default_section_budget=1500, generation_mode="sections", fused_groups=None,
+                 offline_sections=None, name_heuristic=True, stream=False,
+                 api_url=None, routing=None, cache_control_models=None, prime_prompt_cache=False):
         """
         Initialize the Enricher with API credentials and model configuration.
         
         Args:
-            api_key (str): OpenRouter API key for authentication.
+            api_key (str): OpenRouter API key for authentication. Defaults
+                           to OPENROUTER_API_KEY from the environment or
+                           .env file, read when the Enricher is created.
             model_name (str): Name of the LLM model to use for analysis.
                              Defaults to "deepseek-v3".
+            max_concurrency (int): Maximum number of sections generated in
+                                   parallel. Defaults to 1 (sequential).
+            cache (ResponseCache): Optional persistent cache for completions.
+                                   Defaults to None (no caching).
+            refresh (bool): If True, ignore cached completions but still store
+                            fresh ones. Defaults to False.
+            show_progress (bool): Display a per-deck progress bar.
+                                  Defaults to True.
+            http_client (HttpClient): Transport used for API calls. Defaults
+                                      to the shared pooled client.
+            context_mode (str): "full" sends the whole deck with every section;
+                                "retrieval" sends only the chunks most relevant
+                                to each section. Defaults to "full".
+            retrieval_top_k (int): Maximum chunks selected per section in
+                                   retrieval mode. Defaults to 6.
+            section_budgets (dict): Per-section token budgets for selected deck
+                                    text in retrieval mode.
+            default_section_budget (int): Token budget for sections without an
+                                          entry in ``section_budgets``.
+            generation_mode (str): "sections" sends one request per section;
+                                   "fused" asks for several sections at once
+                                   as a JSON object. Defaults to "sections".
+            fused_groups (list): Lists of section names requested together in
+                                 fused mode. Defaults to one group with every
+                                 section.
+            offline_sections (list): Sections that do not use web data and
+                                     start before web enrichment finishes.
+                                     Defaults to OFFLINE_SECTIONS.
+            name_heuristic (bool): Try to read the company name from the title
+                                   slide or first page before asking the LLM.
+                                   Defaults to True.
+            stream (bool): Request completions as server-sent events so tokens
+                           can be handed to a callback as they arrive.
+                           Defaults to False.
+            api_url (str): Chat completions endpoint, e.g. a local stand-in
+                           for benchmarks. Defaults to OPENROUTER_URL.
+            routing (dict): ModelRouter options such as 'section_models',
+                            'fallback_models' and 'hedge'. Defaults to
+                            sending every request to ``model_name``.
+            cache_control_models (list): Model name prefixes whose requests
+                                         mark the shared context with a
+                                         cache_control breakpoint. Defaults
+                                         to CACHE_CONTROL_MODELS.
+            prime_prompt_cache (bool): Hold back sections sharing a context
+                                       until the first of them has started
+                                       answering, so the provider has cached
+                                       the prefix before the others are sent.
+                                       Defaults to False.
                              
         Raises:
             Exception: If API key is not provided or empty.
         """
-        self.api_key = api_key
+        self.api_key = api_key or openrouter_key()
         self.model_name = model_name
+        self.max_concurrency = max(1, int(max_concurrency or 1))
+        self.cache = cache
+        self.refresh = refresh
+        self.show_progress = show_progress
+        self.http = http_client or get_client()
+        if context_mode not in ("full", "retrieval"):
+            raise ValueError(f"Unknown context_mode: {context_mode}")
+        self.context_mode = context_mode
+        self.retrieval_top_k = retrieval_top_k
+        self.section_budgets = section_budgets or {}
+        self.default_section_budget = default_section_budget
+        if generation_mode not in ("sections", "fused"):
+            raise ValueError(f"Unknown generation_mode: {generation_mode}")
+        self.generation_mode = generation_mode
+        self.fused_groups = fused_groups
+        self.offline_sections = set(OFFLINE_SECTIONS if offline_sections is None else offline_sections)
+        self.name_heuristic = name_heuristic
+        self.stream = stream
+        self.api_url = api_url or OPENROUTER_URL
+        self.router = ModelRouter(model_name, **(routing or {}))
+        self.cache_control_models = tuple(CACHE_CONTROL_MODELS if cache_control_models is None
+                                          else cache_control_models)
+        self.prime_prompt_cache = prime_prompt_cache
         if not self.api_key:
             raise Exception("OpenRouter API key is not set. Please export OPENROUTER_API_KEY.")
 
-    def prompt_openrouter(self, prompt):
+    def prompt_openrouter(self, prompt, metrics=None, on_token=None, route=None):
         """
         Send a prompt to the OpenRouter API and return the response.
         
+        If a response cache is configured, a previous completion for the same
+        model and prompt is returned without contacting the API. When
+        streaming is enabled the completion is read as server-sent events.
+        The request goes to the model routed for ``route`` and fails over or
+        is hedged to the fallback models (see ModelRouter).
+        
         Args:
-            prompt (str): The prompt to send to the LLM.
+            prompt (str or ChatPrompt): The prompt to send to the LLM.
+            metrics (Metrics): Optional collector for request, token and
+                               cache counters.
+            on_token (callable): Called with each text delta as it arrives
+                                 when streaming is enabled.
+            route (str): Section name, or "Company Name" for the name prompt.
+                         Defaults to None (the default model).
             
         Returns:
             str: The generated response from the LLM.
@@ -59,37 +192,147 @@ class Enricher:
             requests.exceptions.HTTPError: If the API request fails.
             requests.exceptions.RequestException: If there's a network error.
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "model": self.model_name,
-            "messages": [{"role": "user", "content": prompt}]
-        }
+        cached = self._cached_completion(prompt, metrics, self.router.models(route))
+        if cached is not None:
+            return cached
+
+        stream_for = exclusive_stream(on_token) if on_token is not None else None
+
+        def request(model):
+            if self.stream:
+                return self._stream_completion(prompt, metrics, stream_for and stream_for(model),
+                                               model=model)
+            return self._request_completion(prompt, metrics, model=model)
+
+        return self.router.call(route, request, metrics=metrics)
+
+    def _request_completion(self, prompt, metrics=None, model=None):
+        """
+        Request a completion from one model without streaming.
+        """
+        import requests
 
         try:
-            r = requests.post("https://openrouter.ai/api/v1/chat/completions",
-            headers=headers, json=payload, timeout=60)
+            r = self.http.post(self.api_url, headers=self._headers(),
+            json=self._payload(prompt, model))
             r.raise_for_status()
         except requests.exceptions.HTTPError as e:
             print("OpenRouter error details:", r.text)  
             raise
-        return r.json()["choices"][0]["message"]["content"]
+        return self._completion_content(prompt, r.json(), metrics, model)
+
+    def _stream_completion(self, prompt, metrics=None, on_token=None, model=None):
+        """
+        Request a streamed completion and assemble it from its deltas.
+        """
+        import requests
+
+        payload = self._payload(prompt, model)
+        # Ask for the usage block, which OpenRouter sends with the last event
+        payload.update(stream=True, usage={"include": True})
+        r = self.http.post(self.api_url, headers=self._headers(), json=payload, stream=True)
+        with r:
+            try:
+                r.raise_for_status()
+            except requests.exceptions.HTTPError:
+                print("OpenRouter error details:", r.text)
+                raise
+            parts, usage = [], None
+            for event in iter_sse_data(r.iter_lines()):
+                if "error" in event:
+                    raise RuntimeError(f"OpenRouter stream error: {event['error']}")
+                usage = event.get("usage") or usage
+                for choice in event.get("choices") or []:
+                    delta = (choice.get("delta") or {}).get("content")
+                    if delta:
+                        parts.append(delta)
+                        if on_token is not None:
+                            on_token(delta)
+        body = {"choices": [{"message": {"content": "".join(parts)}}], "usage": usage}
+        return self._completion_content(prompt, body, metrics, model)
+
+    def _headers(self):
+        """
+        Build the OpenRouter request headers.
+        """
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
 
-    def enrich(self, deck_data):
+    def _payload(self, prompt, model=None):
+        """
+        Build the OpenRouter chat completion payload for a prompt.
+        """
+        model = model or self.model_name
+        if isinstance(prompt, ChatPrompt):
+            messages = prompt.messages(cache_control=model.startswith(self.cache_control_models))
+        else:
+            messages = [{"role": "user", "content": prompt}]
+        return {
+            "model": model,
+            "messages": messages
+        }
+
+    def _cached_completion(self, prompt, metrics=None, models=None):
+        """
+        Return the cached completion for a prompt, or None on a miss.
+        
+        Completions are stored under the model that answered, so the routed
+        model and then its fallbacks are looked up in turn.
+        """
+        if self.cache is None or self.refresh:
+            return None
+        text = prompt_text(prompt)
+        cached = None
+        for model in models or [self.model_name]:
+            cached = self.cache.get(model, text)
+            if cached is not None:
+                break
+        if metrics is not None:
+            metrics.add(**({"cache_hits": 1} if cached is not None else {"cache_misses": 1}))
+        return cached
+
+    def _completion_content(self, prompt, body, metrics=None, model=None):
+        """
+        Extract the completion text from a response body, recording token
+        usage and storing the completion in the cache.
+        """
+        if metrics is not None:
+            metrics.record_usage(body.get("usage"))
+        content = body["choices"][0]["message"]["content"]
+        if self.cache is not None:
+            self.cache.set(model or self.model_name, prompt_text(prompt), content)
+        return content
+
+    def enrich(self, deck_data, metrics=None, previous=None, fingerprints=None,
+               on_section=None, on_token=None):
         """
         Enrich pitch deck data with comprehensive AI analysis and external intelligence.
         
         This method performs the complete enrichment pipeline:
-        1. Extracts company name from pitch deck content
-        2. Gathers external web intelligence (company profile, news)
-        3. Combines all data sources for context
-        4. Generates structured analysis across 11 key investment dimensions
+        1. Starts the sections that only need the deck (OFFLINE_SECTIONS)
+        2. Extracts company name from pitch deck content
+        3. Gathers external web intelligence (company profile, news) concurrently
+        4. Combines all data sources for context
+        5. Generates structured analysis across 11 key investment dimensions
         
         Args:
             deck_data (dict): Dictionary containing parsed pitch deck data.
                              Must include 'raw_text' key with extracted text.
+            metrics (Metrics): Optional collector for stage timings and
+                               token counts of this deck.
+            previous (dict): Optional state of an earlier run (see
+                             utils.incremental). Sections whose inputs are
+                             unchanged are reused instead of regenerated.
+            fingerprints (dict): Optional dict that receives the input
+                                 fingerprint of every section.
+            on_section (callable): Called as ``on_section(name, content)``
+                                   for the company name and for each section
+                                   as soon as it is available.
+            on_token (callable): Called as ``on_token(name, text)`` with the
+                                 text deltas of each section while it is
+                                 streamed (see ``stream``).
                              
         Returns:
             dict: Enriched data dictionary with the following sections:
@@ -106,46 +349,681 @@ class Enricher:
                 - Risks & Unique Strengths: Red flags and competitive advantages
                 - Missing Info & Diligence Questions: Due diligence gaps and questions
         """
-        # Extract company name using AI - limit text to first 3000 chars for efficiency
-        prompt_name = f"Extract the full company name from this pitch deck. If absent, guess best. Output only the name:\n\n{deck_data['raw_text'][:3000]}"
-        company_name = self.prompt_openrouter(prompt_name).strip().split('\n')[0]
-        
-        # Gather external intelligence from web sources
-        web_profile = fetch_company_profile(company_name)
-        news_snippet = fetch_latest_news(company_name)
-
-        # Combine all data sources for comprehensive context
-        deck_in_context = (
-            f"Pitch Deck Text:\n{deck_data['raw_text']}\n\n"
-            f"Web Profile Info (DuckDuckGo summary):\n{web_profile}\n\n"
-            f"Recent News (DuckDuckGo):\n{news_snippet}"
-        )
-
-        # Define analysis sections with specific instructions for each
-        sections = [
-            ("Executive Summary", "Give a 3-5 line summary for a VC on this company."),
-            ("Team", "Summarize team/founders. If LinkedIn/track record is available, add it or infer plausible founder profiles."),
-            ("Product", "Describe product/technology and USP. Make it investor-focused."),
-            ("Market", "Estimate market size, main competitors, TAM/SAM/SOM if possible."),
-            ("Traction & Metrics", "Extract key metrics, growth stats, and highlight any recent news. Infer plausible stats if missing."),
-            ("Funding & Financials", "Current round, past funding, cap table signals. Guess if not stated."),
-            ("Competitive Landscape Map", "Create a Mermaid markdown chart that shows this company and at least 3 main competitors, indicating placement on a feature or market axis. Guess if insufficient data."),
-            ("Sentiment & Hype", "Analyze the language for hype and sentiment. Point out risky or exaggerated claims from an investor perspective."),
-            ("AI Investment Signal Score", "Give a score (1-10) for Product, Team, Market, and Investment Fit. Justify each briefly as if you were an AI analyst for an early-stage fund."),
-            ("Risks & Unique Strengths", "List any red flags and unique strengths. If not mentioned, infer possible ones."),
-            ("Missing Info & Diligence Questions", "What important due diligence questions are left open? What data gaps should an investor clarify? Provide 3+ questions.")
-        ]
-        
-        # Initialize output with company name
+        metrics = metrics if metrics is not None else Metrics()
+        fingerprints = fingerprints if fingerprints is not None else {}
+        if self.generation_mode == "fused":
+            offline, online = [], list(SECTIONS)
+        else:
+            offline = [s for s in SECTIONS if s[0] in self.offline_sections]
+            online = [s for s in SECTIONS if s[0] not in self.offline_sections]
+
+        results = {}
+        workers = min(self.max_concurrency, len(SECTIONS))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Sections that do not need web data start right away
+            futures = {}
+            if offline:
+                sources = {}
+                offline_contexts = self.build_section_contexts(deck_data, offline, None, None, sources)
+                pending = self.reuse_previous(offline, sources, previous, fingerprints,
+                                              results, metrics, on_section)
+                futures.update(self._submit_sections(pool, pending, offline_contexts, metrics,
+                                                     on_token))
+
+            company_name = self.extract_company_name(deck_data, metrics=metrics)
+            if on_section is not None:
+                on_section("Company Name", company_name)
+            web_profile, news_snippet = self.fetch_web_context(company_name, metrics=metrics)
+
+            # Combine all data sources into a context for each remaining section
+            sources = {}
+            contexts = self.build_section_contexts(deck_data, online, web_profile, news_snippet,
+                                                   sources)
+            pending = self.reuse_previous(online, sources, previous, fingerprints, results,
+                                          metrics, on_section)
+            if self.generation_mode == "fused":
+                full_context = self.build_full_context(deck_data, web_profile, news_snippet)
+                fused = self.generate_fused(pending, full_context, contexts, metrics=metrics)
+                results.update(fused)
+                if on_section is not None:
+                    for section, content in fused.items():
+                        on_section(section, content)
+            else:
+                futures.update(self._submit_sections(pool, pending, contexts, metrics, on_token))
+            results.update(self._collect_sections(futures, on_section))
+
+        # Initialize output with company name, then sections in canonical order
         output = {"Company Name": company_name}
+        output.update((section, results[section]) for section, _ in SECTIONS)
+        return output
+
+    def reuse_previous(self, sections, sources, previous, fingerprints, results, metrics,
+                       on_section=None):
+        """
+        Reuse sections from a previous run whose inputs are unchanged.
         
-        # Process each analysis section with progress tracking
-        for section, instr in tqdm(sections, desc="Enriching", total=len(sections)):
-            prompt = (
-                f"{instr}\n\nContext:\n{deck_in_context}\n\n"
-                "Write output as markdown."
-            )
-            result = self.prompt_openrouter(prompt)
-            output[section] = result.strip()
+        Args:
+            sections (list): List of (section name, instruction) tuples.
+            sources (dict): Section name to the material the section depends
+                            on, as collected by build_section_contexts.
+            previous (dict): State of an earlier run, or None.
+            fingerprints (dict): Receives the fingerprint of every section.
+            results (dict): Receives the content of reused sections.
+            metrics (Metrics): Collector counting reused sections.
+            on_section (callable): Optional callback receiving each reused
+                                   section name and content.
             
-        return output
+        Returns:
+            list: The (section name, instruction) tuples still to generate.
+        """
+        previous_sections = (previous or {}).get("sections", {})
+        template = self.prompt_template()
+        pending = []
+        for section, instr in sections:
+            fingerprint = section_fingerprint(self.router.model_for(section), instr, sources[section],
+                                              template)
+            fingerprints[section] = fingerprint
+            old = previous_sections.get(section) or {}
+            content = old.get("content", "")
+            if old.get("fingerprint") == fingerprint and content and not content.startswith(FAILED_SECTION_PREFIX):
+                results[section] = content
+                metrics.add(sections_reused=1)
+                if on_section is not None:
+                    on_section(section, content)
+            else:
+                pending.append((section, instr))
+        return pending
+
+    def prompt_template(self):
+        """
+        Describe the prompt layout sections are generated with.
+        
+        Returns:
+            str: The generation mode and the prompt text with placeholders,
+                 so fingerprints change when the prompts do.
+        """
+        if self.generation_mode == "fused":
+            prompt = build_fused_prompt([("{section}", "{instruction}")], "{context}")
+        else:
+            prompt = build_section_prompt("{instruction}", "{context}")
+        return f"{self.generation_mode}\n{prompt.text()}"
+
+    def extract_company_name(self, deck_data, metrics=None):
+        """
+        Determine the company name, preferring a local heuristic over the LLM.
+        
+        Args:
+            deck_data (dict): Parsed pitch deck data.
+            metrics (Metrics): Optional collector for the name extraction stage.
+            
+        Returns:
+            str: The company name.
+        """
+        metrics = metrics if metrics is not None else Metrics()
+        with metrics.stage("name_extraction"):
+            if self.name_heuristic:
+                guess = guess_company_name(deck_data)
+                if guess:
+                    metrics.add(name_heuristic_hits=1)
+                    return guess
+            prompt_name = build_name_prompt(deck_data)
+            response = self.prompt_openrouter(prompt_name, metrics=metrics, route="Company Name")
+            return response.strip().split('\n')[0]
+
+    def fetch_web_context(self, company_name, metrics=None):
+        """
+        Fetch the company profile and latest news concurrently.
+        
+        Args:
+            company_name (str): Name of the company to search for.
+            metrics (Metrics): Optional collector for the web enrichment stage.
+            
+        Returns:
+            tuple: (web_profile, news_snippet) strings.
+        """
+        metrics = metrics if metrics is not None else Metrics()
+        with metrics.stage("web_enrichment"), ThreadPoolExecutor(max_workers=2) as pool:
+            profile = pool.submit(fetch_company_profile, company_name)
+            news = pool.submit(fetch_latest_news, company_name)
+            return profile.result(), news.result()
+
+    def build_full_context(self, deck_data, web_profile, news_snippet):
+        """
+        Build the context containing the whole deck and web intelligence.
+        
+        Args:
+            deck_data (dict): Parsed pitch deck data.
+            web_profile (str): Company profile snippet from web search, or
+                               None to leave web data out.
+            news_snippet (str): Recent news snippet from web search.
+            
+        Returns:
+            str: Combined context string.
+        """
+        return f"Pitch Deck Text:\n{deck_data['raw_text']}" + build_web_context(web_profile, news_snippet)
+
+    def build_section_contexts(self, deck_data, sections, web_profile, news_snippet, sources=None):
+        """
+        Build the prompt context for each section.
+        
+        In "full" mode every section receives the whole deck text. In
+        "retrieval" mode the deck is chunked by page/slide and each section
+        receives only the top-ranked chunks for its instruction, within its
+        token budget. Decks that already fit a section's budget are sent in
+        full either way.
+        
+        Args:
+            deck_data (dict): Parsed pitch deck data.
+            sections (list): List of (section name, instruction) tuples.
+            web_profile (str): Company profile snippet from web search, or
+                               None for sections that do not use web data.
+            news_snippet (str): Recent news snippet from web search.
+            sources (dict): Optional dict that receives, per section, the
+                            material its fingerprint covers: the excerpts
+                            it is sent, or for a whole-deck context only
+                            the pages/slides that match its instruction
+                            (the whole deck if none do), plus web data.
+            
+        Returns:
+            dict: Section name to context string.
+        """
+        web_context = build_web_context(web_profile, news_snippet)
+        full_context = self.build_full_context(deck_data, web_profile, news_snippet)
+        if self.context_mode == "full" and sources is None:
+            return {section: full_context for section, _ in sections}
+
+        deck_tokens = estimate_tokens(deck_data["raw_text"])
+        chunks = deck_chunks(deck_data)
+        index = BM25Index([chunk["text"] for chunk in chunks]) if chunks else None
+
+        contexts = {}
+        for section, instr in sections:
+            budget = self.section_budgets.get(section, self.default_section_budget)
+            query = f"{section} {instr}"
+            if self.context_mode == "full" or index is None or deck_tokens <= budget:
+                contexts[section] = full_context
+                relevant = select_chunks(index, chunks, query, top_k=self.retrieval_top_k,
+                                         token_budget=budget, min_score=0) if index else []
+                if sources is not None:
+                    sources[section] = (f"Pitch Deck Excerpts:\n{format_chunks(relevant)}{web_context}"
+                                        if relevant else full_context)
+                continue
+            selected = select_chunks(index, chunks, query,
+                                     top_k=self.retrieval_top_k, token_budget=budget)
+            contexts[section] = f"Pitch Deck Excerpts:\n{format_chunks(selected)}{web_context}"
+            if sources is not None:
+                sources[section] = contexts[section]
+        return contexts
+
+    def generate_section(self, instr, deck_in_context, metrics=None, on_token=None, section=None):
+        """
+        Generate a single analysis section from its instruction and context.
+        
+        Args:
+            instr (str): Section-specific instruction for the LLM.
+            deck_in_context (str): Combined deck text and web intelligence.
+            metrics (Metrics): Optional collector for token counts.
+            on_token (callable): Optional callback for streamed text deltas.
+            section (str): Section name, used to route the request to the
+                           section's model.
+            
+        Returns:
+            str: Markdown content for the section.
+        """
+        prompt = build_section_prompt(instr, deck_in_context)
+        return self.prompt_openrouter(prompt, metrics=metrics, on_token=on_token, route=section).strip()
+
+    def generate_sections(self, sections, contexts, metrics=None):
+        """
+        Generate analysis sections using a bounded worker pool.
+        
+        Up to ``max_concurrency`` sections are requested at the same time, so
+        the wall-clock time per deck approaches that of the slowest section
+        rather than the sum of all of them.
+        
+        Args:
+            sections (list): List of (section name, instruction) tuples.
+            contexts (dict): Section name to combined deck and web context.
+            metrics (Metrics): Optional collector; each section is timed as
+                               a "section:<name>" stage.
+            
+        Returns:
+            dict: Section name to markdown content, in the order of ``sections``.
+            
+        Note:
+            A failing section does not abort the others; its content is
+            replaced by a short error note so the report can still be written.
+        """
+        workers = min(self.max_concurrency, len(sections)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = self._submit_sections(pool, sections, contexts, metrics)
+            results = self._collect_sections(futures)
+
+        # Preserve the canonical section order regardless of completion order
+        return {section: results[section] for section, _ in sections}
+
+    def _submit_sections(self, pool, sections, contexts, metrics, on_token=None):
+        """
+        Submit section requests to a worker pool.
+        
+        With ``prime_prompt_cache``, the first section of each distinct
+        context is sent alone and the others wait until it has started
+        answering, so they can read the shared prefix from the provider's
+        prompt cache.
+        
+        Returns:
+            dict: Future to section name.
+        """
+        futures, primers = {}, {}
+        for section, instr in sections:
+            context = contexts[section]
+            wait_for, primer = None, None
+            if self.prime_prompt_cache:
+                wait_for = primers.get(context)
+                if wait_for is None:
+                    primer = primers[context] = threading.Event()
+            future = pool.submit(self._timed_section, section, instr, context, metrics,
+                                 functools.partial(on_token, section) if on_token else None,
+                                 wait_for, primer)
+            futures[future] = section
+        return futures
+
+    def _collect_sections(self, futures, on_section=None):
+        """
+        Wait for submitted sections, advancing the progress bar as they finish
+        and passing each result to ``on_section`` if given.
+        
+        Returns:
+            dict: Section name to markdown content, in completion order.
+        """
+        from tqdm import tqdm
+
+        results = {}
+        for future in tqdm(as_completed(futures), desc="Enriching", total=len(futures),
+                           disable=not self.show_progress or not futures):
+            section = futures[future]
+            try:
+                results[section] = future.result()
+            except Exception as e:
+                print(f"Section '{section}' failed: {e}")
+                results[section] = f"{FAILED_SECTION_PREFIX} {e}_"
+            if on_section is not None:
+                on_section(section, results[section])
+        return results
+
+    def _timed_section(self, section, instr, deck_in_context, metrics, on_token=None,
+                       wait_for=None, primer=None):
+        """
+        Generate a section, timing it when a metrics collector is given.
+        
+        The section first waits for ``wait_for`` (an Event) if given, and
+        sets ``primer`` once its own first token or response has arrived.
+        """
+        if wait_for is not None:
+            wait_for.wait()
+        if primer is not None:
+            forward = on_token
+
+            def on_token(text):
+                primer.set()
+                if forward is not None:
+                    forward(text)
+        try:
+            if metrics is None:
+                return self.generate_section(instr, deck_in_context, on_token=on_token,
+                                             section=section)
+            with metrics.stage(f"section:{section}"):
+                return self.generate_section(instr, deck_in_context, metrics=metrics,
+                                             on_token=on_token, section=section)
+        finally:
+            if primer is not None:
+                primer.set()
+
+    def generate_fused(self, sections, full_context, contexts, metrics=None):
+        """
+        Generate several sections per request as a single JSON object.
+        
+        The deck context is sent once per group of sections instead of once
+        per section. Sections that are missing from the response or are not
+        non-empty strings are re-requested individually.
+        
+        Args:
+            sections (list): List of (section name, instruction) tuples.
+            full_context (str): Context shared by every fused request.
+            contexts (dict): Section name to context, used for the individual
+                             fallback requests.
+            metrics (Metrics): Optional collector; each group is timed as a
+                               "fused:<first section>" stage.
+            
+        Returns:
+            dict: Section name to markdown content, in the order of ``sections``.
+        """
+        instructions = dict(sections)
+        groups = self.fused_groups or [[name for name, _ in sections]]
+        grouped = {name for group in groups for name in group}
+        # Sections not assigned to any group are generated individually
+        groups = [[n for n in group if n in instructions] for group in groups]
+        missing = [name for name, _ in sections if name not in grouped]
+
+        from tqdm import tqdm
+
+        results = {}
+        workers = min(self.max_concurrency, len(groups)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(self._timed_fused, group, instructions, full_context, metrics): group
+                for group in groups if group
+            }
+            for future in tqdm(as_completed(futures), desc="Enriching (fused)", total=len(futures),
+                               disable=not self.show_progress):
+                group = futures[future]
+                try:
+                    parsed = parse_json_object(future.result())
+                except Exception as e:
+                    print(f"Fused request for {len(group)} sections failed: {e}")
+                    parsed = {}
+                for name in group:
+                    value = parsed.get(name)
+                    if isinstance(value, str) and value.strip():
+                        results[name] = value.strip()
+                    else:
+                        missing.append(name)
+
+        if missing:
+            retry = [(name, instructions[name]) for name in missing]
+            results.update(self.generate_sections(retry, contexts, metrics=metrics))
+
+        return {name: results[name] for name, _ in sections}
+
+    def _timed_fused(self, group, instructions, full_context, metrics):
+        """
+        Send one fused request for a group of sections, timing it when a
+        metrics collector is given.
+        """
+        prompt = build_fused_prompt([(name, instructions[name]) for name in group], full_context)
+        if metrics is None:
+            return self.prompt_openrouter(prompt)
+        with metrics.stage(f"fused:{group[0]}"):
+            return self.prompt_openrouter(prompt, metrics=metrics)
+
+
+def build_name_prompt(deck_data, token_budget=NAME_PROMPT_BUDGET):
+    """
+    Build the prompt asking the LLM for the company name.
+    
+    Args:
+        deck_data (dict): Parsed pitch deck data.
+        token_budget (int): Token budget for the deck text included.
+                            Defaults to NAME_PROMPT_BUDGET.
+        
+    Returns:
+        str: The name extraction prompt.
+    """
+    # Only the opening lines of the deck are needed, cut at a line boundary
+    opening = head_within_budget(deck_data['raw_text'], token_budget)
+    return f"Extract the full company name from this pitch deck. If absent, guess best. Output only the name:\n\n{opening}"
+
+
+class ChatPrompt(namedtuple("ChatPrompt", ["context", "instruction"])):
+    """
+    A prompt split into a shared context block and a request-specific instruction.
+    
+    Requests are laid out as the system message, then the context, then the
+    instruction. Every section of a deck therefore starts with the same
+    prefix, which providers can serve from their prompt caches.
+    """
+    
+    __slots__ = ()
+    
+    def text(self):
+        """
+        Render the prompt as one string, e.g. for response cache keys.
+        
+        Returns:
+            str: System message, context and instruction.
+        """
+        return f"{SYSTEM_PROMPT}\n\nContext:\n{self.context}\n\n{self.instruction}"
+    
+    def messages(self, cache_control=False):
+        """
+        Build the chat messages for the prompt.
+        
+        Args:
+            cache_control (bool): Mark the end of the context with an
+                                  ephemeral cache_control breakpoint, for
+                                  providers that only cache marked prefixes.
+            
+        Returns:
+            list: A system message and a user message whose content is the
+                  context part followed by the instruction part.
+        """
+        context = {"type": "text", "text": f"Context:\n{self.context}"}
+        if cache_control:
+            context["cache_control"] = {"type": "ephemeral"}
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": [context, {"type": "text", "text": self.instruction}]},
+        ]
+
+
+def prompt_text(prompt):
+    """
+    Return the text of a plain or structured prompt.
+    
+    Args:
+        prompt (str or ChatPrompt): The prompt.
+        
+    Returns:
+        str: The prompt itself, or ``ChatPrompt.text()``.
+    """
+    return prompt.text() if isinstance(prompt, ChatPrompt) else prompt
+
+
+def build_section_prompt(instr, deck_in_context):
+    """
+    Build the prompt for a single analysis section.
+    
+    Args:
+        instr (str): Section-specific instruction for the LLM.
+        deck_in_context (str): Combined deck text and web intelligence.
+        
+    Returns:
+        ChatPrompt: The section prompt, with the context shared by other
+                    sections ahead of the instruction.
+    """
+    return ChatPrompt(deck_in_context, f"{instr}\n\nWrite output as markdown.")
+
+
+def build_web_context(web_profile, news_snippet):
+    """
+    Render web intelligence as a context block.
+    
+    Args:
+        web_profile (str): Company profile snippet, or None to omit web data.
+        news_snippet (str): Recent news snippet.
+        
+    Returns:
+        str: The block, prefixed by a blank line, or "" if web data is omitted.
+    """
+    if web_profile is None and news_snippet is None:
+        return ""
+    return (
+        f"\n\nWeb Profile Info (DuckDuckGo summary):\n{web_profile or ''}\n\n"
+        f"Recent News (DuckDuckGo):\n{news_snippet or ''}"
+    )
+
+
+# Words of headings, taglines and boilerplate that never make up a company name
+_GENERIC_TITLE_WORDS = {
+    "pitch", "deck", "presentation", "confidential", "investor", "investors",
+    "agenda", "welcome", "introduction", "overview", "seed", "series", "round",
+    "proprietary", "draft", "slide", "page", "contents", "problem", "solution",
+    "team", "mission", "vision", "values", "about", "us", "our", "we", "you", "your",
+    "the", "a", "an", "of", "for", "to", "and", "in", "on", "with", "by", "future",
+    "market", "opportunity", "product", "traction", "business", "model", "roadmap",
+    "competition", "financials", "ask", "summary", "thank", "thanks", "questions",
+    "contact", "appendix", "why", "now", "how", "what", "who", "story", "journey",
+    "revolutionizing", "revolutionising", "reimagining", "transforming", "redefining",
+    "disrupting", "empowering", "building", "powering", "making", "bringing", "next",
+}
+
+# Trailing words that mark a line as a company name even if it occurs only once
+_COMPANY_SUFFIXES = {
+    "inc", "corp", "corporation", "co", "ltd", "llc", "plc", "gmbh", "ag", "sa", "bv",
+    "labs", "lab", "technologies", "technology", "tech", "systems", "robotics", "ai",
+    "bio", "therapeutics", "health", "group", "holdings", "ventures", "studios",
+}
+
+
+def _looks_like_name(name):
+    """
+    Check that a line has the shape of a company name.
+    """
+    words = name.split()
+    if not 1 <= len(words) <= 5 or len(name) > 60:
+        return False
+    if name[-1] in ".!?:," or name[0].isdigit() or not any(c.isalpha() for c in name):
+        return False
+    for word in words:
+        bare = word.strip("-–|&,'’").lower()
+        if bare in _GENERIC_TITLE_WORDS:
+            return False
+        # Lower-case words belong to taglines ("The future of payments")
+        if bare and not any(c.isupper() or c.isdigit() for c in word):
+            return False
+    return True
+
+
+def _is_corroborated(name, deck_data):
+    """
+    Check that a name candidate is backed by the rest of the deck.
+    
+    The candidate must recur in the deck text beyond the line it was taken
+    from, or end with a company suffix such as "Inc" or "Labs".
+    """
+    if name.split()[-1].strip(".,").lower() in _COMPANY_SUFFIXES:
+        return True
+    pattern = re.compile(r"(?<!\w)" + r"\s+".join(map(re.escape, name.split())) + r"(?!\w)",
+                         re.IGNORECASE)
+    return len(pattern.findall(deck_data.get("raw_text") or "")) >= 2
+
+
+def guess_company_name(deck_data):
+    """
+    Guess the company name from the title slide or first page.
+    
+    The first slide title (or first non-empty line of the first page with
+    text) is accepted only if it looks like a short name rather than a
+    sentence, tagline or generic heading, and the deck corroborates it
+    (see _is_corroborated). Otherwise the LLM name prompt is used, since a
+    wrong name misdirects the web lookups and every online section.
+    
+    Args:
+        deck_data (dict): Parsed pitch deck data.
+        
+    Returns:
+        str or None: The guessed name, or None if no line looks like one.
+    """
+    candidates = []
+    slides = deck_data.get("slides") or []
+    if slides:
+        candidates.append(slides[0].get("title", ""))
+    page_texts = (page_text(deck_data, p) for p in deck_data.get("pages") or [])
+    first_text = next((text for text in page_texts if text.strip()), None)
+    if first_text is None and not slides:
+        first_text = deck_data.get("raw_text", "")
+    if first_text:
+        candidates.append(next((line for line in first_text.splitlines() if line.strip()), ""))
+
+    for candidate in candidates:
+        name = " ".join(candidate.split())
+        if _looks_like_name(name) and _is_corroborated(name, deck_data):
+            return name
+    return None
+
+
+def build_fused_prompt(sections, context):
+    """
+    Build a prompt requesting several sections as one JSON object.
+    
+    Args:
+        sections (list): List of (section name, instruction) tuples.
+        context (str): Combined deck and web context.
+        
+    Returns:
+        ChatPrompt: The fused prompt, with the context ahead of the
+                    section list.
+    """
+    listing = "\n".join(f"- {name}: {instr}" for name, instr in sections)
+    return ChatPrompt(context, (
+        "Write each of the following analysis sections for this company.\n\n"
+        f"Sections:\n{listing}\n\n"
+        "Respond with a single JSON object only. Use the section names exactly "
+        "as keys and the markdown content of each section as string values."
+    ))
+
+
+def iter_sse_data(lines):
+    """
+    Decode the data events of a server-sent event stream.
+    
+    Comment lines (such as OpenRouter's ": OPENROUTER PROCESSING" keep-alives),
+    blank lines and other fields are skipped, and the stream ends at the
+    "[DONE]" sentinel.
+    
+    Args:
+        lines (iterable): Lines of the stream as bytes or str, without line
+                          terminators (e.g. ``Response.iter_lines()``).
+                          
+    Yields:
+        dict: The JSON payload of each data event.
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        if data:
+            yield json.loads(data)
+
+
+def parse_json_object(text):
+    """
+    Parse a JSON object from an LLM response.
+    
+    Markdown code fences and any text around the outermost braces are ignored.
+    
+    Args:
+        text (str): Raw response text.
+        
+    Returns:
+        dict: The parsed object.
+        
+    Raises:
+        ValueError: If no JSON object can be parsed from the text.
+    """
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        raise ValueError("No JSON object found in response")
+    parsed = json.loads(text[start:end + 1])
+    if not isinstance(parsed, dict):
+        raise ValueError("Response is not a JSON object")
+    return parsed
+
+
+def failed_sections(enriched):
+    """
+    Return the sections of an enriched deck whose generation failed.
+
+    Args:
+        enriched (dict): Enriched output as returned by Enricher.enrich.
+
+    Returns:
+        list: Names of the sections holding a FAILED_SECTION_PREFIX note.
+    """
+    return [name for name, content in enriched.items()
+            if isinstance(content, str) and content.startswith(FAILED_SECTION_PREFIX)]
@@ -0,0 +1,39 @@
+"""
+Environment module for loading settings from the environment exactly once.
+
+The .env file is read on first use rather than at import time, and the
+OpenRouter API key is resolved when an enricher is created, so importing
+the package stays cheap and a key exported after import is still picked up.
+"""
+
+import os
+import threading
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_env():
+    """
+    Load variables from a .env file into os.environ, once per process.
+
+    Variables that are already set in the environment are not overridden.
+    """
+    global _loaded
+    with _lock:
+        if _loaded:
+            return
+        from dotenv import load_dotenv
+        load_dotenv()
+        _loaded = True
+
+
+def openrouter_key():
+    """
+    Return the OpenRouter API key from the environment or .env file.
+
+    Returns:
+        str: The key, or "" if it is not set.
+    """
+    load_env()
+    return os.environ.get("OPENROUTER_API_KEY", "")
@@ -0,0 +1,175 @@
+"""
+Incremental re-analysis module for revised pitch decks.
+
+This module fingerprints the inputs of every analysis section and stores
+them in a JSON state file next to each report. When a revised deck is
+analysed, sections whose fingerprint is unchanged are reused from the
+previous run, and decks can be compared page by page or slide by slide.
+"""
+
+import difflib
+import hashlib
+import json
+import os
+
+from utils.markdown_writer import atomic_write
+from utils.pdf_parser import page_text
+
+
+def _sha256(*parts):
+    """
+    Hash text parts into a hex digest, separating them unambiguously.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def section_fingerprint(model_name, instr, sources, template=""):
+    """
+    Fingerprint the inputs of one analysis section.
+
+    ``sources`` holds the deck pages/slides relevant to the section and the
+    web data it uses, so the fingerprint changes whenever any of those, the
+    instruction, the prompt template or the model changes, but not when
+    unrelated pages are edited.
+
+    Args:
+        model_name (str): Name of the LLM model.
+        instr (str): Section instruction.
+        sources (str): Material the section depends on, as collected by
+                       Enricher.build_section_contexts.
+        template (str): Prompt layout and generation mode the section is
+                        generated with. Defaults to "".
+
+    Returns:
+        str: Hex-encoded SHA-256 fingerprint.
+    """
+    return _sha256(model_name, instr, sources, template)
+
+
+def unit_hashes(deck_data):
+    """
+    Hash every page or slide of a parsed deck.
+
+    Args:
+        deck_data (dict): Parsed deck data with 'pages' or 'slides' records.
+
+    Returns:
+        list: [label, hash] pairs in deck order, e.g. ["Slide 3", "ab12..."].
+              Decks without page/slide records yield a single "Deck" unit.
+    """
+    if deck_data.get("slides"):
+        return [[f"Slide {s['slide']}", _sha256(s["text"], s.get("notes", ""))]
+                for s in deck_data["slides"]]
+    if deck_data.get("pages"):
+        return [[f"Page {p['page']}", _sha256(page_text(deck_data, p))]
+                for p in deck_data["pages"]]
+    return [["Deck", _sha256(deck_data.get("raw_text", ""))]]
+
+
+def diff_decks(old_units, new_units):
+    """
+    Compare two deck versions at page/slide level.
+
+    Units are matched by content, so inserting a slide does not mark every
+    following slide as changed.
+
+    Args:
+        old_units (list): [label, hash] pairs of the previous version.
+        new_units (list): [label, hash] pairs of the new version.
+
+    Returns:
+        dict: Labels of 'added', 'removed' and 'changed' units (new labels for
+              added/changed, old labels for removed) and the 'unchanged' count.
+    """
+    matcher = difflib.SequenceMatcher(a=[h for _, h in old_units], b=[h for _, h in new_units],
+                                      autojunk=False)
+    diff = {"added": [], "removed": [], "changed": [], "unchanged": 0}
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            diff["unchanged"] += i2 - i1
+        elif tag == "insert":
+            diff["added"].extend(label for label, _ in new_units[j1:j2])
+        elif tag == "delete":
+            diff["removed"].extend(label for label, _ in old_units[i1:i2])
+        else:
+            paired = min(i2 - i1, j2 - j1)
+            diff["changed"].extend(label for label, _ in new_units[j1:j1 + paired])
+            diff["added"].extend(label for label, _ in new_units[j1 + paired:j2])
+            diff["removed"].extend(label for label, _ in old_units[i1 + paired:i2])
+    return diff
+
+
+def build_state(model_name, deck_data, enriched, fingerprints):
+    """
+    Assemble the state stored next to a report.
+
+    Args:
+        model_name (str): Name of the LLM model used.
+        deck_data (dict): Parsed deck data.
+        enriched (dict): Enriched output of the run.
+        fingerprints (dict): Section name to fingerprint, as filled in by
+                             Enricher.enrich.
+
+    Returns:
+        dict: JSON-serialisable state.
+    """
+    return {
+        "model": model_name,
+        "company_name": enriched.get("Company Name", ""),
+        "units": unit_hashes(deck_data),
+        "sections": {
+            name: {"fingerprint": fingerprint, "content": enriched[name]}
+            for name, fingerprint in fingerprints.items() if name in enriched
+        },
+    }
+
+
+def state_path(output_file):
+    """
+    Return the state file path for a report.
+
+    Args:
+        output_file (str): Path of the generated report.
+
+    Returns:
+        str: Path of the JSON state file next to the report.
+    """
+    return os.path.splitext(output_file)[0] + ".state.json"
+
+
+def load_state(path):
+    """
+    Load a previous run's state.
+
+    Args:
+        path (str): Path of a state file, or of a report whose state file
+                    sits next to it.
+
+    Returns:
+        dict or None: The state, or None if no readable state exists.
+    """
+    if not path.endswith(".state.json"):
+        path = state_path(path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_state(path, state):
+    """
+    Atomically write a state file.
+
+    A truncated state file would make the next run silently re-analyse every
+    section, so it is replaced in one step like the report.
+
+    Args:
+        path (str): Destination path.
+        state (dict): State as returned by build_state.
+    """
+    atomic_write(path, json.dumps(state, indent=2))
@@ -0,0 +1,235 @@
+"""
+Ingestion module for parsing decks with bounded memory and time.
+
+This module checks a deck's file size and page/slide count before any
+parser touches it, parses at most the first pages/slides within a time
+limit, and falls back to fewer pages when parsing runs out of memory. PDFs
+are read through a memory map, and PowerPoint files are parsed from a copy
+without images and other binary parts, since only their text is needed.
+Worker processes can cap their own memory with ``apply_memory_limit``.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import time
+import zipfile
+
+from utils.pdf_parser import open_pdf, parse_pdf
+from utils.ppt_parser import parse_ppt
+
+_SLIDE_PART_RE = re.compile(r"ppt/slides/slide\d+\.xml$")
+
+# Parts python-pptx needs for text; everything else is replaced by an empty part
+_TEXT_PART_SUFFIXES = (".xml", ".rels")
+
+
+class IngestError(Exception):
+    """
+    Raised when a deck is rejected before parsing.
+    """
+
+
+def apply_memory_limit(memory_mb):
+    """
+    Cap the memory the current process may allocate.
+
+    Meant for worker processes: allocations beyond the limit raise
+    MemoryError, which parse_guarded turns into a truncated parse.
+    Memory-mapped files do not count towards the limit.
+
+    Args:
+        memory_mb (int): Data segment limit in MiB. None or 0 leaves the
+                         limit unchanged.
+
+    Returns:
+        bool: True if the limit was applied.
+    """
+    if not memory_mb:
+        return False
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return False
+    _, hard = resource.getrlimit(resource.RLIMIT_DATA)
+    limit = int(memory_mb) * 1024 * 1024
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_DATA, (limit, hard))
+    return True
+
+
+def inspect_pptx(file_path):
+    """
+    Read the slide count and part sizes of a PPTX file from its zip directory.
+
+    Args:
+        file_path (str): Path to the PPTX file.
+
+    Returns:
+        dict: 'slides' count, uncompressed 'text_bytes' of the XML parts and
+              'binary_bytes' of all other parts (images, embeddings, fonts).
+
+    Raises:
+        IngestError: If the file is not a valid PPTX archive.
+    """
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            entries = archive.infolist()
+    except zipfile.BadZipFile as e:
+        raise IngestError(f"Not a valid PPTX file: {file_path}") from e
+    text = [e for e in entries if e.filename.endswith(_TEXT_PART_SUFFIXES)]
+    return {
+        "slides": sum(1 for e in entries if _SLIDE_PART_RE.match(e.filename)),
+        "text_bytes": sum(e.file_size for e in text),
+        "binary_bytes": sum(e.file_size for e in entries) - sum(e.file_size for e in text),
+    }
+
+
+def strip_pptx_media(file_path, target_path):
+    """
+    Copy a PPTX file with its binary parts emptied.
+
+    Images, embedded workbooks, fonts and thumbnails are kept as empty parts
+    so that relationships stay valid; python-pptx then never holds their
+    contents in memory. Parts are copied one at a time.
+
+    Args:
+        file_path (str): Path to the PPTX file.
+        target_path (str): Path of the copy to write.
+    """
+    with zipfile.ZipFile(file_path) as source, \
+            zipfile.ZipFile(target_path, "w", zipfile.ZIP_DEFLATED) as target:
+        for entry in source.infolist():
+            if entry.filename.endswith(_TEXT_PART_SUFFIXES):
+                with source.open(entry) as src, target.open(entry.filename, "w") as dst:
+                    shutil.copyfileobj(src, dst)
+            else:
+                target.writestr(entry.filename, b"")
+
+
+def count_units(file_path):
+    """
+    Count the pages or slides of a deck without parsing their content.
+
+    Args:
+        file_path (str): Path to a PDF or PPTX file.
+
+    Returns:
+        int or None: Page/slide count, or None for formats that cannot be
+                     counted cheaply (legacy .ppt).
+    """
+    lower = file_path.lower()
+    if lower.endswith(".pdf"):
+        with open_pdf(file_path) as reader:
+            return len(reader.pages)
+    if lower.endswith(".pptx"):
+        return inspect_pptx(file_path)["slides"]
+    return None
+
+
+def parse_guarded(file_path, workers=1, parallel_threshold=100, ocr=None, max_file_mb=512,
+                  max_pages=300, time_seconds=120, fallback_pages=30, max_xml_mb=256,
+                  strip_media=True):
+    """
+    Parse a deck within size, page/slide, memory and time limits.
+
+    Decks with more than ``max_pages`` pages/slides are truncated to the
+    first ``max_pages``; extraction stops at the first page/slide still
+    pending after ``time_seconds``; and if parsing raises MemoryError (for
+    example under ``apply_memory_limit``), the deck is parsed again with at
+    most ``fallback_pages`` pages/slides.
+
+    Args:
+        file_path (str): Path to a PDF, PPT or PPTX file.
+        workers (int): Worker processes for page/slide-parallel extraction.
+        parallel_threshold (int): Minimum page/slide count before worker
+                                  processes are used.
+        ocr (dict): Keyword arguments for the OCR fallback of PDF pages.
+        max_file_mb (float): Larger files are rejected. Defaults to 512.
+        max_pages (int): Maximum pages/slides parsed. Defaults to 300.
+        time_seconds (float): Time limit for extraction. Defaults to 120.
+        fallback_pages (int): Pages/slides parsed after a MemoryError.
+                              Defaults to 30.
+        max_xml_mb (float): PPTX files whose XML parts uncompress to more
+                            than this are rejected. Defaults to 256.
+        strip_media (bool): Parse PPTX files from a copy without binary
+                            parts. Defaults to True.
+
+    Returns:
+        dict: Parsed deck data as returned by parse_pdf or parse_ppt, with an
+              'ingest' record of the file 'bytes', total 'pages', pages
+              'kept' and the 'truncated' reason ("pages", "time", "memory"
+              or None).
+
+    Raises:
+        IngestError: If the deck exceeds the size limits or is malformed.
+    """
+    size = os.path.getsize(file_path)
+    if size > max_file_mb * 1024 * 1024:
+        raise IngestError(f"{file_path} is {size / 2 ** 20:.0f} MB, above the {max_file_mb} MB limit")
+
+    is_pdf = file_path.lower().endswith(".pdf")
+    source, temp_dir = file_path, None
+    total = count_units(file_path) if is_pdf else None
+    if file_path.lower().endswith(".pptx"):
+        layout = inspect_pptx(file_path)
+        total = layout["slides"]
+        if layout["text_bytes"] > max_xml_mb * 1024 * 1024:
+            raise IngestError(f"{file_path} uncompresses to more than {max_xml_mb} MB of XML")
+        if strip_media and layout["binary_bytes"]:
+            temp_dir = tempfile.mkdtemp(prefix="ingest-")
+            source = os.path.join(temp_dir, os.path.basename(file_path))
+            strip_pptx_media(file_path, source)
+
+    def parse(limit):
+        deadline = time.time() + time_seconds if time_seconds else None
+        if is_pdf:
+            return parse_pdf(source, workers=workers, parallel_threshold=parallel_threshold,
+                             ocr=ocr, max_pages=limit, deadline=deadline)
+        return parse_ppt(source, workers=workers, parallel_threshold=parallel_threshold,
+                         max_slides=limit, deadline=deadline)
+
+    try:
+        keep = min(total, max_pages) if total is not None and max_pages else max_pages
+        reason = "pages" if total is not None and keep is not None and keep < total else None
+        try:
+            deck_data = parse(keep)
+        except MemoryError:
+            keep = min(keep, fallback_pages) if keep else fallback_pages
+            reason = "memory"
+            deck_data = parse(keep)
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    units = deck_data["pages"] if is_pdf else deck_data["slides"]
+    if reason != "memory" and total is not None and len(units) < (keep or total):
+        reason = "time"
+    deck_data["ingest"] = {
+        "bytes": size,
+        "pages": total,
+        "kept": len(units),
+        "truncated": reason,
+    }
+    return deck_data
+
+
+def truncation_notice(deck_data):
+    """
+    Describe how a deck was truncated during ingestion.
+
+    Args:
+        deck_data (dict): Parsed deck data, with an optional 'ingest' record.
+
+    Returns:
+        str or None: A one-line notice, or None if the deck is complete.
+    """
+    ingest = deck_data.get("ingest") or {}
+    if not ingest.get("truncated"):
+        return None
+    total = ingest["pages"] if ingest["pages"] is not None else "?"
+    return (f"Deck truncated to the first {ingest['kept']} of {total} pages/slides "
+            f"({ingest['truncated']} limit)")
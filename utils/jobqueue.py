@@ -0,0 +1,298 @@
+"""
+Job queue module for running deck analyses in long-lived worker processes.
+
+This module provides a SQLite-backed queue, so no external service is
+needed. Jobs carry a priority and a model name; workers claim the highest
+priority job whose model is below its concurrency cap, keep a heartbeat
+while they work and checkpoint every finished section. A job whose worker
+dies is handed to another worker once its lease expires and resumes from
+its checkpoints instead of starting over.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+# Job states
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobQueue:
+    """
+    Persistent SQLite-backed job queue shared by submitters and workers.
+
+    The database file can safely be used from several threads and
+    processes; claiming a job is atomic across processes.
+    """
+
+    def __init__(self, path=".cache/jobs.sqlite", lease_seconds=120, max_attempts=3):
+        """
+        Open (or create) the queue database.
+
+        Args:
+            path (str): Location of the SQLite database file.
+                        Defaults to ".cache/jobs.sqlite".
+            lease_seconds (float): A running job without a heartbeat for this
+                                   long is considered abandoned and requeued.
+                                   Defaults to 120.
+            max_attempts (int): Claims per job before an abandoned job is
+                                marked failed. Defaults to 3.
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, file TEXT, model TEXT, "
+            "priority INTEGER, status TEXT, output TEXT, error TEXT, worker TEXT, "
+            "attempts INTEGER DEFAULT 0, created REAL, started REAL, finished REAL, "
+            "heartbeat REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, priority DESC, id)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "job_id INTEGER, section TEXT, fingerprint TEXT, content TEXT, "
+            "PRIMARY KEY (job_id, section))"
+        )
+
+    def submit(self, file_path, model_name, priority=0):
+        """
+        Add a deck to the queue.
+
+        Args:
+            file_path (str): Path of the deck file.
+            model_name (str): LLM model to analyse it with.
+            priority (int): Higher priorities are claimed first. Defaults to 0.
+
+        Returns:
+            int: The job id.
+        """
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO jobs (file, model, priority, status, created) VALUES (?, ?, ?, ?, ?)",
+                (os.path.abspath(file_path), model_name, priority, QUEUED, time.time()),
+            )
+            return cur.lastrowid
+
+    def status(self, job_id):
+        """
+        Look up a job.
+
+        Args:
+            job_id (int): The job id.
+
+        Returns:
+            dict or None: The job record with the number of checkpointed
+                          sections, or None if the job does not exist.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = dict(row)
+            job["sections_done"] = self._conn.execute(
+                "SELECT COUNT(*) FROM checkpoints WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+        return job
+
+    def result(self, job_id, wait=False, timeout=None, poll_interval=1.0):
+        """
+        Return the outcome of a job, optionally waiting for it to finish.
+
+        Args:
+            job_id (int): The job id.
+            wait (bool): Block until the job is done or failed.
+            timeout (float): Maximum seconds to wait. None waits forever.
+            poll_interval (float): Seconds between status checks.
+
+        Returns:
+            dict or None: The job record (see ``status``); 'output' holds the
+                          report path once the job is done.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.status(job_id)
+            if not wait or job is None or job["status"] in (DONE, FAILED):
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(poll_interval)
+
+    def list_jobs(self, status=None, limit=50):
+        """
+        List recent jobs.
+
+        Args:
+            status (str): Only return jobs in this state.
+            limit (int): Maximum number of jobs. Defaults to 50.
+
+        Returns:
+            list: Job records, newest first.
+        """
+        query, params = "SELECT * FROM jobs", ()
+        if status:
+            query, params = query + " WHERE status = ?", (status,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY id DESC LIMIT ?", params + (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def claim(self, worker_id, model_caps=None, default_cap=None):
+        """
+        Atomically claim the next job for a worker.
+
+        Abandoned jobs (expired lease) are requeued first. Jobs are claimed by
+        descending priority, then submission order, skipping models that
+        already have their cap of running jobs.
+
+        Args:
+            worker_id (str): Identifier of the claiming worker.
+            model_caps (dict): Maximum running jobs per model name.
+            default_cap (int): Cap for models not in ``model_caps``. None
+                               means unlimited.
+
+        Returns:
+            dict or None: The claimed job, or None if nothing can be claimed.
+        """
+        model_caps = model_caps or {}
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                    "error = CASE WHEN attempts >= ? THEN 'worker lost too many times' END, "
+                    "worker = NULL WHERE status = ? AND heartbeat < ?",
+                    (self.max_attempts, FAILED, QUEUED, self.max_attempts, RUNNING,
+                     now - self.lease_seconds),
+                )
+                running = dict(self._conn.execute(
+                    "SELECT model, COUNT(*) FROM jobs WHERE status = ? GROUP BY model", (RUNNING,)
+                ).fetchall())
+                job = None
+                for row in self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY priority DESC, id", (QUEUED,)
+                ):
+                    cap = model_caps.get(row["model"], default_cap)
+                    if cap is None or running.get(row["model"], 0) < cap:
+                        job = dict(row)
+                        break
+                if job is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, "
+                        "started = ?, heartbeat = ? WHERE id = ?",
+                        (RUNNING, worker_id, now, now, job["id"]),
+                    )
+                    job.update(status=RUNNING, worker=worker_id, attempts=job["attempts"] + 1)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return job
+
+    def heartbeat(self, job_id):
+        """
+        Extend the lease of a running job.
+
+        Args:
+            job_id (int): The job id.
+        """
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET heartbeat = ? WHERE id = ? AND status = ?",
+                               (time.time(), job_id, RUNNING))
+
+    def checkpoint(self, job_id, section, fingerprint, content):
+        """
+        Store a finished section of a job.
+
+        Args:
+            job_id (int): The job id.
+            section (str): Section name.
+            fingerprint (str): Fingerprint of the section's inputs.
+            content (str): Generated section content.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (job_id, section, fingerprint, content) "
+                "VALUES (?, ?, ?, ?)",
+                (job_id, section, fingerprint, content),
+            )
+
+    def checkpoint_state(self, job_id):
+        """
+        Return a job's checkpoints in the state format accepted by
+        Enricher.enrich as ``previous``.
+
+        Args:
+            job_id (int): The job id.
+
+        Returns:
+            dict: State with a 'sections' mapping, empty if nothing was saved.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT section, fingerprint, content FROM checkpoints WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        return {"sections": {row["section"]: {"fingerprint": row["fingerprint"],
+                                              "content": row["content"]} for row in rows}}
+
+    def complete(self, job_id, output):
+        """
+        Mark a job as done and drop its checkpoints.
+
+        Args:
+            job_id (int): The job id.
+            output (str): Path of the generated report.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, output = ?, error = NULL, finished = ? WHERE id = ?",
+                (DONE, output, time.time(), job_id),
+            )
+            self._conn.execute("DELETE FROM checkpoints WHERE job_id = ?", (job_id,))
+
+    def fail(self, job_id, error):
+        """
+        Mark a job as failed, keeping its checkpoints for a resubmission.
+
+        Args:
+            job_id (int): The job id.
+            error (str): Error description.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished = ? WHERE id = ?",
+                (FAILED, error, time.time(), job_id),
+            )
+
+    def retry(self, job_id):
+        """
+        Requeue a failed job; it resumes from its checkpoints.
+
+        Args:
+            job_id (int): The job id.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = NULL, worker = NULL, attempts = 0 "
+                "WHERE id = ? AND status = ?",
+                (QUEUED, job_id, FAILED),
+            )
+
+    def close(self):
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._conn.close()
@@ -2,33 +2,210 @@
 Markdown writer module for generating formatted output files.
 
 This module provides functionality to convert enriched pitch deck data
-into well-formatted markdown files for easy reading and sharing.
+into well-formatted markdown files for easy reading and sharing. Reports
+are written atomically, and an incremental writer can append sections (or
+streamed tokens) to a partial file while the analysis is still running.
 """
 
+import os
+import tempfile
+import threading
+
+
+def _current_umask():
+    """
+    Read the process umask (os.umask can only be read by setting it).
+    """
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# Read once at import, before worker threads could create files meanwhile
+_UMASK = _current_umask()
+
+
+def atomic_write(path, text):
+    """
+    Write a text file atomically.
+
+    The text is written to a temporary file in the same directory and renamed
+    over ``path``, so readers never see a half-written file. The file gets
+    the mode of the file it replaces, or the umask-based mode of a newly
+    created file.
+
+    Args:
+        path (str): Destination path.
+        text (str): Complete file contents.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp",
+                                    dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        # mkstemp creates the file owner-only
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def render_markdown(enriched):
+    """
+    Render enriched pitch deck data as a markdown document.
+
+    Args:
+        enriched (dict): Dictionary containing enriched pitch deck analysis.
+                        Keys are section names, values are content strings.
+
+    Returns:
+        str: The markdown document.
+    """
+    # Each section becomes an H1 header followed by its stripped content
+    return "".join(f"# {section}\n\n{content.strip()}\n\n" for section, content in enriched.items())
+
 
 def write_markdown(enriched, outfile="output.md"):
     """
     Write enriched pitch deck data to a markdown file.
-    
+
     This function takes the enriched data dictionary and formats it as a
     structured markdown document with proper headings and spacing.
-    
+
     Args:
         enriched (dict): Dictionary containing enriched pitch deck analysis.
                         Keys are section names, values are content strings.
-        outfile (str): Output file path for the markdown file. 
+        outfile (str): Output file path for the markdown file.
                       Defaults to "output.md".
-                      
+
     Returns:
         None: Output is written directly to the specified file.
-        
+
     Note:
         The function uses UTF-8 encoding to handle international characters
         and special symbols that may appear in company names or content.
+        The document is written to a temporary file in the same directory
+        and renamed over ``outfile``, so readers never see a half-written
+        report.
+    """
+    atomic_write(outfile, render_markdown(enriched))
+
+
+class MarkdownStreamWriter:
+    """
+    Incremental markdown writer for a report that is still being generated.
+
+    Sections are appended to ``<outfile>.partial`` in completion order as
+    soon as they are available, so analysts can follow the report and the
+    finished sections survive a crash. Streamed tokens are appended live for
+    one section at a time; sections streaming or completing meanwhile are
+    written once that section is done. ``finalize`` writes the complete
+    report in canonical order and removes the partial file.
+
+    Example:
+        with MarkdownStreamWriter("report.md") as writer:
+            enriched = agent.enrich_company_info(deck, on_section=writer.write_section,
+                                                 on_token=writer.write_token)
+            writer.finalize(enriched)
     """
-    with open(outfile, "w", encoding="utf-8") as f:
-        for section, content in enriched.items():
-            # Write section header as H1 markdown
-            f.write(f"# {section}\n\n")
-            # Write content with proper spacing and strip extra whitespace
-            f.write(content.strip() + "\n\n")
+
+    def __init__(self, outfile="output.md"):
+        """
+        Open the partial file next to the final report.
+
+        Args:
+            outfile (str): Path of the final markdown report.
+        """
+        self.outfile = outfile
+        self.partial_path = outfile + ".partial"
+        self._file = open(self.partial_path, "w", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._streaming = None
+        self._streamed = []
+        self._queued = []
+        self._written = set()
+
+    def write_token(self, section, text):
+        """
+        Append a streamed text delta of a section.
+
+        Args:
+            section (str): Name of the section being streamed.
+            text (str): The text delta.
+        """
+        with self._lock:
+            if self._file.closed or section in self._written:
+                return
+            if self._streaming is None:
+                self._streaming = section
+                self._file.write(f"# {section}\n\n")
+            if self._streaming == section:
+                self._file.write(text)
+                self._streamed.append(text)
+                self._file.flush()
+
+    def write_section(self, section, content):
+        """
+        Append a completed section.
+
+        Args:
+            section (str): Section name.
+            content (str): Markdown content of the section.
+        """
+        with self._lock:
+            if self._file.closed or section in self._written:
+                return
+            self._written.add(section)
+            if self._streaming is None:
+                self._file.write(f"# {section}\n\n{content.strip()}\n\n")
+            elif self._streaming == section:
+                # The content has already been written token by token, unless
+                # the section failed or was retried after its stream broke off
+                if "".join(self._streamed).strip() != content.strip():
+                    self._file.write(f"\n\n{content.strip()}")
+                self._file.write("\n\n")
+                self._streaming = None
+                self._streamed = []
+                for queued in self._queued:
+                    self._file.write(queued)
+                self._queued = []
+            else:
+                # Do not split the section that is currently streaming
+                self._queued.append(f"# {section}\n\n{content.strip()}\n\n")
+            self._file.flush()
+
+    def finalize(self, enriched, write=None):
+        """
+        Atomically write the complete report and remove the partial file.
+
+        Args:
+            enriched (dict): Complete enriched data in canonical order.
+            write (callable): ``write(enriched, outfile)`` producing the
+                              final report, e.g. to add other output
+                              formats. Defaults to write_markdown.
+        """
+        self.close()
+        (write or write_markdown)(enriched, self.outfile)
+        os.remove(self.partial_path)
+
+    def close(self):
+        """
+        Close the partial file, keeping it on disk with every completed section.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._file.writelines(self._queued)
+                self._queued = []
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,167 @@
+"""
+Metrics module for timing and token accounting across the pipeline.
+
+This module provides a small thread-safe metrics collector with per-stage
+timers and counters (requests, prompt/completion tokens, cache hits), helpers
+to write it as a JSON sidecar and aggregate it across a batch, and an
+optional cProfile hook.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.markdown_writer import atomic_write
+
+
+class Metrics:
+    """
+    Thread-safe collector for stage timings and counters of one deck.
+    """
+
+    def __init__(self):
+        """
+        Initialize empty timers and counters.
+        """
+        self.stages = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time a pipeline stage; repeated stages accumulate.
+
+        Args:
+            name (str): Stage name, e.g. "parse" or "section:Team".
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def record_stage(self, name, seconds):
+        """
+        Add an externally measured duration to a stage.
+
+        Args:
+            name (str): Stage name.
+            seconds (float): Duration in seconds.
+        """
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add(self, **counters):
+        """
+        Increment one or more counters.
+
+        Args:
+            **counters: Counter names and the amounts to add.
+        """
+        with self._lock:
+            for name, value in counters.items():
+                self.counters[name] = self.counters.get(name, 0) + (value or 0)
+
+    def record_usage(self, usage):
+        """
+        Record the token usage block of an OpenRouter response.
+
+        Args:
+            usage (dict): The response's 'usage' object, if any.
+        """
+        usage = usage or {}
+        self.add(
+            requests=1,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+        )
+        # Prompt tokens served from the provider's prompt cache, when reported
+        details = usage.get("prompt_tokens_details") or {}
+        if "cached_tokens" in details:
+            self.add(cached_tokens=details["cached_tokens"])
+
+    def to_dict(self):
+        """
+        Export the collected metrics.
+
+        Returns:
+            dict: Dictionary with 'stages' (seconds) and 'counters'.
+        """
+        with self._lock:
+            return {
+                "stages": {name: round(value, 4) for name, value in self.stages.items()},
+                "counters": dict(self.counters),
+            }
+
+    def write(self, path):
+        """
+        Atomically write the metrics as a JSON file.
+
+        Args:
+            path (str): Destination path of the sidecar file.
+        """
+        atomic_write(path, json.dumps(self.to_dict(), indent=2))
+
+
+def metrics_path(output_file):
+    """
+    Return the metrics sidecar path for an output file.
+
+    Args:
+        output_file (str): Path of the generated report.
+
+    Returns:
+        str: Path of the JSON sidecar next to the report.
+    """
+    return os.path.splitext(output_file)[0] + ".metrics.json"
+
+
+def aggregate(metrics_dicts):
+    """
+    Sum stage timings and counters over several decks.
+
+    Args:
+        metrics_dicts (list): Dictionaries as returned by Metrics.to_dict.
+
+    Returns:
+        dict: Aggregated 'stages' and 'counters' plus the number of 'decks'.
+    """
+    stages, counters = {}, {}
+    for entry in metrics_dicts:
+        for name, value in entry.get("stages", {}).items():
+            stages[name] = stages.get(name, 0.0) + value
+        for name, value in entry.get("counters", {}).items():
+            counters[name] = counters.get(name, 0) + value
+    return {
+        "decks": len(metrics_dicts),
+        "stages": {name: round(value, 4) for name, value in stages.items()},
+        "counters": counters,
+    }
+
+
+@contextmanager
+def profiled(path=None):
+    """
+    Run the enclosed block under cProfile and dump the stats.
+
+    Args:
+        path (str): File the profile is written to (readable with pstats or
+                    snakeviz). If None, profiling is disabled.
+    """
+    if not path:
+        yield
+        return
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
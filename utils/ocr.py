@@ -0,0 +1,388 @@
+"""
+OCR module for recovering the text of scanned or image-only PDF pages.
+
+PyPDF2 only sees text drawn with fonts, so scanned decks and decks exported
+as images yield pages with little or no text. This module finds those
+text-poor pages, rasterises them and runs a local OCR engine over them in a
+process pool, with a per-deck time budget. Results are cached by a hash of
+the page's content, so an unchanged page is never recognised twice, even in
+a renamed or re-exported deck.
+
+The default engine needs the optional ``pypdfium2`` and ``pytesseract``
+packages and the ``tesseract`` binary; without them the fallback is skipped
+and the deck is analysed with the text PyPDF2 found.
+"""
+
+import hashlib
+import importlib.util
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+_warned = False
+_warn_lock = threading.Lock()
+
+
+def ocr_available():
+    """
+    Check whether the default OCR engine can run.
+
+    Returns:
+        bool: True if pypdfium2, pytesseract and the tesseract binary are
+              installed.
+    """
+    return (importlib.util.find_spec("pypdfium2") is not None
+            and importlib.util.find_spec("pytesseract") is not None
+            and shutil.which("tesseract") is not None)
+
+
+def _warn_unavailable():
+    """
+    Print the missing-engine notice once per process.
+    """
+    global _warned
+    with _warn_lock:
+        if not _warned:
+            _warned = True
+            print("OCR fallback skipped: install pypdfium2, pytesseract and tesseract to "
+                  "recover text from scanned pages")
+
+
+def tesseract_page(filepath, index, dpi=200, lang="eng", timeout=0):
+    """
+    Rasterise one PDF page and recognise its text (runs in a worker process).
+
+    Args:
+        filepath (str): Path to the PDF file.
+        index (int): Zero-based page index.
+        dpi (int): Rendering resolution. Defaults to 200.
+        lang (str): Tesseract language code(s). Defaults to "eng".
+        timeout (float): Seconds before tesseract is killed; 0 disables it.
+
+    Returns:
+        str: The recognised text.
+    """
+    import pypdfium2
+    import pytesseract
+
+    document = pypdfium2.PdfDocument(filepath)
+    try:
+        image = document[index].render(scale=dpi / 72).to_pil()
+    finally:
+        document.close()
+    return pytesseract.image_to_string(image, lang=lang, timeout=timeout)
+
+
+def text_poor_pages(pages, min_chars=20):
+    """
+    Find the pages whose extracted text is too short to be the page's content.
+
+    Args:
+        pages (list): Page records as returned by iter_pdf_pages.
+        min_chars (int): Pages with fewer non-whitespace characters need OCR.
+                         Defaults to 20.
+
+    Returns:
+        list: Zero-based indices of the text-poor pages.
+    """
+    return [i for i, page in enumerate(pages) if len("".join(page["text"].split())) < min_chars]
+
+
+def _hash_resources(digest, resources, seen, depth=0):
+    """
+    Feed the XObjects (images and forms) of a resource dictionary into a digest.
+    """
+    if resources is None or depth > 3:
+        return
+    xobjects = resources.get_object().get("/XObject")
+    if xobjects is None:
+        return
+    xobjects = xobjects.get_object()
+    for name in sorted(xobjects):
+        ref = xobjects.raw_get(name)
+        key = (getattr(ref, "idnum", None), getattr(ref, "generation", None))
+        if key[0] is not None and key in seen:
+            continue
+        seen.add(key)
+        obj = ref.get_object()
+        try:
+            digest.update(obj.get_data())
+        except Exception:
+            # Undecodable streams are identified by their dictionary instead
+            digest.update(repr(sorted(obj.items())).encode("utf-8"))
+        if obj.get("/Subtype") == "/Form":
+            _hash_resources(digest, obj.get("/Resources"), seen, depth + 1)
+
+
+def page_hashes(filepath, indices):
+    """
+    Hash the content of PDF pages, independently of the file they are in.
+
+    The hash covers the page's content stream and the images and forms it
+    draws, which is everything OCR sees.
+
+    Args:
+        filepath (str): Path to the PDF file.
+        indices (list): Zero-based page indices to hash.
+
+    Returns:
+        list: Hex-encoded SHA-256 digests, in the order of ``indices``.
+    """
+    from utils.pdf_parser import open_pdf
+
+    hashes = []
+    with open_pdf(filepath) as reader:
+        for index in indices:
+            page = reader.pages[index]
+            digest = hashlib.sha256()
+            contents = page.get_contents()
+            digest.update(contents.get_data() if contents is not None else b"")
+            digest.update(repr(list(page.mediabox)).encode("utf-8"))
+            _hash_resources(digest, page.get("/Resources"), set())
+            hashes.append(digest.hexdigest())
+    return hashes
+
+
+class OcrCache:
+    """
+    Persistent SQLite-backed cache of recognised page text.
+
+    Entries are keyed by the page content hash and the OCR settings. The
+    database file can safely be shared between threads and processes.
+    """
+
+    def __init__(self, path=".cache/ocr.sqlite"):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path (str): Location of the SQLite database file.
+                        Defaults to ".cache/ocr.sqlite".
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages (key TEXT PRIMARY KEY, text TEXT, created REAL)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        """
+        Look up the recognised text of a page.
+
+        Args:
+            key (str): Page content hash combined with the OCR settings.
+
+        Returns:
+            str or None: The cached text, or None on a miss.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM pages WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, text):
+        """
+        Store the recognised text of a page.
+
+        Args:
+            key (str): Page content hash combined with the OCR settings.
+            text (str): The recognised text.
+        """
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO pages (key, text, created) VALUES (?, ?, ?)",
+                               (key, text, time.time()))
+            self._conn.commit()
+
+    def close(self):
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+def _run_engine(engine, filepath, indices, workers, deadline, dpi, lang):
+    """
+    Recognise pages until the deadline, in parallel when several are pending.
+
+    Returns:
+        tuple: (index to recognised text, number of failed pages).
+    """
+    results, failed = {}, 0
+    if workers <= 1:
+        for index in indices:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                results[index] = engine(filepath, index, dpi, lang, remaining)
+            except Exception:
+                failed += 1
+        return results, failed
+
+    # A zero timeout means none to tesseract, so never start pages past the deadline
+    if deadline - time.monotonic() <= 0:
+        return results, failed
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending, running = list(indices), {}
+    try:
+        while pending or running:
+            # Start pages only on free processes, each with the time left when it starts
+            while pending and len(running) < workers:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                index = pending.pop(0)
+                running[pool.submit(engine, filepath, index, dpi, lang, remaining)] = index
+            remaining = deadline - time.monotonic()
+            if not running or remaining <= 0:
+                break
+            done, _ = wait(running, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                index = running.pop(future)
+                try:
+                    results[index] = future.result()
+                except Exception:
+                    failed += 1
+    finally:
+        if running:
+            _terminate(pool)
+        else:
+            pool.shutdown(wait=False)
+    return results, failed
+
+
+def _terminate(pool):
+    """
+    Shut a process pool down and kill its processes, including pages still
+    being rasterised or recognised, so none outlive the deck's OCR budget.
+    """
+    # ProcessPoolExecutor only gained terminate_workers() in Python 3.14
+    terminate_workers = getattr(pool, "terminate_workers", None)
+    if terminate_workers is not None:
+        terminate_workers()
+        return
+    processes = list((pool._processes or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+def ocr_pages(filepath, pages, min_chars=20, workers=None, budget_seconds=60, dpi=200,
+              lang="eng", cache_path=".cache/ocr.sqlite", engine=None):
+    """
+    Replace the text of text-poor PDF pages with OCR output.
+
+    Only pages with fewer than ``min_chars`` characters of extracted text are
+    recognised; cached pages are filled in first and the rest are spread
+    over ``workers`` processes. Pages not finished within the deck's time
+    budget keep their extracted text.
+
+    Args:
+        filepath (str): Path to the PDF file.
+        pages (list): Page records as returned by iter_pdf_pages.
+        min_chars (int): Threshold below which a page needs OCR. Defaults to 20.
+        workers (int): OCR processes. Defaults to the number of CPU cores, or
+                       to 1 when called from a worker process (e.g. a batch
+                       parser) so parallel decks do not start a pool each.
+        budget_seconds (float): Time budget for OCR of the whole deck.
+                                Defaults to 60.
+        dpi (int): Rendering resolution. Defaults to 200.
+        lang (str): Tesseract language code(s). Defaults to "eng".
+        cache_path (str): Location of the OCR cache database. None disables
+                          caching.
+        engine (callable): Picklable ``engine(filepath, index, dpi, lang,
+                           timeout)`` returning a page's text. Defaults to
+                           tesseract_page when it is available.
+
+    Returns:
+        tuple: (pages, stats) with updated page records (recognised pages
+               are marked with 'ocr': True) and a stats dict with the number
+               of 'candidates', 'recognised', 'cached', 'skipped' and
+               'failed' pages and the elapsed 'seconds'.
+    """
+    start = time.monotonic()
+    candidates = text_poor_pages(pages, min_chars)
+    stats = {"candidates": len(candidates), "recognised": 0, "cached": 0,
+             "skipped": 0, "failed": 0, "seconds": 0.0}
+    if not candidates:
+        return pages, stats
+    if engine is None:
+        if not ocr_available():
+            _warn_unavailable()
+            stats["skipped"] = len(candidates)
+            return pages, stats
+        engine = tesseract_page
+
+    settings = f"{dpi}:{lang}"
+    keys = dict(zip(candidates, (f"{h}:{settings}" for h in page_hashes(filepath, candidates))))
+    cache = OcrCache(cache_path) if cache_path else None
+    texts, pending = {}, []
+    try:
+        for index in candidates:
+            cached = cache.get(keys[index]) if cache is not None else None
+            if cached is None:
+                pending.append(index)
+            else:
+                texts[index] = cached
+        stats["cached"] = len(texts)
+
+        if pending:
+            if not workers:
+                in_worker = multiprocessing.parent_process() is not None
+                workers = 1 if in_worker else os.cpu_count() or 1
+            workers = min(workers, len(pending))
+            recognised, stats["failed"] = _run_engine(engine, filepath, pending, workers,
+                                                      start + budget_seconds, dpi, lang)
+            for index, text in recognised.items():
+                texts[index] = text
+                if cache is not None:
+                    cache.set(keys[index], text)
+            stats["recognised"] = len(recognised)
+            stats["skipped"] = len(pending) - len(recognised) - stats["failed"]
+    finally:
+        if cache is not None:
+            cache.close()
+
+    updated = list(pages)
+    for index, text in texts.items():
+        text = text.strip()
+        # Keep the extracted text when OCR found no more than PyPDF2 did
+        if len(text) > len(pages[index]["text"].strip()):
+            updated[index] = dict(pages[index], text=text, chars=len(text), ocr=True)
+    stats["seconds"] = round(time.monotonic() - start, 3)
+    return updated, stats
+
+
+def ocr_counters(deck_data):
+    """
+    Build metrics counters from the OCR stats of a parsed deck.
+
+    Args:
+        deck_data (dict): Parsed deck data, with optional 'ocr' stats.
+
+    Returns:
+        dict: 'ocr_pages', 'ocr_cached', 'ocr_skipped' and 'ocr_failed'
+              counters, or an empty dict if OCR did not run.
+    """
+    stats = deck_data.get("ocr")
+    if not stats or not stats["candidates"]:
+        return {}
+    return {
+        "ocr_pages": stats["recognised"],
+        "ocr_cached": stats["cached"],
+        "ocr_skipped": stats["skipped"],
+        "ocr_failed": stats["failed"],
+    }
@@ -2,43 +2,227 @@
 PDF parser module for extracting text from PDF pitch decks.
 
 This module provides functionality to extract text content from PDF files
-using PyPDF2, handling multi-page documents and formatting issues.
+using PyPDF2, handling multi-page documents and formatting issues. Files are
+read through a memory-mapped buffer rather than loaded into memory, pages
+can be consumed lazily through a generator, and very large documents can
+be extracted in parallel page ranges. Text-poor pages of scanned or
+image-only decks can be recovered with the OCR fallback in utils.ocr.
 """
 
-from PyPDF2 import PdfReader
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 
 
-def parse_pdf(filepath):
+@contextmanager
+def open_pdf(filepath):
+    """
+    Open a PDF for reading through a memory-mapped buffer.
+
+    PdfReader copies a file given by path into memory in full; reading from
+    a memory map instead lets the OS page in only the objects that are
+    actually parsed, which keeps embedded image streams out of the process.
+
+    Args:
+        filepath (str): Path to the PDF file.
+
+    Yields:
+        PdfReader: Reader over the mapped file, valid inside the block.
+    """
+    # Imported on first use so that startup and PPT-only runs skip PyPDF2
+    from PyPDF2 import PdfReader
+
+    with open(filepath, "rb") as f:
+        # Empty files cannot be mapped; PdfReader reports them instead
+        buffer = f
+        if os.fstat(f.fileno()).st_size:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield PdfReader(buffer)
+        finally:
+            if buffer is not f:
+                buffer.close()
+
+
+def iter_pdf_pages(filepath, start=0, stop=None, deadline=None):
+    """
+    Lazily extract per-page text records from a PDF file.
+
+    Args:
+        filepath (str): Path to the PDF file to parse.
+        start (int): Zero-based index of the first page to extract. Defaults to 0.
+        stop (int): Zero-based index one past the last page to extract.
+                    Defaults to the end of the document.
+        deadline (float): ``time.time()`` after which no further pages are
+                          extracted. None extracts every page.
+
+    Yields:
+        dict: One record per page containing:
+            - page (int): One-based page number
+            - text (str): Extracted text ("" for pages without text)
+            - chars (int): Number of extracted characters
+    """
+    with open_pdf(filepath) as reader:
+        stop = len(reader.pages) if stop is None else min(stop, len(reader.pages))
+        for index in range(start, stop):
+            if deadline is not None and time.time() >= deadline:
+                return
+            t = reader.pages[index].extract_text() or ""
+            yield {"page": index + 1, "text": t, "chars": len(t)}
+
+
+def _extract_page_range(args):
+    """
+    Extract a contiguous page range (runs in a worker process).
+
+    Args:
+        args (tuple): (filepath, start, stop, deadline) as accepted by
+                      iter_pdf_pages.
+
+    Returns:
+        list: Page records for the range, in page order.
+    """
+    return list(iter_pdf_pages(*args))
+
+
+def extract_pdf_pages(filepath, workers=1, parallel_threshold=100, max_pages=None, deadline=None):
+    """
+    Extract all page records, in parallel page ranges for large documents.
+
+    Args:
+        filepath (str): Path to the PDF file to parse.
+        workers (int): Number of worker processes. Defaults to 1 (in-process).
+        parallel_threshold (int): Minimum page count before worker processes
+                                  are used. Defaults to 100.
+        max_pages (int): Extract at most the first ``max_pages`` pages.
+                         None extracts every page.
+        deadline (float): ``time.time()`` after which extraction stops.
+
+    Returns:
+        list: Page records in page order, as yielded by iter_pdf_pages. When
+              the deadline cut extraction short, only the leading pages
+              without gaps are returned.
+    """
+    if workers <= 1:
+        return list(iter_pdf_pages(filepath, 0, max_pages, deadline))
+
+    with open_pdf(filepath) as reader:
+        page_count = len(reader.pages)
+    if max_pages is not None:
+        page_count = min(page_count, max_pages)
+    if page_count < parallel_threshold:
+        return list(iter_pdf_pages(filepath, 0, page_count, deadline))
+
+    # Split the document into one contiguous range per worker
+    workers = min(workers, os.cpu_count() or 1, page_count)
+    step = -(-page_count // workers)
+    ranges = [(filepath, start, min(start + step, page_count), deadline)
+              for start in range(0, page_count, step)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pages = [page for chunk in pool.map(_extract_page_range, ranges) for page in chunk]
+    # Ranges stopped by the deadline leave gaps; keep the leading run only
+    for index, page in enumerate(pages):
+        if page["page"] != index + 1:
+            return pages[:index]
+    return pages
+
+
+def join_pages(pages):
+    """
+    Join page texts into one string and drop the text from the page records.
+
+    Keeping every page's text both in its record and in the joined copy
+    doubles the text held per deck, so the records keep only the page's
+    offset into the joined text; page_text slices it back out on demand.
+
+    Args:
+        pages (list): Page records with 'page' and 'text' keys.
+
+    Returns:
+        tuple: (raw_text, records) where 'raw_text' is each non-empty page's
+               text followed by a newline and 'records' are copies of the
+               page records with 'offset' and 'chars' instead of 'text'.
+    """
+    parts, records, offset = [], [], 0
+    for page in pages:
+        text = page["text"]
+        record = {key: value for key, value in page.items() if key != "text"}
+        record.update(offset=offset, chars=len(text))
+        records.append(record)
+        if text:
+            parts.append(text + "\n")
+            offset += len(text) + 1
+    return "".join(parts), records
+
+
+def page_text(deck_data, page):
+    """
+    Return the text of one page record of a parsed deck.
+
+    Args:
+        deck_data (dict): Parsed deck data the record belongs to.
+        page (dict): Page record, either as built by join_pages or with its
+                     own 'text' key.
+
+    Returns:
+        str: The page's text ("" for pages without text).
+    """
+    if "text" in page:
+        return page["text"]
+    return deck_data["raw_text"][page["offset"]:page["offset"] + page["chars"]]
+
+
+def parse_pdf(filepath, workers=1, parallel_threshold=100, ocr=None, max_pages=None,
+              deadline=None):
     """
     Extract text content from a PDF file.
-    
+
     This function reads a PDF file and extracts all text content from each page,
-    concatenating them into a single string for further processing.
-    
+    returning both per-page records and the concatenated text.
+
     Args:
         filepath (str): Path to the PDF file to parse.
-        
+        workers (int): Number of worker processes for page-parallel
+                       extraction. Defaults to 1 (in-process).
+        parallel_threshold (int): Minimum page count before worker processes
+                                  are used. Defaults to 100.
+        ocr (dict): Keyword arguments for ocr_pages, which recognises the
+                    text of text-poor pages. None disables the OCR fallback.
+        max_pages (int): Parse at most the first ``max_pages`` pages.
+                         None parses every page.
+        deadline (float): ``time.time()`` after which page extraction stops.
+
     Returns:
         dict: Dictionary containing:
             - source (str): File format identifier ("pdf")
             - raw_text (str): Extracted text content from all pages
-            
+            - pages (list): Per-page records with 'page', 'offset' and
+              'chars'; use page_text to read a page's text
+            - ocr (dict): OCR stats as returned by ocr_pages (only when the
+              OCR fallback is enabled)
+
     Note:
-        The function handles empty pages gracefully by checking if text
-        extraction returns non-empty content before adding to the result.
-        Each page's text is separated by a newline character.
-    """
-    reader = PdfReader(filepath)
-    text = ""
-    
-    # Extract text from each page
-    for page in reader.pages:
-        t = page.extract_text()
-        # Only add non-empty text to avoid unnecessary newlines
-        if t:
-            text += t + "\n"
-    
-    return {
+        Pages without text are kept in 'pages' but skipped in 'raw_text' to
+        avoid unnecessary newlines. Each page's text is followed by a newline
+        character, and the text is joined once rather than built incrementally
+        and is not kept a second time in the page records.
+    """
+    pages = extract_pdf_pages(filepath, workers=workers, parallel_threshold=parallel_threshold,
+                              max_pages=max_pages, deadline=deadline)
+    ocr_stats = None
+    if ocr is not None:
+        from utils.ocr import ocr_pages
+
+        pages, ocr_stats = ocr_pages(filepath, pages, **ocr)
+
+    raw_text, pages = join_pages(pages)
+    deck_data = {
         "source": "pdf",
-        "raw_text": text
+        "raw_text": raw_text,
+        "pages": pages
     }
+    if ocr_stats is not None:
+        deck_data["ocr"] = ocr_stats
+    return deck_data
@@ -0,0 +1,270 @@
+"""
+Pipeline helpers shared by the single-deck and batch entry points.
+
+This module provides format dispatch for the deck parsers, the output
+naming scheme and the analysis steps that follow parsing, so that every
+entry point parses, analyses and names decks the same way.
+"""
+
+import functools
+import glob
+import hashlib
+import os
+import time
+from datetime import datetime
+from utils.compaction import compact_deck
+from utils.dedup import find_reusable
+from utils.enrich import failed_sections
+from utils.incremental import build_state, diff_decks, load_state, save_state, state_path, unit_hashes
+from utils.ingest import parse_guarded
+from utils.markdown_writer import MarkdownStreamWriter
+from utils.metrics import metrics_path
+from utils.pdf_parser import parse_pdf
+from utils.ppt_parser import parse_ppt
+from utils.retrieval import estimate_tokens
+from utils.writers import write_outputs
+
+# File extensions accepted by parse_deck
+SUPPORTED_EXTENSIONS = ('.pdf', '.ppt', '.pptx')
+
+
+def parse_deck(file_path, workers=1, parallel_threshold=100, ocr=None, limits=None):
+    """
+    Parse a pitch deck with the parser matching its file extension.
+
+    Args:
+        file_path (str): Path to a PDF, PPT or PPTX file.
+        workers (int): Worker processes for page/slide-parallel extraction of
+                       large documents. Defaults to 1 (in-process).
+        parallel_threshold (int): Minimum page/slide count before worker
+                                  processes are used. Defaults to 100.
+        ocr (dict): Keyword arguments for the OCR fallback of text-poor PDF
+                    pages (see utils.ocr.ocr_pages). None disables it.
+        limits (dict): Keyword arguments for guarded ingestion with size,
+                       page/slide, memory and time limits (see
+                       utils.ingest.parse_guarded). None parses the whole
+                       deck without limits.
+
+    Returns:
+        dict: Parsed deck data with at least 'source' and 'raw_text' keys.
+
+    Raises:
+        ValueError: If the file extension is not supported.
+        IngestError: If the deck exceeds the ingestion limits.
+    """
+    lower = file_path.lower()
+    if limits is not None and lower.endswith(SUPPORTED_EXTENSIONS):
+        return parse_guarded(file_path, workers=workers, parallel_threshold=parallel_threshold,
+                             ocr=ocr, **limits)
+    if lower.endswith('.pdf'):
+        return parse_pdf(file_path, workers=workers, parallel_threshold=parallel_threshold,
+                         ocr=ocr)
+    if lower.endswith(('.ppt', '.pptx')):
+        return parse_ppt(file_path, workers=workers, parallel_threshold=parallel_threshold)
+    raise ValueError(f"Unsupported file format: {file_path}")
+
+
+def source_tag(input_file):
+    """
+    Derive a short tag from the full path of a deck file.
+
+    Batch runs add it to output names, so decks with the same base name in
+    different folders, or with different extensions (``deck.pdf`` and
+    ``deck.pptx``), get distinct outputs.
+
+    Args:
+        input_file (str): Path to the input pitch deck file.
+
+    Returns:
+        str: 8 hex digits hashed from the absolute path of the deck file.
+    """
+    return hashlib.sha1(os.path.abspath(input_file).encode("utf-8")).hexdigest()[:8]
+
+
+def _output_base(input_file, tag=None):
+    """
+    Return the output name prefix of a deck: its base name and optional tag.
+    """
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+    return f"{base_name}_{tag}" if tag else base_name
+
+
+def output_extension(config):
+    """
+    Return the report file extension configured by 'output_file'.
+
+    Args:
+        config (dict): Configuration dictionary with output file settings.
+
+    Returns:
+        str: The extension including its dot, ".md" by default.
+    """
+    return os.path.splitext(config.get("output_file", "output.md"))[1] or ".md"
+
+
+def generate_output_filename(input_file, config, tag=None):
+    """
+    Generate a unique output filename based on input file and timestamp.
+
+    Args:
+        input_file (str): Path to the input pitch deck file.
+        config (dict): Configuration dictionary with output file settings.
+        tag (str): Optional tag placed between the base name and the
+                   timestamp, e.g. ``source_tag(input_file)``.
+
+    Returns:
+        str: Generated output filename with timestamp.
+    """
+    # Get base filename without extension (and the tag, if any)
+    base_name = _output_base(input_file, tag)
+
+    # Generate timestamp
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    # Get output file extension from config or default to .md
+    file_ext = output_extension(config)
+
+    # Create unique filename
+    unique_filename = f"{base_name}_{timestamp}{file_ext}"
+
+    return unique_filename
+
+
+def find_existing_output(input_file, output_dir, config, tag=None):
+    """
+    Find a previously generated output for a deck, if any.
+
+    Args:
+        input_file (str): Path to the input pitch deck file.
+        output_dir (str): Directory where outputs are written.
+        config (dict): Configuration dictionary with output file settings.
+        tag (str): Tag the output names were generated with, if any.
+
+    Returns:
+        str or None: Path to the most recent existing output, or None.
+    """
+    base_name = _output_base(input_file, tag)
+    file_ext = output_extension(config)
+    pattern = os.path.join(glob.escape(output_dir), f"{glob.escape(base_name)}_*{file_ext}")
+    matches = []
+    for path in glob.glob(pattern):
+        # Only accept "<base>_<YYYYMMDD_HHMMSS><ext>", not e.g. "<base>_v2_..."
+        stamp = os.path.basename(path)[len(base_name) + 1:-len(file_ext)]
+        if len(stamp) == 15 and stamp.replace("_", "", 1).isdigit():
+            matches.append(path)
+    # Timestamped names sort chronologically, so the last match is the newest
+    return max(matches) if matches else None
+
+
+def analyse_deck(file_path, deck_data, enricher, output_file, metrics, formats=("markdown", "json"),
+                 dedup=None, signature=None, reuse_duplicates=True, compact_options=None,
+                 previous=None, fingerprints=None, on_section=None, partial=False, verbose=False):
+    """
+    Analyse a parsed deck and write its report with all sidecars.
+
+    This is the pipeline shared by the single-deck, batch and job entry
+    points: near-duplicate lookup, compaction, enrichment (reusing unchanged
+    sections of ``previous``), report formats, metrics sidecar, state file
+    and dedup indexing.
+
+    Args:
+        file_path (str): Path of the deck file.
+        deck_data (dict): Parsed deck data.
+        enricher (Enricher): Enricher generating the sections.
+        output_file (str): Path of the markdown report.
+        metrics (Metrics): Collector for stage timings and counters; written
+                           to the metrics sidecar.
+        formats (list): Report formats to write. Defaults to markdown and JSON.
+        dedup (DedupIndex): Optional index of earlier decks. The analysis of
+                            a near-duplicate is reused, and a deck enriched
+                            without failed sections is added to the index.
+        signature (numpy.ndarray): The deck's MinHash signature if already
+                                   computed (e.g. in a parser process).
+        reuse_duplicates (bool): Reuse the analysis of a near-duplicate found
+                                 in ``dedup``. Defaults to True.
+        compact_options (dict): Keyword arguments for compact_deck. None
+                                skips compaction (e.g. when already done).
+        previous (dict): State of an earlier run whose unchanged sections
+                         are reused.
+        fingerprints (dict): Optional dict receiving the section
+                             fingerprints, filled before each section is
+                             requested.
+        on_section (callable): Optional callback receiving each section name
+                               and content as soon as it is ready.
+        partial (bool): Append sections (and streamed tokens) to
+                        ``<output_file>.partial`` while they are generated.
+        verbose (bool): Print deck changes since ``previous`` and reused
+                        near-duplicates.
+
+    Returns:
+        dict: 'output' path, 'enriched' sections, the dedup 'match' whose
+              analysis was reused (or None) and 'enrich_seconds'.
+    """
+    if dedup is not None and signature is None:
+        with metrics.stage("dedup"):
+            signature = dedup.signature(deck_data["raw_text"])
+    enriched, match = None, None
+    if dedup is not None and reuse_duplicates:
+        with metrics.stage("dedup"):
+            enriched, match = find_reusable(dedup, signature, file_path)
+
+    enrich_seconds = 0.0
+    fingerprints = fingerprints if fingerprints is not None else {}
+    if enriched is not None:
+        # A near-duplicate was analysed before: reuse it without LLM calls
+        metrics.add(dedup_reused=1)
+        if verbose:
+            print(f"Near-duplicate ({match['similarity']:.0%} similar) of {match['file']}; "
+                  f"reused the analysis in {match['output']}")
+        with metrics.stage("write"):
+            write_outputs(enriched, output_file, formats)
+        # Carry the section fingerprints over so the next incremental run can reuse them
+        matched_state = load_state(match["output"]) or {}
+        fingerprints.update((name, section["fingerprint"])
+                            for name, section in matched_state.get("sections", {}).items())
+    else:
+        if compact_options is not None:
+            raw_tokens = estimate_tokens(deck_data["raw_text"])
+            with metrics.stage("compact"):
+                deck_data = compact_deck(deck_data, **compact_options)
+            metrics.add(deck_tokens_raw=raw_tokens,
+                        deck_tokens_compacted=estimate_tokens(deck_data["raw_text"]))
+        if previous and verbose:
+            diff = diff_decks(previous.get("units", []), unit_hashes(deck_data))
+            print(f"Changes since the previous analysis: {len(diff['changed'])} changed, "
+                  f"{len(diff['added'])} added, {len(diff['removed'])} removed, "
+                  f"{diff['unchanged']} unchanged")
+
+        start = time.perf_counter()
+        write = functools.partial(write_outputs, formats=formats)
+        if partial:
+            with MarkdownStreamWriter(output_file) as writer:
+                if verbose:
+                    print(f"Writing sections to {writer.partial_path}")
+
+                def section_done(section, content):
+                    writer.write_section(section, content)
+                    if on_section is not None:
+                        on_section(section, content)
+
+                enriched = enricher.enrich(deck_data, metrics=metrics, previous=previous,
+                                           fingerprints=fingerprints, on_section=section_done,
+                                           on_token=writer.write_token)
+                enrich_seconds = time.perf_counter() - start
+                with metrics.stage("write"):
+                    writer.finalize(enriched, write=write)
+        else:
+            callbacks = {"on_section": on_section} if on_section is not None else {}
+            enriched = enricher.enrich(deck_data, metrics=metrics, previous=previous,
+                                       fingerprints=fingerprints, **callbacks)
+            enrich_seconds = time.perf_counter() - start
+            with metrics.stage("write"):
+                write(enriched, output_file)
+
+    metrics.write(metrics_path(output_file))
+    save_state(state_path(output_file),
+               build_state(enricher.model_name, deck_data, enriched, fingerprints))
+    if match is None and signature is not None and not failed_sections(enriched):
+        dedup.add(file_path, output_file, signature)
+    return {"output": output_file, "enriched": enriched, "match": match,
+            "enrich_seconds": enrich_seconds}
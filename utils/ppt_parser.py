@@ -2,44 +2,208 @@
 PowerPoint parser module for extracting text from PPT/PPTX pitch decks.
 
 This module provides functionality to extract text content from PowerPoint
-presentations using python-pptx, handling slides and text shapes.
+presentations using python-pptx. Slides are returned as structured records
+with titles, body text, table cells, chart labels and speaker notes, and can
+be consumed lazily or extracted in parallel slide ranges for very large decks.
 """
 
-from pptx import Presentation
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 
-def parse_ppt(filepath):
+def _iter_shape_content(shapes, texts, tables):
+    """
+    Collect text and table cells from shapes, recursing into group shapes.
+
+    Args:
+        shapes (iterable): Shapes of a slide or group shape.
+        texts (list): List that receives text fragments, in reading order.
+        tables (list): List that receives tables as lists of rows of cell text.
+    """
+    from pptx.enum.shapes import MSO_SHAPE_TYPE
+
+    for shape in shapes:
+        if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+            _iter_shape_content(shape.shapes, texts, tables)
+        elif getattr(shape, "has_table", False) and shape.has_table:
+            rows = [[cell.text.strip() for cell in row.cells] for row in shape.table.rows]
+            tables.append(rows)
+            texts.extend(" | ".join(row) for row in rows)
+        elif getattr(shape, "has_chart", False) and shape.has_chart:
+            chart = shape.chart
+            if chart.has_title and chart.chart_title.has_text_frame:
+                texts.append(chart.chart_title.text_frame.text)
+            try:
+                categories = [str(c) for c in chart.plots[0].categories] if len(chart.plots) else []
+            except (IndexError, ValueError):
+                categories = []
+            if categories:
+                texts.append("Chart categories: " + ", ".join(categories))
+            series = [s.name for s in chart.series if s.name]
+            if series:
+                texts.append("Chart series: " + ", ".join(series))
+        elif getattr(shape, "has_text_frame", False) and shape.has_text_frame:
+            if shape.text_frame.text.strip():
+                texts.append(shape.text_frame.text)
+
+
+def iter_slides(filepath, start=0, stop=None, deadline=None):
+    """
+    Lazily extract per-slide records from a PowerPoint presentation.
+
+    Args:
+        filepath (str): Path to the PowerPoint file to parse (.ppt or .pptx).
+        start (int): Zero-based index of the first slide to extract. Defaults to 0.
+        stop (int): Zero-based index one past the last slide to extract.
+                    Defaults to the end of the presentation.
+        deadline (float): ``time.time()`` after which no further slides are
+                          extracted. None extracts every slide.
+
+    Yields:
+        dict: One record per slide containing:
+            - slide (int): One-based slide number
+            - title (str): Slide title ("" if the slide has none)
+            - text (str): Text of all shapes, tables and charts on the slide
+            - tables (list): Tables as lists of rows of cell text
+            - notes (str): Speaker notes ("" if none)
+            - chars (int): Number of characters in text and notes
+    """
+    # Imported on first use so that startup and PDF-only runs skip python-pptx
+    from pptx import Presentation
+
+    prs = Presentation(filepath)
+    slides = prs.slides
+    stop = len(slides) if stop is None else min(stop, len(slides))
+    for index in range(start, stop):
+        if deadline is not None and time.time() >= deadline:
+            return
+        slide = slides[index]
+        texts, tables = [], []
+        _iter_shape_content(slide.shapes, texts, tables)
+
+        title_shape = slide.shapes.title
+        title = title_shape.text.strip() if title_shape is not None and title_shape.has_text_frame else ""
+        notes = ""
+        if slide.has_notes_slide and slide.notes_slide.notes_text_frame is not None:
+            notes = slide.notes_slide.notes_text_frame.text.strip()
+
+        text = "\n".join(texts)
+        yield {
+            "slide": index + 1,
+            "title": title,
+            "text": text,
+            "tables": tables,
+            "notes": notes,
+            "chars": len(text) + len(notes),
+        }
+
+
+def _extract_slide_range(args):
+    """
+    Extract a contiguous slide range (runs in a worker process).
+
+    Args:
+        args (tuple): (filepath, start, stop, deadline) as accepted by
+                      iter_slides.
+
+    Returns:
+        list: Slide records for the range, in slide order.
+    """
+    return list(iter_slides(*args))
+
+
+def extract_slides(filepath, workers=1, parallel_threshold=100, max_slides=None, deadline=None):
+    """
+    Extract all slide records, in parallel slide ranges for large decks.
+
+    Args:
+        filepath (str): Path to the PowerPoint file to parse.
+        workers (int): Number of worker processes. Defaults to 1 (in-process).
+        parallel_threshold (int): Minimum slide count before worker processes
+                                  are used. Defaults to 100.
+        max_slides (int): Extract at most the first ``max_slides`` slides.
+                          None extracts every slide.
+        deadline (float): ``time.time()`` after which extraction stops.
+
+    Returns:
+        list: Slide records in slide order, as yielded by iter_slides. When
+              the deadline cut extraction short, only the leading slides
+              without gaps are returned.
+    """
+    if workers <= 1:
+        return list(iter_slides(filepath, 0, max_slides, deadline))
+
+    from pptx import Presentation
+
+    slide_count = len(Presentation(filepath).slides)
+    if max_slides is not None:
+        slide_count = min(slide_count, max_slides)
+    if slide_count < parallel_threshold:
+        return list(iter_slides(filepath, 0, slide_count, deadline))
+
+    # Split the deck into one contiguous range per worker
+    workers = min(workers, os.cpu_count() or 1, slide_count)
+    step = -(-slide_count // workers)
+    ranges = [(filepath, start, min(start + step, slide_count), deadline)
+              for start in range(0, slide_count, step)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        slides = [slide for chunk in pool.map(_extract_slide_range, ranges) for slide in chunk]
+    # Ranges stopped by the deadline leave gaps; keep the leading run only
+    for index, slide in enumerate(slides):
+        if slide["slide"] != index + 1:
+            return slides[:index]
+    return slides
+
+
+def slide_to_text(slide):
+    """
+    Render a slide record as plain text for prompting.
+
+    Args:
+        slide (dict): Slide record as yielded by iter_slides.
+
+    Returns:
+        str: Slide text followed by its speaker notes, if any.
+    """
+    if slide["notes"]:
+        return f"{slide['text']}\nSpeaker notes: {slide['notes']}"
+    return slide["text"]
+
+
+def parse_ppt(filepath, workers=1, parallel_threshold=100, max_slides=None, deadline=None):
     """
     Extract text content from a PowerPoint presentation file.
-    
-    This function reads a PPT or PPTX file and extracts all text content
-    from text shapes across all slides, concatenating them into a single string.
-    
+
+    This function reads a PPT or PPTX file and extracts structured content
+    from every slide, returning both per-slide records and the concatenated text.
+
     Args:
         filepath (str): Path to the PowerPoint file to parse (.ppt or .pptx).
-        
+        workers (int): Number of worker processes for slide-parallel
+                       extraction. Defaults to 1 (in-process).
+        parallel_threshold (int): Minimum slide count before worker processes
+                                  are used. Defaults to 100.
+        max_slides (int): Parse at most the first ``max_slides`` slides.
+                          None parses every slide.
+        deadline (float): ``time.time()`` after which slide extraction stops.
+
     Returns:
         dict: Dictionary containing:
             - source (str): File format identifier ("ppt")
             - raw_text (str): Extracted text content from all slides
-            
+            - slides (list): Per-slide records as yielded by iter_slides
+
     Note:
-        The function iterates through all slides and all shapes within each slide,
-        extracting text only from shapes that have a 'text' attribute (text boxes,
-        placeholders, etc.). Each shape's text is separated by a newline character.
+        Text is collected from text frames, table cells, chart titles and
+        labels, and shapes nested inside groups. Speaker notes are appended
+        to each slide's text in 'raw_text'.
     """
-    prs = Presentation(filepath)
-    text = ""
-    
-    # Extract text from all slides
-    for slide in prs.slides:
-        # Extract text from all shapes in the slide
-        for shape in slide.shapes:
-            # Only process shapes that have text content
-            if hasattr(shape, "text"):
-                text += shape.text + "\n"
-    
+    slides = extract_slides(filepath, workers=workers, parallel_threshold=parallel_threshold,
+                            max_slides=max_slides, deadline=deadline)
+
     return {
         "source": "ppt",
-        "raw_text": text
+        "raw_text": "".join(slide_to_text(slide) + "\n" for slide in slides if slide["chars"]),
+        "slides": slides
     }
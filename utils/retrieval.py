@@ -0,0 +1,192 @@
+"""
+Retrieval module for selecting the deck content relevant to each section.
+
+This module splits parsed deck data into chunks, indexes them with a small
+NumPy-based BM25 index and selects the top-ranked chunks for a query within
+a token budget, so that each analysis section is prompted with only the part
+of the deck it needs instead of the whole document.
+"""
+
+import re
+
+from utils.pdf_parser import page_text
+
+_TOKEN_RE = re.compile(r"\w+")
+# Letter runs, digit groups and single symbols, see estimate_tokens()
+_PIECE_RE = re.compile(r"[^\W\d_]+|\d{1,3}|\S")
+
+
+def tokenize(text):
+    """
+    Split text into lowercase word tokens for indexing.
+
+    Args:
+        text (str): Text to tokenize.
+
+    Returns:
+        list: Lowercase word tokens.
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of LLM tokens in a text without a model tokenizer.
+
+    The text is split the way BPE tokenizers tend to split it: short words
+    are one token and longer words one more per five letters, numbers are
+    split into groups of up to three digits, and every other symbol counts
+    as one token. This tracks real tokenizers more closely than a
+    characters-per-token ratio on whitespace- and punctuation-heavy deck text.
+
+    Args:
+        text (str): Text to measure.
+
+    Returns:
+        int: Estimated token count.
+    """
+    return 1 + sum(1 + max(0, len(piece) - 3) // 5 for piece in _PIECE_RE.findall(text))
+
+
+def deck_chunks(deck_data, max_words=200):
+    """
+    Split parsed deck data into labelled chunks for retrieval.
+
+    Pages or slides are used as natural chunk boundaries when the parser
+    provides them; long units and unstructured text are split into windows
+    of at most ``max_words`` words.
+
+    Args:
+        deck_data (dict): Parsed deck data with 'raw_text' and optionally
+                          'pages' or 'slides' records.
+        max_words (int): Maximum number of words per chunk. Defaults to 200.
+
+    Returns:
+        list: Chunks as dicts with 'label' and 'text' keys, in deck order.
+    """
+    if deck_data.get("slides"):
+        units = []
+        for slide in deck_data["slides"]:
+            text = slide["text"]
+            if slide.get("notes"):
+                text = f"{text}\nSpeaker notes: {slide['notes']}"
+            units.append((f"Slide {slide['slide']}", text))
+    elif deck_data.get("pages"):
+        units = [(f"Page {page['page']}", page_text(deck_data, page)) for page in deck_data["pages"]]
+    else:
+        units = [("Deck", deck_data.get("raw_text", ""))]
+
+    chunks = []
+    for label, text in units:
+        words = text.split()
+        if not words:
+            continue
+        if len(words) <= max_words:
+            chunks.append({"label": label, "text": text.strip()})
+            continue
+        for part, start in enumerate(range(0, len(words), max_words), 1):
+            chunks.append({"label": f"{label}.{part}", "text": " ".join(words[start:start + max_words])})
+    return chunks
+
+
+class BM25Index:
+    """
+    Okapi BM25 index over a list of chunk texts, backed by NumPy arrays.
+    """
+
+    def __init__(self, texts, k1=1.5, b=0.75):
+        """
+        Build the index.
+
+        Args:
+            texts (list): Chunk texts to index.
+            k1 (float): Term-frequency saturation parameter. Defaults to 1.5.
+            b (float): Length normalisation parameter. Defaults to 0.75.
+        """
+        # NumPy is only needed once retrieval mode is actually used
+        import numpy as np
+
+        docs = [tokenize(text) for text in texts]
+        self.vocab = {}
+        for doc in docs:
+            for term in doc:
+                self.vocab.setdefault(term, len(self.vocab))
+
+        # Term-frequency matrix: one row per chunk, one column per term
+        self.tf = np.zeros((len(docs), len(self.vocab)), dtype=np.float32)
+        for row, doc in enumerate(docs):
+            for term in doc:
+                self.tf[row, self.vocab[term]] += 1
+
+        lengths = self.tf.sum(axis=1)
+        avg_length = lengths.mean() if len(docs) else 0.0
+        df = (self.tf > 0).sum(axis=0)
+        self.idf = np.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        self.norm = k1 * (1 - b + b * lengths / avg_length) if avg_length else np.full(len(docs), k1)
+        self.k1 = k1
+
+    def scores(self, query):
+        """
+        Score every chunk against a query.
+
+        Args:
+            query (str): Free-text query.
+
+        Returns:
+            numpy.ndarray: BM25 score per chunk.
+        """
+        import numpy as np
+
+        columns = sorted({self.vocab[t] for t in tokenize(query) if t in self.vocab})
+        if not columns:
+            return np.zeros(self.tf.shape[0], dtype=np.float32)
+        tf = self.tf[:, columns]
+        weights = tf * (self.k1 + 1) / (tf + self.norm[:, None])
+        return weights @ self.idf[columns]
+
+
+def select_chunks(index, chunks, query, top_k=6, token_budget=1500, min_score=None):
+    """
+    Select the most relevant chunks for a query within a token budget.
+
+    Args:
+        index (BM25Index): Index built over ``chunks``.
+        chunks (list): Chunks as returned by deck_chunks.
+        query (str): Free-text query, e.g. a section name and instruction.
+        top_k (int): Maximum number of chunks to select. Defaults to 6.
+        token_budget (int): Maximum estimated tokens of selected text.
+                            Defaults to 1500.
+        min_score (float): Only chunks scoring above this are selected.
+                           Defaults to None (no minimum).
+
+    Returns:
+        list: Selected chunks, restored to deck order.
+    """
+    import numpy as np
+
+    scores = index.scores(query)
+    # Stable sort so equally scored chunks keep their deck order
+    ranked = np.argsort(-scores, kind="stable")
+    selected, used = [], 0
+    for i in ranked:
+        if len(selected) >= top_k or (min_score is not None and scores[i] <= min_score):
+            break
+        cost = estimate_tokens(chunks[i]["text"])
+        if used + cost > token_budget and selected:
+            continue
+        selected.append(int(i))
+        used += cost
+    return [chunks[i] for i in sorted(selected)]
+
+
+def format_chunks(chunks):
+    """
+    Render selected chunks as labelled context text.
+
+    Args:
+        chunks (list): Chunks as returned by select_chunks.
+
+    Returns:
+        str: Chunk texts preceded by their page/slide labels.
+    """
+    return "\n\n".join(f"[{chunk['label']}]\n{chunk['text']}" for chunk in chunks)
@@ -0,0 +1,395 @@
+"""
+Model routing module for per-section models, hedged requests and failover.
+
+This module decides which LLM model serves each request. Sections can be
+routed to different models (e.g. a fast model for the company name and a
+stronger one for scoring). A request that has not answered by the p95
+latency observed for its model is hedged with a request to the next
+fallback model and the first answer wins, and a per-model circuit breaker
+skips models that keep failing, so a slow or broken provider no longer
+stalls the whole deck.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class BreakerOpenError(Exception):
+    """
+    Raised when a model's circuit breaker refuses a request, e.g. because
+    another request already claimed its half-open trial.
+    """
+
+
+class CircuitBreaker:
+    """
+    Per-model circuit breaker.
+
+    A model is skipped after ``failure_threshold`` consecutive failures.
+    Once ``reset_seconds`` have passed, one trial request is let through:
+    success closes the breaker again, failure keeps it open for another
+    period.
+    """
+
+    def __init__(self, failure_threshold=3, reset_seconds=60.0):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the
+                                     breaker for a model. Defaults to 3.
+            reset_seconds (float): Seconds before an open breaker lets a
+                                   trial request through. Defaults to 60.
+        """
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_seconds = reset_seconds
+        self._failures = {}
+        self._opened = {}
+        self._lock = threading.Lock()
+
+    def allow(self, model):
+        """
+        Check whether a request to a model may be sent.
+
+        Args:
+            model (str): Model name.
+
+        Returns:
+            bool: False while the model's breaker is open.
+        """
+        with self._lock:
+            opened = self._opened.get(model)
+            if opened is None:
+                return True
+            if time.monotonic() - opened >= self.reset_seconds:
+                # Half-open: let one trial through and restart the period
+                self._opened[model] = time.monotonic()
+                return True
+            return False
+
+    def available(self, model):
+        """
+        Check whether a model could be tried, without claiming its trial.
+
+        Args:
+            model (str): Model name.
+
+        Returns:
+            bool: True if the breaker is closed or its open period has passed.
+        """
+        with self._lock:
+            opened = self._opened.get(model)
+            return opened is None or time.monotonic() - opened >= self.reset_seconds
+
+    def is_open(self, model):
+        """
+        Return True if the model's breaker is currently open.
+        """
+        with self._lock:
+            return model in self._opened
+
+    def record_success(self, model):
+        """
+        Close the breaker of a model that answered.
+        """
+        with self._lock:
+            self._failures.pop(model, None)
+            self._opened.pop(model, None)
+
+    def record_failure(self, model):
+        """
+        Count a failed request, opening the breaker at the threshold.
+        """
+        with self._lock:
+            self._failures[model] = self._failures.get(model, 0) + 1
+            if self._failures[model] >= self.failure_threshold:
+                self._opened[model] = time.monotonic()
+
+
+class LatencyTracker:
+    """
+    Sliding window of recent request latencies per model.
+    """
+
+    def __init__(self, window=100):
+        """
+        Initialize the tracker.
+
+        Args:
+            window (int): Latencies kept per model. Defaults to 100.
+        """
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, model, seconds):
+        """
+        Record the latency of a completed request.
+
+        Args:
+            model (str): Model name.
+            seconds (float): Request latency.
+        """
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def quantile(self, model, fraction=0.95, min_samples=10):
+        """
+        Return a latency quantile for a model.
+
+        Args:
+            model (str): Model name.
+            fraction (float): Quantile, e.g. 0.95 for p95.
+            min_samples (int): Latencies needed before a quantile is reported.
+
+        Returns:
+            float or None: Nearest-rank quantile in seconds, or None if fewer
+                           than ``min_samples`` latencies were recorded.
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if not samples or len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(round(fraction * (len(samples) - 1))))]
+
+
+class ModelRouter:
+    """
+    Chooses the model for each request and runs it with failover or hedging.
+
+    Routes are section names, "Company Name" for the name prompt, or None
+    for requests that always use the default model (fused groups).
+    """
+
+    def __init__(self, default_model, section_models=None, fallback_models=None, hedge=False,
+                 hedge_quantile=0.95, hedge_initial_delay=20.0, hedge_min_delay=1.0,
+                 hedge_min_samples=10, breaker_failures=3, breaker_reset_seconds=60.0,
+                 max_workers=16):
+        """
+        Initialize the router.
+
+        Args:
+            default_model (str): Model for routes without an entry in
+                                 ``section_models``.
+            section_models (dict): Route (section name) to model name.
+            fallback_models (list): Models tried, in order, when the routed
+                                    model fails, is skipped by its circuit
+                                    breaker or (with ``hedge``) is slow.
+            hedge (bool): Send a second request to the next fallback model
+                          when the first has not answered by its deadline,
+                          and use whichever answers first. Defaults to False.
+            hedge_quantile (float): Latency quantile of a model used as its
+                                    hedging deadline. Defaults to 0.95.
+            hedge_initial_delay (float): Deadline in seconds until enough
+                                         latencies have been observed.
+            hedge_min_delay (float): Lower bound for the deadline in seconds.
+            hedge_min_samples (int): Latencies needed before the observed
+                                     quantile replaces the initial delay.
+            breaker_failures (int): Consecutive failures that open a model's
+                                    circuit breaker. Defaults to 3.
+            breaker_reset_seconds (float): Seconds before an open breaker lets
+                                           a trial request through.
+            max_workers (int): Threads running hedged requests. Defaults to 16.
+        """
+        self.default_model = default_model
+        self.section_models = dict(section_models or {})
+        self.fallback_models = list(fallback_models or [])
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_initial_delay = hedge_initial_delay
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = CircuitBreaker(breaker_failures, breaker_reset_seconds)
+        self.latency = LatencyTracker()
+        self.max_workers = max_workers
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def model_for(self, route):
+        """
+        Return the model a route is sent to first.
+
+        Args:
+            route (str): Section name, "Company Name" or None.
+
+        Returns:
+            str: Model name.
+        """
+        return self.section_models.get(route, self.default_model)
+
+    def models(self, route):
+        """
+        Return every model that may answer a route, in order of preference.
+
+        Args:
+            route (str): Section name, "Company Name" or None.
+
+        Returns:
+            list: Routed model followed by the fallback models.
+        """
+        primary = self.model_for(route)
+        return [primary] + [m for m in self.fallback_models if m != primary]
+
+    def candidates(self, route):
+        """
+        Return the models to try for a route, skipping open breakers.
+
+        Listing candidates has no side effects on the breakers; a half-open
+        model's trial is only claimed when a request is actually sent to it.
+
+        Args:
+            route (str): Section name, "Company Name" or None.
+
+        Returns:
+            list: Routed model followed by the fallback models. If every
+                  breaker is open the routed model is still tried.
+        """
+        models = self.models(route)
+        return [m for m in models if self.breaker.available(m)] or models[:1]
+
+    def hedge_delay(self, model):
+        """
+        Return how long to wait for a model before hedging.
+
+        Args:
+            model (str): Model name.
+
+        Returns:
+            float: Deadline in seconds.
+        """
+        observed = self.latency.quantile(model, self.hedge_quantile, self.hedge_min_samples)
+        delay = self.hedge_initial_delay if observed is None else observed
+        return max(self.hedge_min_delay, delay)
+
+    def call(self, route, request, metrics=None):
+        """
+        Run a request on the models of a route.
+
+        Without hedging the candidates are tried one after another until one
+        answers. With hedging the next candidate is also started whenever the
+        running requests miss the deadline of the last one started, and the
+        first answer is returned; slower requests finish in the background.
+
+        Args:
+            route (str): Section name, "Company Name" or None.
+            request (callable): Called as ``request(model)``; returns the
+                                answer or raises on failure.
+            metrics (Metrics): Optional collector for the 'fallback_requests',
+                               'hedged_requests' and 'breaker_skips' counters.
+
+        Returns:
+            The answer of the first model that succeeded.
+
+        Raises:
+            Exception: The last failure if every candidate failed.
+        """
+        models = self.candidates(route)
+        if metrics is not None and models[0] != self.model_for(route):
+            metrics.add(breaker_skips=1)
+        # Every breaker is open: the routed model is tried regardless
+        forced = not self.breaker.available(models[0])
+        if not self.hedge or len(models) == 1:
+            return self._call_in_turn(models, request, metrics, forced)
+        return self._call_hedged(models, request, metrics, forced)
+
+    def _attempt(self, model, request, forced=False):
+        """
+        Run one request, feeding the latency tracker and circuit breaker.
+
+        The breaker is consulted right before the request is sent, so a
+        half-open model's single trial is claimed only by a real request.
+        """
+        if not self.breaker.allow(model) and not forced:
+            raise BreakerOpenError(f"Circuit breaker open for {model}")
+        start = time.monotonic()
+        try:
+            result = request(model)
+        except Exception:
+            self.breaker.record_failure(model)
+            raise
+        self.latency.record(model, time.monotonic() - start)
+        self.breaker.record_success(model)
+        return result
+
+    def _call_in_turn(self, models, request, metrics, forced=False):
+        """
+        Try the candidates sequentially until one answers.
+        """
+        for i, model in enumerate(models):
+            if i and metrics is not None:
+                metrics.add(fallback_requests=1)
+            try:
+                return self._attempt(model, request, forced)
+            except Exception:
+                if i == len(models) - 1:
+                    raise
+                print(f"Model {model} failed; falling back to {models[i + 1]}")
+
+    def _call_hedged(self, models, request, metrics, forced=False):
+        """
+        Race the candidates, starting the next one at each missed deadline.
+        """
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="hedge")
+        pending = {}
+        remaining = list(models)
+        error = None
+        while True:
+            if remaining and (not pending or error is not None):
+                # Start the first model, or replace one that failed
+                model = remaining.pop(0)
+                pending[self._pool.submit(self._attempt, model, request, forced)] = model
+                if metrics is not None and len(models) - len(remaining) > 1:
+                    metrics.add(fallback_requests=1)
+                error = None
+            if not pending:
+                raise error
+            timeout = self.hedge_delay(model) if remaining else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Deadline missed: hedge with the next model
+                model = remaining.pop(0)
+                pending[self._pool.submit(self._attempt, model, request, forced)] = model
+                if metrics is not None:
+                    metrics.add(hedged_requests=1)
+                continue
+            for future in done:
+                pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = e
+            if error is not None and not pending and not remaining:
+                raise error
+
+
+def exclusive_stream(on_token):
+    """
+    Share a token callback between competing requests.
+
+    Only the first request that produces a token is forwarded, so the
+    tokens of a hedged request do not interleave with the original's.
+
+    Args:
+        on_token (callable): Callback receiving text deltas.
+
+    Returns:
+        callable: Called with a model name, returns that request's callback.
+    """
+    lock = threading.Lock()
+    owner = []
+
+    def for_model(model):
+        def emit(text):
+            with lock:
+                if not owner:
+                    owner.append(model)
+            if owner[0] == model:
+                on_token(text)
+        return emit
+
+    return for_model
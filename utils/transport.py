@@ -0,0 +1,294 @@
+"""
+HTTP transport module shared by the OpenRouter client and web enrichment.
+
+This module provides a pooled, keep-alive HTTP client with default timeouts,
+exponential backoff with jitter on 429/5xx responses (honouring Retry-After)
+and a per-host token-bucket rate limiter, so that batch runs reuse
+connections and stay under provider rate limits.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# Status codes that are worth retrying after a backoff
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Default (connect, read) timeout in seconds, overridden by the 'http' config block
+DEFAULT_TIMEOUT = (10, 60)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting the request rate to a single host.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate (float): Tokens added per second (sustained requests/second).
+            capacity (float): Maximum burst size. Defaults to ``max(1, rate)``.
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, self.rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until a token is available, then consume it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def parse_retry_after(value):
+    """
+    Convert a Retry-After header into a delay in seconds.
+
+    Args:
+        value (str): Header value, either delta-seconds or an HTTP date.
+
+    Returns:
+        float or None: Delay in seconds, or None if the header is unusable.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    """
+    Pooled HTTP client with timeouts, retries and per-host rate limiting.
+
+    A single requests.Session keeps a keep-alive connection pool per host,
+    so repeated calls to OpenRouter or DuckDuckGo skip the TCP+TLS handshake.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_retries=3, backoff_base=0.5, backoff_max=30.0,
+                 rate_limits=None, pool_size=16):
+        """
+        Initialize the client.
+
+        Args:
+            timeout (float or tuple): Default (connect, read) timeout in seconds,
+                                      applied when a call does not pass one.
+            max_retries (int): Retries after the first attempt on connection
+                               errors and retryable status codes. Defaults to 3.
+            backoff_base (float): Base delay in seconds for exponential backoff.
+            backoff_max (float): Upper bound for a single backoff delay.
+            rate_limits (dict): Mapping of host name to allowed requests per
+                                second. Hosts not listed are not limited.
+            pool_size (int): Maximum keep-alive connections kept per host.
+        """
+        self.timeout = tuple(timeout) if isinstance(timeout, (list, tuple)) else timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.buckets = {host: TokenBucket(rate) for host, rate in (rate_limits or {}).items()}
+
+        # Imported here so that importing the module does not load requests
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _backoff(self, attempt, response=None):
+        """
+        Compute the delay before the next attempt.
+
+        Args:
+            attempt (int): Zero-based index of the attempt that just failed.
+            response (requests.Response): The failed response, if any.
+
+        Returns:
+            float: Delay in seconds.
+        """
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.backoff_max)
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def request(self, method, url, **kwargs):
+        """
+        Send an HTTP request, retrying transient failures.
+
+        Args:
+            method (str): HTTP method, e.g. "GET" or "POST".
+            url (str): Target URL.
+            **kwargs: Extra arguments passed to requests.Session.request.
+
+        Returns:
+            requests.Response: The final response. Retryable status codes are
+                               returned as-is once the retries are exhausted.
+
+        Raises:
+            requests.exceptions.RequestException: If the request still fails
+                after all retries because of a network error or timeout.
+        """
+        import requests
+
+        kwargs.setdefault("timeout", self.timeout)
+        bucket = self.buckets.get(urlsplit(url).hostname)
+
+        for attempt in range(self.max_retries + 1):
+            if bucket is not None:
+                bucket.acquire()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            time.sleep(self._backoff(attempt, response))
+            response.close()
+
+    def get(self, url, **kwargs):
+        """
+        Send a GET request. See ``request`` for details.
+        """
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """
+        Send a POST request. See ``request`` for details.
+        """
+        return self.request("POST", url, **kwargs)
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def configure(**options):
+    """
+    Replace the shared client with one built from the given options.
+
+    Args:
+        **options: Keyword arguments accepted by HttpClient.
+
+    Returns:
+        HttpClient: The new shared client.
+    """
+    global _default_client
+    with _default_lock:
+        _default_client = HttpClient(**options)
+    return _default_client
+
+
+async def arequest(client, method, url, max_retries=3, backoff_base=0.5, backoff_max=30.0,
+                   retry_exceptions=(), **kwargs):
+    """
+    Send a request through an async client, retrying transient failures.
+
+    This is the asyncio counterpart of HttpClient.request: 429/5xx responses
+    and the given network exceptions are retried with exponential backoff
+    and jitter, honouring Retry-After. Concurrency is expected to be bounded
+    by the caller (e.g. with a semaphore) instead of a token bucket.
+
+    Args:
+        client: Async HTTP client with a ``request`` coroutine (e.g. httpx.AsyncClient).
+        method (str): HTTP method, e.g. "GET" or "POST".
+        url (str): Target URL.
+        max_retries (int): Retries after the first attempt. Defaults to 3.
+        backoff_base (float): Base delay in seconds for exponential backoff.
+        backoff_max (float): Upper bound for a single backoff delay.
+        retry_exceptions (tuple): Exception types treated as transient.
+        **kwargs: Extra arguments passed to ``client.request``.
+
+    Returns:
+        The final response. Retryable status codes are returned as-is once
+        the retries are exhausted.
+    """
+    import asyncio
+
+    for attempt in range(max_retries + 1):
+        try:
+            response = await client.request(method, url, **kwargs)
+        except retry_exceptions:
+            if attempt == max_retries:
+                raise
+            await asyncio.sleep(random.uniform(0, min(backoff_max, backoff_base * 2 ** attempt)))
+            continue
+        if response.status_code not in RETRY_STATUSES or attempt == max_retries:
+            return response
+        delay = parse_retry_after(response.headers.get("Retry-After"))
+        if delay is None:
+            delay = random.uniform(0, min(backoff_max, backoff_base * 2 ** attempt))
+        await asyncio.sleep(min(delay, backoff_max))
+
+
+def default_timeout():
+    """
+    Return the default timeout of the shared client.
+
+    Async clients use it too, so the 'http' config block applies to every
+    request without creating the shared client.
+
+    Returns:
+        float or tuple: (connect, read) timeout in seconds, or a single
+                        timeout for both.
+    """
+    with _default_lock:
+        return _default_client.timeout if _default_client is not None else DEFAULT_TIMEOUT
+
+
+def httpx_timeout(timeout=None):
+    """
+    Convert a requests-style timeout into an httpx.Timeout.
+
+    Args:
+        timeout (float or tuple): (connect, read) timeout in seconds.
+                                  Defaults to ``default_timeout()``.
+
+    Returns:
+        httpx.Timeout: The equivalent timeout.
+    """
+    import httpx
+
+    timeout = default_timeout() if timeout is None else timeout
+    if isinstance(timeout, (list, tuple)):
+        return httpx.Timeout(timeout[1], connect=timeout[0])
+    return httpx.Timeout(timeout)
+
+
+def get_client():
+    """
+    Return the process-wide shared HttpClient, creating it on first use.
+
+    Returns:
+        HttpClient: The shared client.
+    """
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
@@ -3,91 +3,296 @@ Web enrichment module for gathering external company intelligence.
 
 This module provides functionality to fetch company profiles and news
 from web sources using DuckDuckGo search, providing external context
-for pitch deck analysis.
+for pitch deck analysis. Lookups can be cached on disk with separate TTLs
+for profiles and news, and concurrent requests for the same query are
+coalesced into a single fetch. Async variants are provided for use with
+an httpx.AsyncClient inside an event loop.
 """
 
-import requests
-from bs4 import BeautifulSoup
+import html
+import re
+import threading
+from concurrent.futures import Future
+
+from utils.transport import arequest, get_client, httpx_timeout
+
+# DuckDuckGo HTML endpoint; timeouts come from the shared 'http' settings
+DDG_URL = "https://html.duckduckgo.com/html/"
+
+# Matches result title links without building a parse tree
+_RESULT_LINK_RE = re.compile(
+    r'<a\b[^>]*\bclass="[^"]*\bresult__a\b[^"]*"[^>]*>(.*?)</a>', re.DOTALL | re.IGNORECASE
+)
+_TAG_RE = re.compile(r"<[^>]+>")
+
+# Lookup cache and endpoint settings, see configure()
+_settings = {
+    "cache": None,
+    "profile_ttl": 7 * 86400,
+    "news_ttl": 6 * 3600,
+    "parser": "regex",
+    "search_url": DDG_URL,
+}
+
+# Queries currently being fetched, mapped to the Future that will hold the result
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+# Async counterpart of _inflight, keyed by event loop as well
+_ainflight = {}
+
+
+def configure(cache=None, profile_ttl_hours=168, news_ttl_hours=6, parser="regex",
+              search_url=None):
+    """
+    Configure the web lookup cache and result parser.
+
+    Args:
+        cache (LookupCache): Persistent cache for lookups. None disables caching.
+        profile_ttl_hours (float): Lifetime of cached profiles. Defaults to 168 (7 days).
+        news_ttl_hours (float): Lifetime of cached news. Defaults to 6.
+        parser (str): "regex" for the targeted extractor, or a BeautifulSoup
+                      backend such as "html.parser" or "lxml". Defaults to "regex".
+        search_url (str): DuckDuckGo HTML endpoint, e.g. a local stand-in for
+                          benchmarks. Defaults to DDG_URL.
+    """
+    _settings.update(
+        cache=cache,
+        profile_ttl=profile_ttl_hours * 3600,
+        news_ttl=news_ttl_hours * 3600,
+        parser=parser,
+        search_url=search_url or DDG_URL,
+    )
+
+
+def extract_result_titles(page, num_results, parser="regex"):
+    """
+    Extract search result titles from a DuckDuckGo HTML page.
+
+    Args:
+        page (str): HTML of the results page.
+        num_results (int): Maximum number of titles to return.
+        parser (str): "regex" scans only the result links; any other value is
+                      used as the BeautifulSoup parser backend.
+
+    Returns:
+        list: Result titles in page order.
+    """
+    if parser == "regex":
+        titles = []
+        for match in _RESULT_LINK_RE.finditer(page):
+            titles.append(html.unescape(_TAG_RE.sub("", match.group(1))))
+            if len(titles) >= num_results:
+                break
+        return titles
+
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page, parser)
+    return [a.text for a in soup.find_all('a', class_='result__a', limit=num_results)]
+
+
+def _search(query, num_results):
+    """
+    Run a DuckDuckGo search and return the result titles.
+
+    Args:
+        query (str): The search query.
+        num_results (int): Maximum number of titles to return.
+
+    Returns:
+        str or None: Titles separated by newlines, or None if the search failed.
+    """
+    import requests
+
+    headers = {'User-Agent': 'Mozilla/5.0'}
+
+    try:
+        r = get_client().get(_settings["search_url"], params={"q": query}, headers=headers)
+        if not r.ok:
+            return None
+    except requests.RequestException:
+        return None
+
+    return "\n".join(extract_result_titles(r.text, num_results, _settings["parser"]))
+
+
+def _cached_search(kind, query, num_results, ttl):
+    """
+    Search with the lookup cache and in-flight request coalescing.
+
+    Concurrent callers asking for the same query share one fetch. Failed
+    searches return "" and are not cached.
+
+    Args:
+        kind (str): Lookup kind used as cache namespace ("profile" or "news").
+        query (str): The search query.
+        num_results (int): Maximum number of titles to return.
+        ttl (float): Cache lifetime of the result in seconds.
+
+    Returns:
+        str: Titles separated by newlines, or "" if the search failed.
+    """
+    cache = _settings["cache"]
+    key = f"{kind}:{num_results}"
+    if cache is not None:
+        cached = cache.get(key, query, ttl)
+        if cached is not None:
+            return cached
+
+    with _inflight_lock:
+        future = _inflight.get((key, query))
+        owner = future is None
+        if owner:
+            future = _inflight[(key, query)] = Future()
+    if not owner:
+        return future.result()
+
+    try:
+        result = _search(query, num_results)
+        if result is not None and cache is not None:
+            cache.set(key, query, result)
+        future.set_result(result or "")
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[(key, query)]
+    return result or ""
 
 
 def fetch_company_profile(company_name, num_results=2):
     """
     Fetch company profile information from DuckDuckGo search results.
-    
+
     This function searches for company information using DuckDuckGo and
     extracts relevant profile snippets from the search results.
-    
+
     Args:
         company_name (str): Name of the company to search for.
         num_results (int): Maximum number of search results to return.
                           Defaults to 2.
-                          
+
     Returns:
         str: Concatenated text from search result titles, separated by newlines.
              Returns empty string if search fails or no results found.
-             
+
     Note:
         Uses DuckDuckGo's HTML interface to avoid API rate limits.
         Includes proper User-Agent header to avoid blocking.
+        Requests go through the shared pooled client with a timeout, so a
+        hung search cannot stall the pipeline. Profiles are cached for the
+        configured profile TTL (days by default).
     """
-    url = f"https://html.duckduckgo.com/html/?q={company_name} company"
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    
-    try:
-        r = requests.get(url, headers=headers)
-        if not r.ok:
-            return ""
-    except requests.RequestException:
-        return ""
-    
-    soup = BeautifulSoup(r.text, 'html.parser')
-    results = []
-    
-    # Extract search result titles
-    for a in soup.find_all('a', class_='result__a', limit=num_results):
-        results.append(a.text)
-    
-    snippet = "\n".join(results)
-    return snippet
+    return _cached_search("profile", f"{company_name} company", num_results,
+                          _settings["profile_ttl"])
 
 
 def fetch_latest_news(company_name, num_results=2):
     """
     Fetch latest news about a company from DuckDuckGo search results.
-    
+
     This function searches for recent news about the company using DuckDuckGo
     and extracts relevant news headlines from the search results.
-    
+
     Args:
         company_name (str): Name of the company to search for.
         num_results (int): Maximum number of news results to return.
                           Defaults to 2.
-                          
+
     Returns:
         str: Concatenated text from news headlines, separated by newlines.
              Returns empty string if search fails or no results found.
-             
+
     Note:
         Uses DuckDuckGo's HTML interface to avoid API rate limits.
         Includes proper User-Agent header to avoid blocking.
+        Requests go through the shared pooled client with a timeout, so a
+        hung search cannot stall the pipeline. News is cached for the
+        configured news TTL (hours by default).
         Searches specifically for news by appending "company news" to query.
     """
-    url = f"https://html.duckduckgo.com/html/?q={company_name} company news"
+    return _cached_search("news", f"{company_name} company news", num_results,
+                          _settings["news_ttl"])
+
+
+async def _asearch(client, query, num_results):
+    """
+    Async counterpart of _search using an httpx.AsyncClient.
+    """
+    import httpx
+
     headers = {'User-Agent': 'Mozilla/5.0'}
-    
+
     try:
-        r = requests.get(url, headers=headers)
-        if not r.ok:
-            return ""
-    except requests.RequestException:
-        return ""
-    
-    soup = BeautifulSoup(r.text, 'html.parser')
-    results = []
-    
-    # Extract news result titles
-    for a in soup.find_all('a', class_='result__a', limit=num_results):
-        results.append(a.text)
-    
-    snippet = "\n".join(results)
-    return snippet
+        r = await arequest(client, "GET", _settings["search_url"], params={"q": query}, headers=headers,
+                           timeout=httpx_timeout(),
+                           retry_exceptions=(httpx.TransportError,))
+        if not r.is_success:
+            return None
+    except httpx.HTTPError:
+        return None
+
+    return "\n".join(extract_result_titles(r.text, num_results, _settings["parser"]))
+
+
+async def _acached_search(client, kind, query, num_results, ttl):
+    """
+    Async counterpart of _cached_search; concurrent tasks share one fetch.
+    """
+    import asyncio
+
+    cache = _settings["cache"]
+    key = f"{kind}:{num_results}"
+    # The SQLite cache blocks, so it is read and written off the event loop
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, key, query, ttl)
+        if cached is not None:
+            return cached
+
+    async def fetch():
+        result = await _asearch(client, query, num_results)
+        if result is not None and cache is not None:
+            await asyncio.to_thread(cache.set, key, query, result)
+        return result or ""
+
+    inflight_key = (id(asyncio.get_running_loop()), key, query)
+    task = _ainflight.get(inflight_key)
+    if task is None:
+        task = _ainflight[inflight_key] = asyncio.ensure_future(fetch())
+        task.add_done_callback(lambda _: _ainflight.pop(inflight_key, None))
+    # Shield the shared task so one cancelled caller does not cancel the others
+    return await asyncio.shield(task)
+
+
+async def afetch_company_profile(company_name, client, num_results=2):
+    """
+    Async version of fetch_company_profile.
+
+    Args:
+        company_name (str): Name of the company to search for.
+        client (httpx.AsyncClient): Shared async HTTP client.
+        num_results (int): Maximum number of search results to return.
+
+    Returns:
+        str: Result titles separated by newlines, or "" on failure.
+    """
+    return await _acached_search(client, "profile", f"{company_name} company", num_results,
+                                 _settings["profile_ttl"])
+
+
+async def afetch_latest_news(company_name, client, num_results=2):
+    """
+    Async version of fetch_latest_news.
+
+    Args:
+        company_name (str): Name of the company to search for.
+        client (httpx.AsyncClient): Shared async HTTP client.
+        num_results (int): Maximum number of news results to return.
+
+    Returns:
+        str: Headlines separated by newlines, or "" on failure.
+    """
+    return await _acached_search(client, "news", f"{company_name} company news", num_results,
+                                 _settings["news_ttl"])
@@ -0,0 +1,300 @@
+"""
+Writers module for rendering reports in several output formats at once.
+
+This module provides pluggable writers for markdown, JSON and HTML that are
+fed the sections of an enriched dict in a single pass, with every rendered
+document buffered in memory and written atomically next to the report. A
+JSONL appender collects one record per deck for batch runs, so downstream
+tools can stream-load results without parsing markdown.
+"""
+
+import html
+import json
+import os
+import re
+import threading
+
+from utils.markdown_writer import atomic_write, render_markdown
+
+
+class MarkdownWriter:
+    """
+    Renders the markdown report, the same document as write_markdown.
+    """
+
+    suffix = ".md"
+
+    def begin(self, enriched):
+        return []
+
+    def section(self, name, content):
+        return [render_markdown({name: content})]
+
+    def end(self):
+        return []
+
+
+class JsonWriter:
+    """
+    Renders the enriched sections as a JSON object, in section order.
+    """
+
+    suffix = ".enriched.json"
+
+    def __init__(self):
+        self._first = True
+
+    def begin(self, enriched):
+        return ["{"]
+
+    def section(self, name, content):
+        separator = "\n" if self._first else ",\n"
+        self._first = False
+        return [f"{separator}  {json.dumps(name, ensure_ascii=False)}: "
+                f"{json.dumps(content, ensure_ascii=False)}"]
+
+    def end(self):
+        return ["}" if self._first else "\n}"]
+
+
+_INLINE_RULES = [
+    (re.compile(r"`([^`]+)`"), r"<code>\1</code>"),
+    (re.compile(r"\*\*(.+?)\*\*"), r"<strong>\1</strong>"),
+    (re.compile(r"(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?![*\w])"), r"<em>\1</em>"),
+    # Quotes are not allowed in URLs so a link cannot break out of the href attribute
+    (re.compile(r"\[([^\]]+)\]\((https?://[^)\s\"'<>]+)\)"), r'<a href="\2">\1</a>'),
+]
+_HEADING_RE = re.compile(r"(#{1,6})\s+(.*)")
+_LIST_RE = re.compile(r"\s*(?:[-*+]|(\d+)\.)\s+(.*)")
+_TABLE_RULE_RE = re.compile(r"\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?")
+
+
+def _inline(text):
+    """
+    Escape a line of markdown and convert its inline markup to HTML.
+    """
+    text = html.escape(text, quote=False)
+    for pattern, replacement in _INLINE_RULES:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def markdown_to_html(text):
+    """
+    Convert the markdown subset produced by the models to HTML.
+
+    Headings, bullet and numbered lists, pipe tables, paragraphs and inline
+    code, bold, italics and links are converted; everything else is kept
+    as escaped text.
+
+    Args:
+        text (str): Markdown text.
+
+    Returns:
+        str: HTML fragment.
+    """
+    out, paragraph, list_tag, table = [], [], None, None
+
+    def flush():
+        nonlocal list_tag, table
+        if paragraph:
+            out.append(f"<p>{'<br>'.join(paragraph)}</p>")
+            paragraph.clear()
+        if list_tag:
+            out.append(f"</{list_tag}>")
+            list_tag = None
+        if table is not None:
+            head = "".join(f"<th>{cell}</th>" for cell in table[0])
+            body = "".join("<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>"
+                           for row in table[1:])
+            out.append(f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>")
+            table = None
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        heading = _HEADING_RE.fullmatch(stripped)
+        item = _LIST_RE.fullmatch(line)
+        if not stripped:
+            flush()
+        elif stripped.startswith("|"):
+            if table is None:
+                flush()
+                table = []
+            if not _TABLE_RULE_RE.fullmatch(stripped):
+                table.append([_inline(cell.strip()) for cell in stripped.strip("|").split("|")])
+        elif heading:
+            flush()
+            level = min(len(heading.group(1)) + 1, 6)
+            out.append(f"<h{level}>{_inline(heading.group(2))}</h{level}>")
+        elif item:
+            tag = "ol" if item.group(1) else "ul"
+            if list_tag != tag:
+                flush()
+                out.append(f"<{tag}>")
+                list_tag = tag
+            out.append(f"<li>{_inline(item.group(2))}</li>")
+        else:
+            if list_tag or table is not None:
+                flush()
+            paragraph.append(_inline(stripped))
+    flush()
+    return "\n".join(out)
+
+
+class HtmlWriter:
+    """
+    Renders a standalone HTML page with one section per enriched key.
+    """
+
+    suffix = ".html"
+
+    def begin(self, enriched):
+        title = html.escape(str(enriched.get("Company Name") or "Pitch Deck Analysis").strip())
+        return [
+            "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+            f"<title>{title}</title>\n"
+            "<style>body{font-family:sans-serif;max-width:60rem;margin:2rem auto;"
+            "line-height:1.5}table{border-collapse:collapse}"
+            "td,th{border:1px solid #ccc;padding:.25rem .5rem}</style>\n"
+            "</head>\n<body>\n"
+        ]
+
+    def section(self, name, content):
+        body = markdown_to_html(content.strip())
+        return [f"<section>\n<h1>{html.escape(name)}</h1>\n{body}\n</section>\n"]
+
+    def end(self):
+        return ["</body>\n</html>\n"]
+
+
+# Writer class per output format name
+WRITERS = {
+    "markdown": MarkdownWriter,
+    "json": JsonWriter,
+    "html": HtmlWriter,
+}
+
+
+def register_writer(name, writer_class):
+    """
+    Add an output format.
+
+    Args:
+        name (str): Format name used in the 'output_formats' config list.
+        writer_class (type): Class with a ``suffix`` attribute and
+                             ``begin(enriched)``, ``section(name, content)``
+                             and ``end()`` methods returning lists of strings.
+    """
+    WRITERS[name] = writer_class
+
+
+def output_paths(output_file, formats):
+    """
+    Map output formats to the files they are written to.
+
+    The markdown report is ``output_file`` itself; other formats replace its
+    extension with their suffix.
+
+    Args:
+        output_file (str): Path of the markdown report.
+        formats (list): Output format names.
+
+    Returns:
+        dict: Format name to file path.
+
+    Raises:
+        ValueError: If a format is unknown.
+    """
+    base = os.path.splitext(output_file)[0]
+    paths = {}
+    for name in formats:
+        if name not in WRITERS:
+            raise ValueError(f"Unknown output format: {name}")
+        paths[name] = output_file if name == "markdown" else base + WRITERS[name].suffix
+    return paths
+
+
+def render_outputs(enriched, formats=("markdown", "json")):
+    """
+    Render an enriched dict in several formats in a single pass over its sections.
+
+    Args:
+        enriched (dict): Section names to content strings.
+        formats (list): Output format names. Defaults to markdown and JSON.
+
+    Returns:
+        dict: Format name to the complete rendered document.
+    """
+    writers = {name: WRITERS[name]() for name in formats}
+    buffers = {name: writer.begin(enriched) for name, writer in writers.items()}
+    for section, content in enriched.items():
+        for name, writer in writers.items():
+            buffers[name].extend(writer.section(section, content))
+    for name, writer in writers.items():
+        buffers[name].extend(writer.end())
+    return {name: "".join(parts) for name, parts in buffers.items()}
+
+
+def write_outputs(enriched, output_file, formats=("markdown", "json")):
+    """
+    Render and atomically write a report in every requested format.
+
+    Args:
+        enriched (dict): Section names to content strings.
+        output_file (str): Path of the markdown report; other formats are
+                           written next to it.
+        formats (list): Output format names. Defaults to markdown and JSON.
+
+    Returns:
+        dict: Format name to the path written.
+    """
+    paths = output_paths(output_file, formats)
+    for name, text in render_outputs(enriched, formats).items():
+        atomic_write(paths[name], text)
+    return paths
+
+
+class JsonlAppender:
+    """
+    Appends one JSON record per deck to a JSONL file.
+
+    Each record is written with a single buffered write of a complete line
+    and flushed, so concurrent readers only ever see whole lines. Safe to
+    share between threads.
+    """
+
+    def __init__(self, path):
+        """
+        Open the JSONL file for appending.
+
+        Args:
+            path (str): Path of the JSONL file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def append(self, record):
+        """
+        Append a record.
+
+        Args:
+            record (dict): JSON-serialisable record.
+        """
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        """
+        Close the file.
+        """
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()